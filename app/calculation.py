@@ -1,32 +1,266 @@
 # app/calculation.py
-from dataclasses import dataclass, asdict
-from datetime import datetime
-from typing import Any, Tuple
+from dataclasses import FrozenInstanceError
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from fractions import Fraction
+from typing import Any, Optional, Tuple
+import struct
+import sys
+import threading
+import time
+
+# operand_1, operand_2, result, microseconds since epoch, seq, flags, len(operation)
+_PACK_HEADER = struct.Struct("<dddqqBB")
+_FLAG_AWARE = 1
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_NAIVE_EPOCH = _EPOCH.replace(tzinfo=None)
+_MICROSECOND = timedelta(microseconds=1)
+
+# last sequence number and time handed out; both move under one lock, so
+# a higher seq never gets an earlier ts_ns
+_lock = threading.Lock()
+_last_seq = 0
+_last_ns = 0
+_set = object.__setattr__
+
+
+def stamp() -> Tuple[int, int]:
+    """
+    ``(seq, ts_ns)`` for a new calculation: the next process-wide sequence
+    number and ``time.time_ns()``, nudged forward so it does not go backwards
+    when the wall clock is stepped back. ``seq`` is the total order;
+    ``ts_ns`` is for display and time-range queries.
+    """
+    global _last_seq, _last_ns
+    ns = time.time_ns()
+    with _lock:
+        if ns <= _last_ns:
+            ns = _last_ns + 1
+        _last_ns = ns
+        _last_seq += 1
+        return _last_seq, ns
+
+
+def _next_seq() -> int:
+    global _last_seq
+    with _lock:
+        _last_seq += 1
+        return _last_seq
+
+
+def observe_seq(seq: int):
+    """Number later records after ``seq`` (for records restored with theirs)."""
+    global _last_seq
+    if seq > _last_seq:
+        with _lock:
+            if seq > _last_seq:
+                _last_seq = seq
+
+
+def parse_seq(value) -> Optional[int]:
+    """A ``seq`` read back from a file: int, numeric text, or None/""/NaN when absent."""
+    if value is None or value == "" or value != value:
+        return None
+    return int(float(value)) if isinstance(value, str) else int(value)
+
+
+def exact_text(value) -> Any:
+    """
+    A ``Decimal`` or ``Fraction`` as text for an untyped column (CSV,
+    SQLite): ``decimal:0.1`` or ``fraction:1/3``. Anything else is returned
+    unchanged.
+    """
+    if isinstance(value, Decimal):
+        return f"decimal:{value}"
+    if isinstance(value, Fraction):
+        return f"fraction:{value}"
+    return value
+
+
+def parse_number(value) -> Any:
+    """
+    An operand or result read back from a file. ``exact_text`` output becomes
+    a Decimal or Fraction again and other numeric text a float, so every load
+    path gives the same types; numbers, None and other text (e.g. complex
+    results) are returned unchanged.
+    """
+    if not isinstance(value, str):
+        return value
+    kind, sep, text = value.partition(":")
+    try:
+        if sep:
+            if kind == "decimal":
+                return Decimal(text)
+            return Fraction(text) if kind == "fraction" else value
+        # fractions written before the type prefix: "1/3"
+        return Fraction(value) if "/" in value else float(value)
+    except (ValueError, ArithmeticError):
+        return value
+
+
+def _restore(operation, operands, result, timestamp, expression, ts_ns, seq) -> "Calculation":
+    observe_seq(seq)
+    return Calculation(operation, operands, result, timestamp, expression, ts_ns, seq)
+
+
+def datetime_to_ns(ts: datetime) -> int:
+    """Nanoseconds since the epoch; naive timestamps (older files) are taken as UTC."""
+    if ts.tzinfo is None:
+        return (ts - _NAIVE_EPOCH) // _MICROSECOND * 1000
+    return (ts - _EPOCH) // _MICROSECOND * 1000
 
 
-@dataclass
 class Calculation:
-    operation: str
-    operands: Tuple[float, float]
-    result: Any
-    timestamp: datetime
+    """
+    One history record. Records are immutable and slotted (no per-instance
+    ``__dict__``) and operation names are interned, so long histories and
+    undo snapshots stay small; copies return the same instance.
+
+    Each record has a ``seq`` -- process-wide, increasing in creation order.
+    It is saved with the record (history files, the write-ahead log, pickles,
+    packed form) and kept when read back; rows from older files without one
+    are numbered in the order they are read. Each record also has a time,
+    held either as the ``datetime`` it was created with or, for new
+    calculations, as integer nanoseconds (``ts_ns``). ``timestamp`` builds
+    the ``datetime`` (UTC) on access. Equality ignores ``seq`` and compares
+    times to the microsecond, the precision history files keep.
+    """
+    __slots__ = ("operation", "operands", "result", "expression", "seq", "_ns", "_dt")
+
+    def __init__(
+        self,
+        operation: str,
+        operands: Tuple[float, ...],
+        result: Any,
+        timestamp: Optional[datetime] = None,
+        # source text for calculations that are not a single binary operation
+        # (e.g. evaluated expressions); such records have no operands
+        expression: Optional[str] = None,
+        ts_ns: Optional[int] = None,
+        seq: Optional[int] = None,
+    ):
+        if timestamp is None and ts_ns is None:
+            raise TypeError("Calculation needs a timestamp or ts_ns")
+        _set(self, "operation", sys.intern(operation) if type(operation) is str else operation)
+        _set(self, "operands", operands)
+        _set(self, "result", result)
+        _set(self, "expression", expression)
+        _set(self, "seq", _next_seq() if seq is None else seq)
+        _set(self, "_ns", ts_ns)
+        _set(self, "_dt", timestamp)
+
+    @property
+    def timestamp(self) -> datetime:
+        if self._dt is not None:
+            return self._dt
+        return _EPOCH + timedelta(microseconds=self._ns // 1000)
+
+    @property
+    def ts_ns(self) -> int:
+        if self._ns is None:
+            _set(self, "_ns", datetime_to_ns(self._dt))
+        return self._ns
+
+    @property
+    def naive(self) -> bool:
+        """True for records read with a timezone-less timestamp (older files)."""
+        return self._dt is not None and self._dt.tzinfo is None
+
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f"cannot assign to field {name!r}")
+
+    def __delattr__(self, name):
+        raise FrozenInstanceError(f"cannot delete field {name!r}")
+
+    def _key(self):
+        return (self.operation, self.operands, self.result, self.ts_ns // 1000, self.naive, self.expression)
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self) -> str:
+        return (
+            f"Calculation(operation={self.operation!r}, operands={self.operands!r}, result={self.result!r}, "
+            f"timestamp={self.timestamp!r}, expression={self.expression!r}, seq={self.seq})"
+        )
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        # plain constructor args pickle about twice as fast as slot state
+        # (used by undo snapshots and warm restarts)
+        return (_restore, (self.operation, self.operands, self.result, self._dt, self.expression, self._ns, self.seq))
 
     def __str__(self) -> str:
         """Format the calculation in a readable way."""
+        if self.expression is not None:
+            return f"{self.expression} = {self.result}"
         # Capitalize first letter of operation
         op = self.operation.capitalize()
         a, b = self.operands
         return f"{op}({a},{b}) = {self.result}"
 
     def to_dict(self):
-        d = asdict(self)
-        # make timestamp serializable (string)
-        d['timestamp'] = self.timestamp.isoformat()
-        d['operand_1'] = float(self.operands[0])
-        d['operand_2'] = float(self.operands[1])
-        # keep a clean CSV-friendly shape
-        d['operation'] = self.operation
-        d['result'] = self.result
-        # remove operands tuple to avoid duplication
-        d.pop('operands', None)
-        return d
+        # CSV-friendly shape: string timestamp, operands split into two columns
+        # (see app.serialization for whole-history conversion)
+        operands = self.operands
+        return {
+            'operation': self.operation,
+            'result': self.result,
+            'timestamp': self.timestamp.isoformat(),
+            'expression': self.expression,
+            'operand_1': operands[0] if operands else None,
+            'operand_2': operands[1] if operands else None,
+            'seq': self.seq,
+        }
+
+    @classmethod
+    def from_dict(cls, d) -> "Calculation":
+        """
+        Inverse of ``to_dict`` (also accepts CSV rows read back as dicts);
+        operands and results go through ``parse_number``.
+        """
+        ts = d.get("timestamp")
+        ts = datetime.fromisoformat(ts) if isinstance(ts, str) else ts
+        seq = parse_seq(d.get("seq"))
+        if seq is not None:
+            observe_seq(seq)
+        expression = d.get("expression")
+        if isinstance(expression, str):
+            # expression rows carry no operands
+            return cls(d.get("operation"), (), parse_number(d.get("result")), ts, expression=expression, seq=seq)
+        operands = (parse_number(d.get("operand_1")), parse_number(d.get("operand_2")))
+        return cls(d.get("operation"), operands, parse_number(d.get("result")), ts, seq=seq)
+
+    def pack(self) -> bytes:
+        """
+        Packed binary form (42 bytes + operation name) for binary operations
+        with float results. Aware timestamps are stored as UTC; ``seq`` is
+        kept.
+        """
+        if self.expression is not None or len(self.operands) != 2 or type(self.result) not in (int, float):
+            raise ValueError("only binary operations with float results can be packed")
+        micros = self.ts_ns // 1000
+        flags = 0 if self.naive else _FLAG_AWARE
+        name = self.operation.encode("utf-8")
+        a, b = self.operands
+        return _PACK_HEADER.pack(float(a), float(b), float(self.result), micros, self.seq, flags, len(name)) + name
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "Calculation":
+        a, b, result, micros, seq, flags, name_len = _PACK_HEADER.unpack_from(data)
+        name = data[_PACK_HEADER.size:_PACK_HEADER.size + name_len].decode("utf-8")
+        observe_seq(seq)
+        if flags & _FLAG_AWARE:
+            return cls(name, (a, b), result, ts_ns=micros * 1000, seq=seq)
+        return cls(name, (a, b), result, _NAIVE_EPOCH + timedelta(microseconds=micros), seq=seq)
+
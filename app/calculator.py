@@ -1,74 +1,203 @@
 # app/calculator.py
-from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Iterable, List, Optional, Sequence, Tuple
 import os
 import math
-from .calculation import Calculation
+import time
+from .calculation import Calculation, datetime_to_ns, stamp
 from .operations import OperationFactory
+from .expressions import compile_expression
+from .numeric import NumericEngine, get_engine
 from .history import HistoryManager
+from .history_archive import get_archive
 from .calculator_memento import Caretaker
-from .logger import LoggingObserver, AutoSaveObserver, Observer
+from .logger import (
+    EVENTS,
+    AutoSaveObserver,
+    LoggingObserver,
+    Observer,
+    SQLiteAutoSaveObserver,
+    observer_events,
+    observer_operations,
+)
 from .calculator_config import CalculatorConfig
-from .exceptions import OperationError, PersistenceError
+from .exceptions import OperationError, PersistenceError, ValidationError
+from .parallel_load import read_history_parallel
+from .memory_budget import MemoryGovernor, measure
+from .persistence import atomic_write, get_wal, unapplied_records
+from .quantiles import CalculationStats
+from .serialization import COLUMNS, to_csv_bytes, to_jsonl_bytes
+from .sqlite_store import get_store, is_sqlite_path
+from . import reductions, snapshot
 
 cfg = CalculatorConfig()
 
+HISTORY_BACKENDS = ("csv", "sqlite")
+
 
 class Calculator:
-    def __init__(self, config: CalculatorConfig | None = None):
+    def __init__(
+        self,
+        config: CalculatorConfig | None = None,
+        observers: List[Observer] | None = None,
+        engine: NumericEngine | None = None,
+    ):
+        """
+        ``observers`` and ``engine`` let a session pool share one set of
+        observers and one engine across calculators; when observers are given,
+        directory setup and the default observers are skipped.
+        """
         self.config = config or cfg
-        self.config.ensure_dirs()
-
-        self.history_manager = HistoryManager(max_size=self.config.max_history_size)
+        if self.config.history_backend not in HISTORY_BACKENDS:
+            raise ValidationError(f"Unknown history backend: {self.config.history_backend}")
+        if observers is None:
+            self.config.ensure_dirs()
+        self.engine = engine or get_engine(self.config)
+
+        shared = None
+        if self.config.shared_history:
+            from .shared_history import get_ring
+            shared = get_ring(self.config.shared_history, self.config.shared_history_capacity)
+        archive = None
+        if self.config.history_archive_dir:
+            archive = get_archive(self.config.history_archive_dir, self.config.archive_segment_rows)
+        self.history_manager = HistoryManager(max_size=self.config.max_history_size, shared=shared, archive=archive)
+        # per-operation result/latency quantiles over every calculation made
+        self.stats = CalculationStats(self.config.sketch_k)
         self._observers: List[Observer] = []
-        self._caretaker = Caretaker()
+        self._dispatch: dict = {}
+        self._caretaker = Caretaker(
+            max_depth=self.config.max_undo_depth,
+            keep_uncompressed=self.config.undo_uncompressed,
+            spill_dir=self.config.undo_spill_dir,
+        )
 
-        # default observers
-        self.register_observer(LoggingObserver())
-        if self.config.auto_save:
-            self.register_observer(AutoSaveObserver(self.config.history_file))
+        self.memory_governor = None
+        self._profiler = None
+        self.rollup_store = None
+        if self.config.rollup_resolutions:
+            from .rollups import get_rollups, parse_resolutions
+            # next to whichever file holds the history
+            base = self.config.history_db if self.config.history_backend == "sqlite" else self.config.history_file
+            self.rollup_store = get_rollups(base, parse_resolutions(self.config.rollup_resolutions))
+        if observers is not None:
+            self._observers.extend(observers)
+            self._rebuild_dispatch()
+        else:
+            # default observers
+            self.register_observer(LoggingObserver())
+            if self.config.auto_save and self.config.history_backend == "sqlite":
+                self.register_observer(SQLiteAutoSaveObserver(self.config.history_db))
+            elif self.config.auto_save:
+                self.register_observer(
+                    AutoSaveObserver(self.config.history_file, checkpoint_every=self.config.wal_checkpoint_every)
+                )
+            if self.config.event_stream:
+                from .event_stream import EventStreamObserver
+                self.register_observer(
+                    EventStreamObserver(
+                        self.config.event_stream,
+                        flush_every=self.config.event_stream_flush_every,
+                        flush_interval=self.config.event_stream_flush_interval,
+                        socket_path=self.config.event_stream_socket,
+                    )
+                )
+            if self.rollup_store is not None:
+                from .rollups import RollupObserver
+                self.register_observer(RollupObserver(self.rollup_store, self.config.rollup_flush_every))
+            if self.config.snapshot_every:
+                # after autosave, so snapshots see the history they describe
+                self.register_observer(snapshot.SnapshotObserver(self))
+        if self.config.memory_budget_mb > 0:
+            self.memory_governor = MemoryGovernor(self)
+            self.register_observer(self.memory_governor)
 
         # save initial empty state for undo semantics
         self._caretaker.save(self.history_manager.list())
 
     # ===== Observer management =====
     def register_observer(self, observer: Observer):
+        observer_events(observer)  # reject unknown events up front
         self._observers.append(observer)
+        self._rebuild_dispatch()
 
     def unregister_observer(self, observer: Observer):
         self._observers.remove(observer)
+        self._rebuild_dispatch()
+
+    def _rebuild_dispatch(self):
+        """
+        Precompute who hears what: per event, a list of
+        ``(observer, operations filter, update_many or None)``. Observers not
+        subscribed to an event are not called at all.
+        """
+        dispatch = {event: [] for event in EVENTS}
+        for obs in self._observers:
+            entry = (obs, observer_operations(obs), getattr(obs, "update_many", None))
+            for event in observer_events(obs):
+                dispatch[event].append(entry)
+        self._dispatch = dispatch
+
+    def _observer_failed(self):
+        # Observers should not crash the calculator; log and continue
+        try:
+            import logging
+            logging.getLogger("calculator").exception("Observer failed")
+        except Exception:
+            pass
 
     def _notify(self, calc: Calculation):
-        for obs in list(self._observers):
+        for obs, operations, _ in self._dispatch["perform"]:
+            if operations is not None and calc.operation not in operations:
+                continue
             try:
                 obs.update(calc)
             except Exception:
-                # Observers should not crash the calculator; log and continue
-                try:
-                    import logging
-                    logging.getLogger("calculator").exception("Observer failed")
-                except Exception:
-                    pass
+                self._observer_failed()
+
+    def _notify_many(self, calcs: Sequence[Calculation]):
+        """Report several new calculations; batch-aware observers get one call."""
+        for obs, operations, update_many in self._dispatch["perform"]:
+            batch = calcs if operations is None else [c for c in calcs if c.operation in operations]
+            if not batch:
+                continue
+            try:
+                if update_many is not None:
+                    update_many(batch)
+                else:
+                    for calc in batch:
+                        obs.update(calc)
+            except Exception:
+                self._observer_failed()
+
+    def _emit(self, event: str):
+        """Report a history-wide event (clear, undo, redo, load) to subscribers."""
+        subscribers = self._dispatch[event]
+        if not subscribers:
+            return
+        history = self.history_manager.list()
+        for obs, _, _ in subscribers:
+            try:
+                obs.on_event(event, history)
+            except Exception:
+                self._observer_failed()
 
     # ===== Core operation execution =====
     def perform(self, op_name: str, a, b) -> Calculation:
-        op_obj = OperationFactory.create(op_name, a, b)
-        result = op_obj.compute()
-
-        # apply precision if numeric real
-        if isinstance(result, (int, float)) and not (isinstance(result, bool)):
-            # avoid absurd floating rounding for very large numbers
-            result = round(float(result), self.config.precision)
+        started = time.perf_counter()
+        op_obj = OperationFactory.create(op_name, a, b, engine=self.engine)
+        result = self.engine.evaluate(op_obj)
 
-            # handle -0.0
-            if result == 0.0:
-                result = 0.0
+        # apply precision (the float engine rounds real results only)
+        result = self.engine.round(result, self.config.precision)
+        self.stats.record(op_name, result, time.perf_counter() - started)
 
+        seq, ts_ns = stamp()
         calc = Calculation(
             operation=op_name,
-            operands=(float(a), float(b)),
+            operands=(op_obj.a, op_obj.b),
             result=result,
-            timestamp=datetime.now(timezone.utc),
+            ts_ns=ts_ns,
+            seq=seq,
         )
 
         # Save prior state for undo (save snapshot before modifying)
@@ -80,6 +209,149 @@ class Calculator:
 
         return calc
 
+    def perform_many(self, requests: Iterable[Tuple[str, object, object]]) -> List[Calculation]:
+        """
+        Perform several ``(op_name, a, b)`` calculations as one step: all are
+        computed first (nothing is recorded if any fails), then appended with
+        a single undo snapshot and one batched observer notification.
+        """
+        calcs, timings = [], []
+        for op_name, a, b in requests:
+            started = time.perf_counter()
+            op_obj = OperationFactory.create(op_name, a, b, engine=self.engine)
+            result = self.engine.round(self.engine.evaluate(op_obj), self.config.precision)
+            timings.append(time.perf_counter() - started)
+            seq, ts_ns = stamp()
+            calcs.append(
+                Calculation(
+                    operation=op_name,
+                    operands=(op_obj.a, op_obj.b),
+                    result=result,
+                    ts_ns=ts_ns,
+                    seq=seq,
+                )
+            )
+        if not calcs:
+            return calcs
+        for calc, seconds in zip(calcs, timings):
+            self.stats.record(calc.operation, calc.result, seconds)
+
+        self._caretaker.save(self.history_manager.list())
+        self.history_manager.extend(calcs)
+        self._notify_many(calcs)
+        return calcs
+
+    def evaluate(self, expression: str, variables: dict | None = None) -> Calculation:
+        """
+        Evaluate an infix expression (e.g. ``(a+b)*c/d``) and record it as a
+        single history entry.
+        """
+        started = time.perf_counter()
+        plan = compile_expression(expression)
+        result = self.engine.round(plan.evaluate(variables, self.engine), self.config.precision)
+        self.stats.record("expression", result, time.perf_counter() - started)
+
+        seq, ts_ns = stamp()
+        calc = Calculation(
+            operation="expression",
+            operands=(),
+            result=result,
+            ts_ns=ts_ns,
+            seq=seq,
+            expression=plan.render(variables),
+        )
+
+        self._caretaker.save(self.history_manager.list())
+        self.history_manager.append(calc)
+        self._notify(calc)
+
+        return calc
+
+    def _record_reduction(self, op_name: str, values, cumulative: bool):
+        started = time.perf_counter()
+        values = self.engine.coerce_many(values)
+        if cumulative:
+            running = reductions.accumulate_values(self.engine, op_name, values)
+            result = running[-1]
+            running = reductions.round_running(self.engine, running, self.config.precision)
+        else:
+            running = None
+            result = reductions.reduce_values(self.engine, op_name, values)
+        result = self.engine.round(result, self.config.precision)
+        self.stats.record(op_name, result, time.perf_counter() - started)
+
+        seq, ts_ns = stamp()
+        calc = Calculation(
+            operation=op_name,
+            operands=(),
+            result=result,
+            ts_ns=ts_ns,
+            seq=seq,
+            expression=reductions.describe(op_name, values),
+        )
+        self._caretaker.save(self.history_manager.list())
+        self.history_manager.append(calc)
+        self._notify(calc)
+        return calc, running
+
+    def reduce(self, op_name: str, values) -> Calculation:
+        """
+        Fold a whole sequence (or numpy array) of operands with ``sum``,
+        ``product``, ``min``, ``max`` or ``mean``, recorded as one history
+        entry that references the operands by count and hash.
+        """
+        return self._record_reduction(op_name, values, cumulative=False)[0]
+
+    def accumulate(self, op_name: str, values):
+        """
+        Cumulative ``cumsum``/``cumprod``/``cummin``/``cummax``: returns the
+        history entry (final value) and all running values.
+        """
+        return self._record_reduction(op_name, values, cumulative=True)
+
+    # ===== Statistics =====
+    def quantiles(self, qs: Sequence[float] = (0.5, 0.99), operation: str | None = None, kind: str = "result"):
+        """
+        Estimated quantiles of results (``kind="result"``) or compute times in
+        seconds (``kind="latency"``) for one operation, or all when None.
+        """
+        return self.stats.quantiles(qs, operation, kind)
+
+    def rollups(self, resolution: str = "hour", since=None, until=None, operation: str | None = None):
+        """
+        Per-bucket counts, sums and min/max of results (see app.rollups), for
+        buckets starting in ``[since, until)``. Needs CALCULATOR_ROLLUP_RESOLUTIONS.
+        """
+        if self.rollup_store is None:
+            raise ValidationError("Rollups are not enabled (set CALCULATOR_ROLLUP_RESOLUTIONS)")
+        return self.rollup_store.query(resolution, since, until, operation)
+
+    def memory_usage(self):
+        """Accounted memory of history, undo state and caches (see app.memory_budget)."""
+        return measure(self)
+
+    # ===== Profiling =====
+    def start_profiling(self, interval: float | None = None):
+        """Profile calculator code run by this thread until ``stop_profiling``."""
+        from .profiling import Profiler
+
+        if self._profiler is not None and self._profiler.running:
+            raise ValidationError("Profiling is already running")
+        self._profiler = Profiler(interval or self.config.profile_interval)
+        self._profiler.start()
+
+    def stop_profiling(self, path: str | None = None):
+        """
+        Stop profiling and return the ``ProfileReport``; with ``path``, also
+        write its collapsed stacks there (for flamegraph tools).
+        """
+        if self._profiler is None or not self._profiler.running:
+            raise ValidationError("Profiling is not running")
+        report = self._profiler.stop()
+        if path:
+            report.write_collapsed(path)
+        return report
+
     # ===== History / persistence =====
     def history(self) -> List[Calculation]:
         return self.history_manager.list()
@@ -88,38 +360,152 @@ class Calculator:
         self.history_manager.clear()
         # save this cleared state to caretaker as an operation
         self._caretaker.save(self.history_manager.list())
+        self._emit("clear")
+
+    def _db_path(self, path: str | None) -> str | None:
+        """Database file for ``path`` when the SQLite backend applies, else None."""
+        if path is None:
+            return self.config.history_db if self.config.history_backend == "sqlite" else None
+        return path if is_sqlite_path(path) else None
+
+    def query_history(self, operation: str | None = None, since=None, until=None, limit: int | None = None):
+        """
+        Stored calculations filtered by operation and ``[since, until)``
+        timestamps (newest ``limit`` when given). Runs as SQL on the SQLite
+        backend; with CSV it filters the in-memory history, preceded by
+        archived rows when a history archive is configured.
+        """
+        db_path = self._db_path(None)
+        if db_path is not None:
+            return get_store(db_path).query(operation, since, until, limit)
+        # compared as integer nanoseconds: no datetime is built per row
+        lo = datetime_to_ns(since) if since is not None else None
+        hi = datetime_to_ns(until) if until is not None else None
+        rows = [
+            c for c in self.history_manager.list()
+            if (operation is None or c.operation == operation)
+            and (lo is None or c.ts_ns >= lo)
+            and (hi is None or c.ts_ns < hi)
+        ]
+        archive = self.history_manager.archive
+        if archive is not None and not (limit and len(rows) >= limit):
+            older = archive.query(operation, since, until, limit - len(rows) if limit else None)
+            rows = older + rows
+        return rows[-limit:] if limit else rows
 
     def save_history(self, path: str | None = None):
+        db_path = self._db_path(path)
+        if db_path is not None:
+            get_store(db_path).replace_all(self.history_manager.list())
+            return
         try:
-            import pandas as pd
-            df = self.history_manager.to_dataframe()
             save_path = path or self.config.history_file
-            df.to_csv(save_path, index=False, encoding=self.config.default_encoding)
+            data = to_csv_bytes(self.history_manager.list(), encoding=self.config.default_encoding)
+            atomic_write(save_path, data)
+            # the CSV now holds the full history; logged rows are redundant
+            get_wal(save_path).truncate()
         except Exception as e:
             raise PersistenceError(f"Failed to save history: {e}")
 
+    def export_history(self, path: str, fmt: str | None = None):
+        """Write the history as CSV or JSON Lines (format from ``fmt`` or the extension)."""
+        fmt = (fmt or os.path.splitext(path)[1].lstrip(".") or "csv").lower()
+        if fmt not in ("csv", "jsonl"):
+            raise PersistenceError(f"Unsupported export format: {fmt}")
+        try:
+            calcs = self.history_manager.list()
+            if fmt == "csv":
+                data = to_csv_bytes(calcs, encoding=self.config.default_encoding)
+            else:
+                data = to_jsonl_bytes(calcs)
+            atomic_write(path, data)
+        except Exception as e:
+            raise PersistenceError(f"Failed to export history: {e}")
+
     def load_history(self, path: str | None = None):
         try:
+            db_path = self._db_path(path)
+            if db_path is not None:
+                # only the rows that fit in memory are read
+                rows = get_store(db_path).query(limit=self.config.max_history_size)
+                self.history_manager.clear()
+                self.history_manager.extend(rows)
+                self._caretaker.clear()
+                self._caretaker.save(self.history_manager.list())
+                self._emit("load")
+                return
+
             import pandas as pd
             load_path = path or self.config.history_file
             
             # Create directory if it doesn't exist
             os.makedirs(os.path.dirname(load_path), exist_ok=True)
             
-            if not os.path.exists(load_path):
+            if self._use_parallel_load(load_path):
+                self._load_parallel(load_path)
+                return
+            if os.path.exists(load_path):
+                df = pd.read_csv(load_path, encoding=self.config.default_encoding)
+            else:
                 # Create an empty history file
-                df = pd.DataFrame(columns=['operation', 'operand_1', 'operand_2', 'result', 'timestamp'])
-                df.to_csv(load_path, index=False, encoding=self.config.default_encoding)
-                return  # nothing to load yet
-                
-            df = pd.read_csv(load_path, encoding=self.config.default_encoding)
-            if not df.empty:  # Only load if there's actual data
+                df = pd.DataFrame(columns=list(COLUMNS))
+                atomic_write(load_path, df.to_csv(index=False).encode(self.config.default_encoding))
+
+            # recover rows that were logged but not yet checkpointed
+            last_row = df.iloc[-1].to_dict() if not df.empty else None
+            logged = unapplied_records(get_wal(load_path).replay(), last_row)
+
+            if not df.empty or logged:  # Only load if there's actual data
                 self.history_manager.load_from_dataframe(df)
+                self.history_manager.extend(Calculation.from_dict(r) for r in logged)
                 # after loading, we should clear undo/redo history and save a snapshot
                 self._caretaker.clear()
                 self._caretaker.save(self.history_manager.list())
         except Exception as e:
             raise PersistenceError(f"Failed to load history: {e}")
+        self._emit("load")
+
+    def _use_parallel_load(self, path: str) -> bool:
+        workers = self.config.load_workers or os.cpu_count() or 1
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return False
+        return workers > 1 and size >= self.config.parallel_load_min_bytes
+
+    def _load_parallel(self, path: str):
+        """``load_history`` for large files: rows parsed across processes."""
+        calcs = read_history_parallel(path, self.config.load_workers or None, self.config.default_encoding)
+        last_row = calcs[-1].to_dict() if calcs else None
+        logged = unapplied_records(get_wal(path).replay(), last_row)
+        self.history_manager.replace(calcs)
+        self.history_manager.extend(Calculation.from_dict(r) for r in logged)
+        self._caretaker.clear()
+        self._caretaker.save(self.history_manager.list())
+        self._emit("load")
+
+    # ===== Warm restart =====
+    def save_snapshot(self, path: str | None = None):
+        """Write history and undo/redo state to a binary snapshot (see app.snapshot)."""
+        try:
+            snapshot.save_snapshot(self, path)
+        except Exception as e:
+            raise PersistenceError(f"Failed to save snapshot: {e}")
+
+    def restore_state(self, path: str | None = None) -> str:
+        """
+        Restore from the snapshot when it is current, otherwise load the
+        history file. Returns ``"snapshot"`` or ``"history"``.
+        """
+        try:
+            restored = snapshot.load_snapshot(self, path)
+        except Exception:
+            restored = False
+        if restored:
+            self._emit("load")
+            return "snapshot"
+        self.load_history()
+        return "history"
 
     # ===== Undo / Redo using caretaker =====
     def can_undo(self) -> bool:
@@ -138,7 +524,8 @@ class Calculator:
         if prev_snapshot == current_snapshot:
             return None
         # restore
-        self.history_manager._history = prev_snapshot
+        self.history_manager.replace(prev_snapshot)
+        self._emit("undo")
         return self.history_manager.list()
 
     def redo(self) -> Optional[List[Calculation]]:
@@ -148,15 +535,16 @@ class Calculator:
             return None
         if redo_snapshot == current_snapshot:
             return None
-        self.history_manager._history = redo_snapshot
+        self.history_manager.replace(redo_snapshot)
+        self._emit("redo")
         return self.history_manager.list()
 
 
 # CLI / REPL helper (lightweight)
-def repl():
+def repl(config: CalculatorConfig | None = None):
     import sys
 
-    calc = Calculator()
+    calc = Calculator(config) if config is not None else Calculator()
     print("Advanced Calculator REPL. Type 'help' for commands. 'exit' to quit.")
 
     def show_help():
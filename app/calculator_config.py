@@ -16,6 +16,47 @@ class CalculatorConfig:
     precision: int = int(os.getenv("CALCULATOR_PRECISION", "6"))
     max_input_value: float = float(os.getenv("CALCULATOR_MAX_INPUT_VALUE", "1e308"))
     default_encoding: str = os.getenv("CALCULATOR_DEFAULT_ENCODING", "utf-8")
+    numeric_engine: str = os.getenv("CALCULATOR_NUMERIC_ENGINE", "float")
+    decimal_precision: int = int(os.getenv("CALCULATOR_DECIMAL_PRECISION", "28"))
+    decimal_rounding: str = os.getenv("CALCULATOR_DECIMAL_ROUNDING", "ROUND_HALF_EVEN")
+    numeric_fast_path: bool = os.getenv("CALCULATOR_NUMERIC_FAST_PATH", "true").lower() in ("1", "true", "yes")
+    max_undo_depth: int = int(os.getenv("CALCULATOR_MAX_UNDO_DEPTH", "100"))
+    undo_uncompressed: int = int(os.getenv("CALCULATOR_UNDO_UNCOMPRESSED", "5"))
+    undo_spill_dir: str = os.getenv("CALCULATOR_UNDO_SPILL_DIR", "")
+    wal_fsync_batch: int = int(os.getenv("CALCULATOR_WAL_FSYNC_BATCH", "16"))
+    wal_fsync_interval: float = float(os.getenv("CALCULATOR_WAL_FSYNC_INTERVAL", "1.0"))
+    wal_checkpoint_every: int = int(os.getenv("CALCULATOR_WAL_CHECKPOINT_EVERY", "100"))
+    max_sessions: int = int(os.getenv("CALCULATOR_MAX_SESSIONS", "256"))
+    session_dir: str = os.getenv("CALCULATOR_SESSION_DIR", "data/sessions")
+    log_max_bytes: int = int(os.getenv("CALCULATOR_LOG_MAX_BYTES", "5000000"))
+    log_backup_count: int = int(os.getenv("CALCULATOR_LOG_BACKUP_COUNT", "3"))
+    log_compression: str = os.getenv("CALCULATOR_LOG_COMPRESSION", "gzip")
+    log_retention_days: float = float(os.getenv("CALCULATOR_LOG_RETENTION_DAYS", "0"))
+    log_format: str = os.getenv("CALCULATOR_LOG_FORMAT", "text")
+    history_backend: str = os.getenv("CALCULATOR_HISTORY_BACKEND", "csv")
+    history_db: str = os.getenv("CALCULATOR_HISTORY_DB", "data/history.db")
+    sqlite_pool_size: int = int(os.getenv("CALCULATOR_SQLITE_POOL_SIZE", "4"))
+    snapshot_file: str = os.getenv("CALCULATOR_SNAPSHOT_FILE", "data/calculator.snapshot")
+    snapshot_every: int = int(os.getenv("CALCULATOR_SNAPSHOT_EVERY", "0"))
+    shared_history: str = os.getenv("CALCULATOR_SHARED_HISTORY", "")
+    shared_history_capacity: int = int(os.getenv("CALCULATOR_SHARED_HISTORY_CAPACITY", "65536"))
+    load_workers: int = int(os.getenv("CALCULATOR_LOAD_WORKERS", "1"))
+    parallel_load_min_bytes: int = int(os.getenv("CALCULATOR_PARALLEL_LOAD_MIN_BYTES", "67108864"))
+    history_archive_dir: str = os.getenv("CALCULATOR_HISTORY_ARCHIVE_DIR", "")
+    archive_segment_rows: int = int(os.getenv("CALCULATOR_ARCHIVE_SEGMENT_ROWS", "50000"))
+    sketch_k: int = int(os.getenv("CALCULATOR_SKETCH_K", "200"))
+    event_stream: str = os.getenv("CALCULATOR_EVENT_STREAM", "")
+    event_stream_flush_every: int = int(os.getenv("CALCULATOR_EVENT_STREAM_FLUSH_EVERY", "64"))
+    event_stream_flush_interval: float = float(os.getenv("CALCULATOR_EVENT_STREAM_FLUSH_INTERVAL", "0.5"))
+    event_stream_socket: str = os.getenv("CALCULATOR_EVENT_STREAM_SOCKET", "")
+    memory_budget_mb: float = float(os.getenv("CALCULATOR_MEMORY_BUDGET_MB", "0"))
+    memory_policy: str = os.getenv("CALCULATOR_MEMORY_POLICY", "trim_undo,shrink_caches,spill_history")
+    memory_check_every: int = int(os.getenv("CALCULATOR_MEMORY_CHECK_EVERY", "100"))
+    memory_tracemalloc: bool = os.getenv("CALCULATOR_MEMORY_TRACEMALLOC", "false").lower() in ("1", "true", "yes")
+    rollup_resolutions: str = os.getenv("CALCULATOR_ROLLUP_RESOLUTIONS", "")
+    rollup_flush_every: int = int(os.getenv("CALCULATOR_ROLLUP_FLUSH_EVERY", "256"))
+    profile_interval: float = float(os.getenv("CALCULATOR_PROFILE_INTERVAL", "0.005"))
+    plugins_dir: str = os.getenv("CALCULATOR_PLUGINS_DIR", "plugins")
 
     def ensure_dirs(self):
         os.makedirs(self.log_dir, exist_ok=True)
@@ -1,28 +1,152 @@
 # app/calculator_memento.py
+from collections import deque
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional
 from .calculation import Calculation
-import copy
+from .calculator_config import CalculatorConfig
+import os
+import pickle
+import uuid
+import zlib
+
+cfg = CalculatorConfig()
 
 
 @dataclass
 class Memento:
-    history_snapshot: List[Calculation]
+    """
+    A saved history snapshot: a live list, a delta against the next newer
+    memento (``head`` rows followed by the first ``shared`` rows of
+    ``base``), or packed (pickled + zlib) and optionally spilled to a file.
+    ``restore`` returns the list in every case.
+    """
+    history_snapshot: Optional[List[Calculation]]
+    packed: Optional[bytes] = None
+    path: Optional[str] = None
+    base: Optional["Memento"] = None
+    head: Optional[List[Calculation]] = None
+    shared: int = 0
+
+    def restore(self) -> List[Calculation]:
+        if self.history_snapshot is not None:
+            return self.history_snapshot
+        if self.base is not None:
+            return self.head + self.base.restore()[: self.shared]
+        data = self.packed
+        if data is None:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        return pickle.loads(zlib.decompress(data))
+
+    def compress(self, spill_dir: str | None = None):
+        if self.history_snapshot is None:
+            return
+        data = zlib.compress(pickle.dumps(self.history_snapshot, pickle.HIGHEST_PROTOCOL), 1)
+        if spill_dir:
+            path = os.path.join(spill_dir, f"memento-{uuid.uuid4().hex}.bin")
+            with open(path, "wb") as f:
+                f.write(data)
+            self.path = path
+        else:
+            self.packed = data
+        self.history_snapshot = None
+
+    def rebase(self, newer: "Memento") -> bool:
+        """
+        Turn a live snapshot into a delta against ``newer`` when its rows are
+        a few leading rows plus a prefix of ``newer``'s -- what consecutive
+        snapshots of an appended-to, front-trimmed history look like.
+        """
+        rows, newer_rows = self.history_snapshot, newer.history_snapshot
+        if rows is None or newer_rows is None:
+            return False
+        if newer_rows:
+            first = newer_rows[0]
+            start = next((i for i, c in enumerate(rows) if c is first), len(rows))
+        else:
+            start = len(rows)
+        shared = min(len(rows) - start, len(newer_rows))
+        # list equality checks identity first, so shared rows compare cheaply
+        if not shared or start + shared != len(rows) or rows[start:] != newer_rows[:shared]:
+            return False
+        self.head, self.shared, self.base = rows[:start], shared, newer
+        self.history_snapshot = None
+        return True
+
+    def materialize(self):
+        """Resolve a delta into a live list (before its base goes away)."""
+        if self.base is not None:
+            self.history_snapshot = self.restore()
+            self.base = self.head = None
+            self.shared = 0
+
+    def discard(self):
+        """Release the snapshot, removing any spill file."""
+        if self.path:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+        self.history_snapshot = self.packed = self.path = self.base = self.head = None
 
 
 class Caretaker:
     """
     Manages undo/redo stacks using saved snapshots of history.
-    Stores deep copies to preserve immutability of snapshots.
+    Snapshots are list copies; the ``Calculation`` records in them are
+    immutable and shared with the live history (a deep copy would return the
+    same instances anyway, at the cost of a per-row memo walk).
+
+    Each stack holds at most ``max_depth`` mementos (0 = unbounded; the oldest
+    are dropped). Pushing a snapshot turns the previous top into a delta
+    against it, so a step that appended a row costs a list copy and a pass
+    of identity checks rather than a pickle of the whole history. Snapshots
+    that are not deltas (after a clear, load or undo) and have left the
+    newest ``keep_uncompressed`` are compressed, and written to
+    ``spill_dir`` when it is set. The top of each stack is always a live list.
     """
-    def __init__(self):
-        self._undo_stack: list[Memento] = []
-        self._redo_stack: list[Memento] = []
+    def __init__(
+        self,
+        max_depth: int | None = None,
+        keep_uncompressed: int | None = None,
+        spill_dir: str | None = None,
+    ):
+        self._max_depth = cfg.max_undo_depth if max_depth is None else max_depth
+        self._keep_uncompressed = cfg.undo_uncompressed if keep_uncompressed is None else keep_uncompressed
+        self._spill_dir = cfg.undo_spill_dir if spill_dir is None else spill_dir
+        if self._spill_dir:
+            os.makedirs(self._spill_dir, exist_ok=True)
+        self._undo_stack: deque[Memento] = deque()
+        self._redo_stack: deque[Memento] = deque()
+
+    def _push(self, stack: deque, snapshot: list[Calculation]):
+        memento = Memento(list(snapshot))
+        if stack:
+            stack[-1].rebase(memento)
+        stack.append(memento)
+        # enforce max depth: drop oldest (nothing is a delta against it)
+        while self._max_depth and len(stack) > self._max_depth:
+            stack.popleft().discard()
+        # mementos only age by one step per push, so packing the one that
+        # just left the uncompressed window keeps all older ones packed;
+        # deltas are left alone, they hold only their leading rows
+        index = len(stack) - 1 - self._keep_uncompressed
+        if index >= 0:
+            stack[index].compress(self._spill_dir)
+
+    @staticmethod
+    def _pop(stack: deque) -> List[Calculation]:
+        top = stack.pop()
+        if stack:
+            stack[-1].materialize()
+        snapshot = top.restore()
+        top.discard()
+        return snapshot
 
     def save(self, history_snapshot: list[Calculation]):
         """Push a snapshot; clear the redo stack."""
-        self._undo_stack.append(Memento(copy.deepcopy(history_snapshot)))
-        self._redo_stack.clear()
+        self._push(self._undo_stack, history_snapshot)
+        self._clear_stack(self._redo_stack)
 
     def can_undo(self) -> bool:
         return len(self._undo_stack) > 0
@@ -37,19 +161,101 @@ class Caretaker:
         """
         if not self.can_undo():
             return None
-        top = self._undo_stack.pop()
+        snapshot = self._pop(self._undo_stack)
         # push current to redo (so redo can restore it)
-        self._redo_stack.append(Memento(copy.deepcopy(current_snapshot)))
-        return top.history_snapshot
+        self._push(self._redo_stack, current_snapshot)
+        return snapshot
 
     def redo(self, current_snapshot: list[Calculation]):
         if not self.can_redo():
             return None
-        top = self._redo_stack.pop()
+        snapshot = self._pop(self._redo_stack)
         # push current to undo so we can undo the redo
-        self._undo_stack.append(Memento(copy.deepcopy(current_snapshot)))
-        return top.history_snapshot
+        self._push(self._undo_stack, current_snapshot)
+        return snapshot
+
+    def _clear_stack(self, stack: deque):
+        for memento in stack:
+            memento.discard()
+        stack.clear()
 
     def clear(self):
-        self._undo_stack.clear()
-        self._redo_stack.clear()
+        self._clear_stack(self._undo_stack)
+        self._clear_stack(self._redo_stack)
+
+    def export_state(self) -> dict:
+        """
+        Both stacks as plain data for a snapshot: live mementos and deltas as
+        lists, packed or spilled ones as their compressed bytes.
+        """
+        def dump(stack: deque) -> list:
+            out, newer = [], None
+            # newest first, so each delta resolves against the list just built
+            for memento in reversed(stack):
+                if memento.base is not None:
+                    rows = newer if newer is not None else memento.base.restore()
+                    newer = memento.head + rows[: memento.shared]
+                    out.append(newer)
+                elif memento.history_snapshot is not None:
+                    newer = memento.history_snapshot
+                    out.append(newer)
+                elif memento.packed is not None:
+                    newer = None
+                    out.append(memento.packed)
+                else:
+                    newer = None
+                    with open(memento.path, "rb") as f:
+                        out.append(f.read())
+            out.reverse()
+            return out
+
+        return {"undo": dump(self._undo_stack), "redo": dump(self._redo_stack)}
+
+    def import_state(self, state: dict):
+        """Replace both stacks with ``export_state`` output."""
+        self.clear()
+        for name, stack in (("undo", self._undo_stack), ("redo", self._redo_stack)):
+            for item in state.get(name, ()):
+                if isinstance(item, bytes):
+                    stack.append(Memento(None, packed=item))
+                else:
+                    stack.append(Memento(list(item)))
+            while self._max_depth and len(stack) > self._max_depth:
+                stack.popleft().discard()
+            for older, newer in zip(list(stack), list(stack)[1:]):
+                older.rebase(newer)
+            for memento in list(stack)[: max(len(stack) - self._keep_uncompressed, 0)]:
+                memento.compress(self._spill_dir)
+
+    def packed_bytes(self) -> int:
+        """Bytes held by compressed (in-memory) mementos."""
+        return sum(len(m.packed) for m in (*self._undo_stack, *self._redo_stack) if m.packed)
+
+    def mementos(self) -> List[Memento]:
+        return [*self._undo_stack, *self._redo_stack]
+
+    @property
+    def max_depth(self) -> int:
+        return self._max_depth
+
+    def pack_all(self) -> int:
+        """
+        Compress every live memento except the newest undo step, and keep
+        doing so for new ones. Returns how many were packed.
+        """
+        live = [m for m in self.mementos() if m.history_snapshot is not None]
+        newest = self._undo_stack[-1] if self._undo_stack else None
+        packed = 0
+        for memento in live:
+            if memento is not newest:
+                memento.compress(self._spill_dir)
+                packed += 1
+        self._keep_uncompressed = min(self._keep_uncompressed, 1)
+        return packed
+
+    def limit_depth(self, max_depth: int):
+        """Lower the undo/redo depth, dropping the oldest mementos beyond it."""
+        self._max_depth = max(1, max_depth)
+        for stack in (self._undo_stack, self._redo_stack):
+            while len(stack) > self._max_depth:
+                stack.popleft().discard()
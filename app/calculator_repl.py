@@ -10,32 +10,43 @@ managing history, and demonstrating the calculator’s design patterns.
 Supported Commands:
 -------------------
 add, subtract, multiply, divide, power, root, modulus, int_divide, percent, abs_diff – Perform calculations.
+sum, product, min, max, mean, cumsum, cumprod, cummin, cummax – Reduce any number of operands.
+eval – Evaluate an infix expression, optionally with variables.
 history – Display calculation history.
 clear – Clear calculation history.
 undo – Undo the last calculation.
 redo – Redo the last undone calculation.
 save – Manually save calculation history to file using pandas.
 load – Load calculation history from file using pandas.
+export – Export calculation history as CSV or JSON Lines.
+stats – Show result and compute-time quantiles per operation.
+memory – Show memory used by history, undo state and caches.
+profile – Profile the session (profile start / profile stop [file]).
 help – Display available commands.
 exit – Exit the application gracefully.
 """
 
+import os
+
 from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
 from app.exceptions import OperationError, ValidationError
 from app.input_validators import validate_numeric_pair
+from app.operations import OperationFactory
+from app.reductions import ACCUMULATIONS, is_reduction
 from colorama import Fore, Style, init
 
 # Initialize colorama for color support (works on Windows and UNIX)
 init(autoreset=True)
 
 
-def calculator_repl():
+def calculator_repl(config: CalculatorConfig | None = None):
     """Main interactive REPL loop for the Calculator."""
-    calc = Calculator()
+    calc = Calculator(config) if config is not None else Calculator()
 
-    # Load existing history at startup
+    # Restore the last session (snapshot, or the history file when stale)
     try:
-        calc.load_history()
+        calc.restore_state()
     except Exception as e:
         print(f"{Fore.YELLOW}Note: Could not load previous history: {e}")
 
@@ -56,6 +67,8 @@ def calculator_repl():
                 try:
                     calc.save_history()
                     print(f"{Fore.GREEN}History saved successfully before exit.")
+                    # taken after the save so it matches the file on disk
+                    calc.save_snapshot()
                 except Exception as e:
                     print(f"{Fore.YELLOW}Warning: Could not save history: {e}")
                 print(f"{Fore.CYAN}Goodbye!")
@@ -76,6 +89,9 @@ def calculator_repl():
 {Fore.YELLOW}int_divide a b{Fore.WHITE}    → Integer division
 {Fore.YELLOW}percent a b{Fore.WHITE}       → (a / b) * 100
 {Fore.YELLOW}abs_diff a b{Fore.WHITE}      → |a - b|
+{Fore.YELLOW}sum a b c ...{Fore.WHITE}     → Sum any number of operands (also product, min, max, mean)
+{Fore.YELLOW}cumsum a b c ...{Fore.WHITE}  → Running sums (also cumprod, cummin, cummax)
+{Fore.YELLOW}eval expr [with x=1 y=2]{Fore.WHITE} → Evaluate e.g. (x + y) * 3
 -------------------
 {Fore.MAGENTA}history{Fore.WHITE}           → Show calculation history
 {Fore.MAGENTA}clear{Fore.WHITE}             → Clear calculation history
@@ -83,9 +99,17 @@ def calculator_repl():
 {Fore.MAGENTA}redo{Fore.WHITE}              → Redo last undone calculation
 {Fore.MAGENTA}save [path]{Fore.WHITE}       → Save history to CSV file
 {Fore.MAGENTA}load [path]{Fore.WHITE}       → Load history from CSV file
+{Fore.MAGENTA}export path [fmt]{Fore.WHITE} → Export history (csv or jsonl)
+{Fore.MAGENTA}stats [operation]{Fore.WHITE} → Result and timing quantiles (p50/p99)
+{Fore.MAGENTA}memory{Fore.WHITE}            → Memory used by history, undo state and caches
+{Fore.MAGENTA}profile start{Fore.WHITE}     → Start profiling calculator code
+{Fore.MAGENTA}profile stop [file]{Fore.WHITE} → Show hotspots, write collapsed stacks (flamegraph input)
 {Fore.MAGENTA}help{Fore.WHITE}              → Show this help message
 {Fore.MAGENTA}exit{Fore.WHITE}              → Exit the program
 """)
+                plugins = OperationFactory.registry.plugin_names()
+                if plugins:
+                    print(f"{Fore.CYAN}Plugin operations: {Fore.YELLOW}{', '.join(plugins)}\n")
 
             # History commands
             elif command == "history":
@@ -125,12 +149,81 @@ def calculator_repl():
                 calc.load_history(path)
                 print(f"{Fore.GREEN}History loaded successfully.")
 
+            elif command == "eval":
+                source = command_line[len(parts[0]):].strip()
+                if not source:
+                    print(f"{Fore.RED}Error: eval requires an expression (e.g., eval (1 + 2) * 3)")
+                    continue
+
+                source, _, bindings = source.partition(" with ")
+                variables = {}
+                for binding in bindings.replace(",", " ").split():
+                    name, sep, value = binding.partition("=")
+                    if not sep:
+                        raise ValidationError(f"Invalid variable binding: {binding!r}")
+                    variables[name.strip()] = value.strip()
+
+                result_calc = calc.evaluate(source, variables)
+                print(f"{Fore.GREEN}Result: {Fore.WHITE}{result_calc.result}")
+
+            elif command == "export":
+                if len(parts) < 2:
+                    print(f"{Fore.RED}Error: export requires a path (e.g., export history.jsonl)")
+                    continue
+                fmt = parts[2] if len(parts) > 2 else None
+                calc.export_history(parts[1], fmt)
+                print(f"{Fore.GREEN}History exported to {parts[1]}.")
+
+            elif command == "stats":
+                operations = parts[1:] or calc.stats.operations()
+                if not operations:
+                    print(f"{Fore.YELLOW}No calculations yet.")
+                    continue
+                print(f"{Fore.CYAN}\n{'operation':<12} {'count':>8} {'p50':>14} {'p99':>14} {'p50 µs':>9} {'p99 µs':>9}")
+                for op in operations:
+                    r50, r99 = calc.quantiles((0.5, 0.99), op)
+                    l50, l99 = calc.quantiles((0.5, 0.99), op, kind="latency")
+                    if l50 is None:
+                        print(f"{Fore.WHITE}{op:<12} {0:>8}")
+                        continue
+                    results = "".join(f" {'-' if v is None else f'{v:.6g}':>14}" for v in (r50, r99))
+                    print(f"{Fore.WHITE}{op:<12} {calc.stats.count(op):>8}{results} {l50 * 1e6:>9.1f} {l99 * 1e6:>9.1f}")
+
+            elif command == "memory":
+                print(f"{Fore.CYAN}Memory: {Fore.WHITE}{calc.memory_usage()}")
+                governor = calc.memory_governor
+                if governor is not None:
+                    print(f"{Fore.CYAN}Budget: {Fore.WHITE}{governor.budget / 2**20:.1f} MiB ({', '.join(governor.policy)})")
+                    if governor.last_report is not None:
+                        print(f"{Fore.YELLOW}{governor.last_report}")
+
+            elif command == "profile":
+                action = parts[1].lower() if len(parts) > 1 else ""
+                if action == "start":
+                    calc.start_profiling()
+                    print(f"{Fore.GREEN}Profiling started; run some commands, then 'profile stop [file]'.")
+                elif action == "stop":
+                    path = parts[2] if len(parts) > 2 else os.path.join(calc.config.log_dir, "profile.folded")
+                    report = calc.stop_profiling(path)
+                    print(f"{Fore.WHITE}{report.summary()}")
+                    print(f"{Fore.GREEN}Collapsed stacks written to {path}.")
+                else:
+                    print(f"{Fore.RED}Error: use 'profile start' or 'profile stop [file]'")
+
+            # N-ary reductions
+            elif is_reduction(command):
+                if len(parts) < 2:
+                    print(f"{Fore.RED}Error: {command} requires at least one operand (e.g., {command} 1 2 3)")
+                    continue
+                if command in ACCUMULATIONS:
+                    result_calc, running = calc.accumulate(command, parts[1:])
+                    print(f"{Fore.GREEN}Running: {Fore.WHITE}{', '.join(str(v) for v in running)}")
+                else:
+                    result_calc = calc.reduce(command, parts[1:])
+                print(f"{Fore.GREEN}Result: {Fore.WHITE}{result_calc.result}")
+
             # Arithmetic commands
-            elif command in (
-                "add", "subtract", "multiply", "divide",
-                "power", "root", "modulus", "int_divide",
-                "percent", "abs_diff",
-            ):
+            elif OperationFactory.supports(command):
                 if len(parts) != 3:
                     print(f"{Fore.RED}Error: Operation requires two operands (e.g., add 2 3)")
                     continue
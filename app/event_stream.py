@@ -0,0 +1,343 @@
+# app/event_stream.py
+"""
+Machine-readable event stream for downstream consumers.
+
+``EventStreamObserver`` writes one JSON object per line for every
+calculator event, so consumers no longer have to parse the text log:
+
+    {"seq":41,"event":"perform","operation":"add","result":4.0,...}
+    {"seq":42,"event":"undo","time":"2026-...","history_size":3}
+
+``seq`` increases by one per record and continues across restarts (it is
+read back from the end of the file). Lines are buffered and written every
+``flush_every`` records, and one background thread shared by all open
+streams flushes whatever is buffered every ``flush_interval`` seconds, so
+an idle stream is never behind by more than that.
+
+``EventStreamReader`` tails the file from a byte offset (or after a given
+``seq``) and only returns complete lines; persist ``reader.offset`` to
+resume where a consumer left off.
+
+With ``socket_path`` set, records are also sent as they happen to clients
+connected to a local Unix socket (``subscribe`` is a client). A client
+that cannot keep up is disconnected rather than slowing the calculator;
+it can catch up from the file.
+"""
+import atexit
+import json
+import os
+import socket
+import threading
+import weakref
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Sequence
+from .calculation import Calculation
+from .calculator_config import CalculatorConfig
+from .exceptions import PersistenceError
+from .logger import EVENTS
+
+cfg = CalculatorConfig()
+
+# compact JSON; exact results (Decimal, Fraction) are written as strings
+_encode = json.JSONEncoder(default=str, separators=(",", ":")).encode
+
+# bytes read back from the end of an existing stream to find the last seq
+_TAIL_BYTES = 64 * 1024
+
+
+def _last_seq(path: str) -> int:
+    """Sequence number of the last complete record in ``path`` (0 when none)."""
+    try:
+        with open(path, "rb") as f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(max(0, size - _TAIL_BYTES))
+            tail = f.read()
+    except FileNotFoundError:
+        return 0
+    for line in reversed(tail.split(b"\n")):
+        try:
+            return int(json.loads(line)["seq"])
+        except (ValueError, KeyError, TypeError):
+            continue
+    return 0
+
+
+class _SocketFanout:
+    """Unix socket server that pushes each record line to every connected client."""
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.exists(path):
+            os.remove(path)  # left behind by a previous run
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(path)
+        self._server.listen()
+        self._clients: List[socket.socket] = []
+        self._lock = threading.Lock()
+        self.dropped = 0
+        threading.Thread(target=self._accept, name="event-stream-accept", daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                client, _ = self._server.accept()
+            except OSError:
+                return  # server closed
+            client.setblocking(False)
+            with self._lock:
+                self._clients.append(client)
+
+    @property
+    def clients(self) -> int:
+        return len(self._clients)
+
+    def send(self, data: bytes):
+        with self._lock:
+            for client in list(self._clients):
+                try:
+                    sent = client.send(data)
+                except (BlockingIOError, OSError):
+                    sent = -1
+                if sent != len(data):
+                    # a partial line would corrupt the client's stream
+                    self._clients.remove(client)
+                    self.dropped += 1
+                    client.close()
+
+    def close(self):
+        self._server.close()
+        with self._lock:
+            for client in self._clients:
+                client.close()
+            self._clients.clear()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class _Flusher:
+    """
+    One daemon thread flushing every open stream, at the shortest of their
+    ``flush_interval``s. Streams are held weakly and leave on ``close``; the
+    thread exits when none are left.
+    """
+
+    def __init__(self):
+        self._streams: "weakref.WeakSet[EventStreamObserver]" = weakref.WeakSet()
+        self._wake = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+    def add(self, stream: "EventStreamObserver"):
+        with self._wake:
+            self._streams.add(stream)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="event-stream-flush", daemon=True)
+                self._thread.start()
+            self._wake.notify()  # the new stream's interval may be shorter
+
+    def discard(self, stream: "EventStreamObserver"):
+        with self._wake:
+            self._streams.discard(stream)
+            self._wake.notify()
+
+    def _interval(self) -> float | None:
+        with self._wake:
+            intervals = [s.flush_interval for s in self._streams]
+            if not intervals:
+                self._thread = None
+                return None
+            return min(intervals)
+
+    def _run(self):
+        while True:
+            interval = self._interval()
+            if interval is None:
+                return
+            with self._wake:
+                self._wake.wait(interval)
+            self._flush_all()
+
+    def _streams_now(self) -> list:
+        with self._wake:
+            return list(self._streams)
+
+    def _flush_all(self):
+        # a method of its own so no stream stays referenced while waiting
+        for stream in self._streams_now():
+            try:
+                stream.flush()
+            except PersistenceError:
+                pass  # the buffer is kept and retried on the next tick
+
+    def close_all(self):
+        for stream in self._streams_now():
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+
+_flusher = _Flusher()
+atexit.register(_flusher.close_all)
+
+
+class EventStreamObserver:
+    """Observer that appends sequence-numbered JSON Lines events to ``path``."""
+    events = EVENTS
+
+    def __init__(
+        self,
+        path: str | None = None,
+        flush_every: int | None = None,
+        flush_interval: float | None = None,
+        socket_path: str | None = None,
+    ):
+        self.path = path or cfg.event_stream
+        self.flush_every = flush_every or cfg.event_stream_flush_every
+        self.flush_interval = cfg.event_stream_flush_interval if flush_interval is None else flush_interval
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._drop_torn_tail()
+        self.seq = _last_seq(self.path)
+        self._buffer: List[bytes] = []
+        self._lock = threading.Lock()
+        try:
+            self._file = open(self.path, "ab")
+            socket_path = cfg.event_stream_socket if socket_path is None else socket_path
+            self._fanout = _SocketFanout(socket_path) if socket_path else None
+        except OSError as e:
+            raise PersistenceError(f"Failed to open event stream {self.path}: {e}")
+        self._closed = False
+        if self.flush_interval > 0:
+            _flusher.add(self)
+
+    def _drop_torn_tail(self):
+        # a crash mid-flush leaves a partial last line; cut it so new records
+        # start on a fresh line
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb+") as f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(max(0, size - _TAIL_BYTES))
+            tail = f.read()
+            if tail and not tail.endswith(b"\n"):
+                f.truncate(size - len(tail) + tail.rfind(b"\n") + 1)
+
+    # ===== Observer interface =====
+    def update(self, calculation: Calculation) -> None:
+        self.update_many((calculation,))
+
+    def update_many(self, calculations: Sequence[Calculation]) -> None:
+        with self._lock:
+            out = []
+            for calc in calculations:
+                self.seq += 1
+                record = calc.to_dict()
+                # the stream's own seq (the calculation's is not part of the event)
+                record = {"seq": self.seq, "event": "perform", **{k: v for k, v in record.items() if k != "seq"}}
+                out.append(_encode(record).encode("utf-8") + b"\n")
+            self._add_locked(out)
+
+    def on_event(self, event: str, history) -> None:
+        with self._lock:
+            self.seq += 1
+            record = {
+                "seq": self.seq,
+                "event": event,
+                "time": datetime.now(timezone.utc).isoformat(),
+                "history_size": len(history),
+            }
+            self._add_locked([_encode(record).encode("utf-8") + b"\n"])
+
+    # ===== Buffering =====
+    def _add_locked(self, lines: List[bytes]):
+        if self._fanout is not None and self._fanout.clients:
+            self._fanout.send(b"".join(lines))
+        self._buffer.extend(lines)
+        if len(self._buffer) >= self.flush_every:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._buffer or self._file.closed:
+            return
+        try:
+            self._file.write(b"".join(self._buffer))
+            self._file.flush()
+        except OSError as e:
+            raise PersistenceError(f"Failed to write event stream: {e}")
+        self._buffer.clear()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            _flusher.discard(self)
+            self._flush_locked()
+            self._file.close()
+            if self._fanout is not None:
+                self._fanout.close()
+
+
+class EventStreamReader:
+    """
+    Tails an event stream. ``poll`` returns the complete records written
+    since the last call; ``offset`` is the byte position to resume from.
+    """
+
+    def __init__(self, path: str, offset: int = 0, after_seq: Optional[int] = None):
+        self.path = path
+        self.offset = offset
+        self._after_seq = after_seq
+
+    def poll(self, max_bytes: int = 1 << 20) -> List[dict]:
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                data = f.read(max_bytes)
+        except FileNotFoundError:
+            return []
+        end = data.rfind(b"\n") + 1  # a partial line is read again next time
+        if end == 0 and len(data) == max_bytes:
+            raise PersistenceError(f"Event record at offset {self.offset} is longer than {max_bytes} bytes")
+        self.offset += end
+        records = [json.loads(line) for line in data[:end].splitlines() if line]
+        if self._after_seq is not None:
+            records = [r for r in records if r["seq"] > self._after_seq]
+            if records:
+                self._after_seq = None
+        return records
+
+    def __iter__(self) -> Iterator[dict]:
+        """Every complete record currently in the stream, from ``offset`` on."""
+        while True:
+            start = self.offset
+            yield from self.poll()
+            if self.offset == start:
+                return
+
+
+def subscribe(socket_path: str, timeout: float | None = None) -> Iterator[dict]:
+    """Yield records pushed over an event stream's Unix socket, as they happen."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        try:
+            sock.connect(socket_path)
+        except OSError as e:
+            raise PersistenceError(f"Failed to connect to event stream {socket_path}: {e}")
+        pending = b""
+        while True:
+            try:
+                chunk = sock.recv(65536)
+            except socket.timeout:
+                return
+            if not chunk:
+                return
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                yield json.loads(line)
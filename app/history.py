@@ -2,23 +2,47 @@
 from typing import List
 from .calculation import Calculation
 from .calculator_config import CalculatorConfig
+from .serialization import to_columns
 
 cfg = CalculatorConfig()
 
 
 class HistoryManager:
-    def __init__(self, max_size: int | None = None):
+    def __init__(self, max_size: int | None = None, shared=None, archive=None):
+        """
+        ``shared`` is an optional ``SharedHistoryRing``; new calculations are
+        published to it for readers in other processes. ``archive`` is an
+        optional ``HistoryArchive`` that receives rows evicted by the size limit.
+        """
         self._history: List[Calculation] = []
         self._max_size = max_size or cfg.max_history_size
+        self._shared = shared
+        self.archive = archive
+
+    def _trim(self):
+        # enforce max size: drop oldest (into the archive when there is one)
+        excess = len(self._history) - self._max_size
+        if excess > 0:
+            if self.archive is not None:
+                self.archive.append(self._history[:excess], writer=self)
+            self._history = self._history[excess:]
 
     def append(self, calc: Calculation):
         self._history.append(calc)
-        # enforce max size: drop oldest
-        if len(self._history) > self._max_size:
-            self._history = self._history[-self._max_size :]
+        if self._shared is not None:
+            self._shared.publish(calc)
+        self._trim()
 
     def clear(self):
         self._history.clear()
+        if self._shared is not None:
+            self._shared.reset()
+
+    def replace(self, calcs: List[Calculation]):
+        """Swap in another history (undo/redo, restores)."""
+        self._history = list(calcs)
+        if self._shared is not None:
+            self._shared.reset(self._history)
 
     def list(self):
         return list(self._history)  # return shallow copy
@@ -26,21 +50,32 @@ class HistoryManager:
     def to_dataframe(self):
         # Deferred import so module doesn't require pandas unless saving happens
         import pandas as pd
-        rows = [c.to_dict() for c in self._history]
-        return pd.DataFrame(rows)
+        return pd.DataFrame(to_columns(self._history))
 
     def load_from_dataframe(self, df):
         # Expect df to have operation, operand_1, operand_2, result, timestamp
-        from datetime import datetime
-        self._history = []
-        for _, row in df.iterrows():
-            op = row.get("operation")
-            a = float(row.get("operand_1"))
-            b = float(row.get("operand_2"))
-            result = row.get("result")
-            ts_raw = row.get("timestamp")
-            ts = datetime.fromisoformat(ts_raw) if isinstance(ts_raw, str) else ts_raw
-            self._history.append(Calculation(operation=op, operands=(a, b), result=result, timestamp=ts))
+        self.replace([Calculation.from_dict(row) for row in df.to_dict("records")])
+
+    def extend(self, calcs):
+        """Append several calculations, enforcing max size once."""
+        calcs = list(calcs)
+        self._history.extend(calcs)
+        if self._shared is not None:
+            self._shared.publish_many(calcs)
+        self._trim()
+
+    def spill(self, keep: int) -> int:
+        """
+        Move all but the newest ``keep`` rows to the archive and lower the
+        size limit to ``keep``. Returns the number of rows moved.
+        """
+        if self.archive is None:
+            return 0
+        before = len(self._history)
+        self._max_size = max(1, keep)
+        self._trim()
+        self.archive.flush()
+        return before - len(self._history)
 
     def size(self):
         return len(self._history)
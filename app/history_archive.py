@@ -0,0 +1,253 @@
+# app/history_archive.py
+"""
+Cold tier for history rows evicted from memory.
+
+``HistoryManager`` keeps the newest ``max_history_size`` calculations in
+memory. With an archive attached, the rows it drops are appended to
+gzip-compressed JSON Lines segments in the archive directory instead of
+being lost. Segments are append-only (each flush adds one gzip member) and
+roll over after ``segment_rows`` rows. ``index.json`` lists each segment
+with its row count and first/last timestamp, so time-range queries only
+open the segments that overlap the range.
+
+One ``HistoryArchive`` per directory should exist in a process (use
+``get_archive``): calculators that share a directory, such as the sessions
+of a ``SessionManager``, then append through one buffer and one index.
+"""
+import atexit
+import gzip
+import json
+import os
+import threading
+import weakref
+from collections import deque
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+from .calculation import Calculation, datetime_to_ns
+from .calculator_config import CalculatorConfig
+from .exceptions import PersistenceError
+from .persistence import atomic_write
+from .serialization import decode_exact, to_jsonl_bytes
+
+cfg = CalculatorConfig()
+
+INDEX_FILE = "index.json"
+
+
+def _row_key(calc: Calculation) -> tuple:
+    return (calc.operation, calc.operands, str(calc.result), calc.ts_ns, calc.expression)
+
+
+def _record_ns(record: dict) -> int:
+    return datetime_to_ns(datetime.fromisoformat(record["timestamp"]))
+
+
+class _WriterState:
+    """What one writer archived at its newest timestamp, so a row it evicts
+    twice (e.g. after an undo brought it back) is stored once."""
+
+    __slots__ = ("watermark", "at_watermark")
+
+    def __init__(self, watermark: Optional[int] = None, at_watermark: Optional[set] = None):
+        self.watermark = watermark
+        # None until needed: read back from the last segment after a reopen
+        self.at_watermark = at_watermark
+
+
+class HistoryArchive:
+    def __init__(self, directory: str, segment_rows: int | None = None, flush_rows: int = 256):
+        self.directory = directory
+        self.segment_rows = segment_rows or cfg.archive_segment_rows
+        # evicted rows are written in batches; they are still in the history
+        # CSV until the next save, so a lost buffer is not lost history
+        self.flush_rows = flush_rows
+        self._buffer: List[Calculation] = []
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._index: List[dict] = self._read_index()
+        # rows appended without a writer continue from the archive's newest
+        # row; each writer (a HistoryManager) is tracked on its own, since
+        # writers sharing the archive evict interleaved time ranges
+        last = self._index[-1]["last_ns"] if self._index else None
+        self._default_writer = _WriterState(last, None if last is not None else set())
+        self._writers: "weakref.WeakKeyDictionary[object, _WriterState]" = weakref.WeakKeyDictionary()
+        atexit.register(self.flush)
+
+    # ===== Index =====
+    def _index_path(self) -> str:
+        return os.path.join(self.directory, INDEX_FILE)
+
+    def _read_index(self) -> List[dict]:
+        try:
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                segments = json.load(f)["segments"]
+            for segment in segments:
+                # indexes written before time bounds were kept as integers
+                if "first_ns" not in segment:
+                    first, last = segment.get("first"), segment.get("last")
+                    segment["first_ns"] = datetime_to_ns(datetime.fromisoformat(first)) if first else None
+                    segment["last_ns"] = datetime_to_ns(datetime.fromisoformat(last)) if last else None
+            return segments
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError, KeyError) as e:
+            raise PersistenceError(f"Failed to read history archive index: {e}")
+
+    def _write_index(self):
+        data = json.dumps({"segments": self._index}, indent=1).encode("utf-8")
+        atomic_write(self._index_path(), data)
+
+    def segments(self) -> List[dict]:
+        return [dict(s) for s in self._index]
+
+    def count(self) -> int:
+        return sum(s["rows"] for s in self._index) + len(self._buffer)
+
+    # ===== Writes =====
+    def _fresh(self, calcs: Iterable[Calculation], state: _WriterState) -> List[Calculation]:
+        fresh = []
+        for calc in calcs:
+            ts = calc.ts_ns
+            if state.watermark is not None:
+                if ts < state.watermark:
+                    continue
+                if ts == state.watermark:
+                    if state.at_watermark is None:
+                        state.at_watermark = {
+                            _row_key(c) for c in self._read_segment(self._index[-1]) if c.ts_ns == ts
+                        }
+                    key = _row_key(calc)
+                    if key in state.at_watermark:
+                        continue
+                    state.at_watermark.add(key)
+                    fresh.append(calc)
+                    continue
+            state.watermark = ts
+            state.at_watermark = {_row_key(calc)}
+            fresh.append(calc)
+        return fresh
+
+    def append(self, calcs: Iterable[Calculation], writer: object = None):
+        """
+        Append evicted calculations (oldest first). ``writer`` identifies the
+        history they come from (see ``_WriterState``).
+        """
+        with self._lock:
+            if writer is None:
+                state = self._default_writer
+            else:
+                state = self._writers.get(writer)
+                if state is None:
+                    state = self._writers[writer] = _WriterState(at_watermark=set())
+            self._buffer.extend(self._fresh(calcs, state))
+            if len(self._buffer) >= self.flush_rows:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        calcs, self._buffer = self._buffer, []
+        if not calcs:
+            return
+        try:
+            while calcs:
+                if not self._index or self._index[-1]["rows"] >= self.segment_rows:
+                    name = f"segment-{len(self._index):06d}.jsonl.gz"
+                    self._index.append(
+                        {"file": name, "rows": 0, "bytes": 0, "first": None, "last": None, "first_ns": None, "last_ns": None}
+                    )
+                segment = self._index[-1]
+                take = calcs[: self.segment_rows - segment["rows"]]
+                calcs = calcs[len(take):]
+                # one gzip member per flush; gzip readers concatenate members
+                with open(os.path.join(self.directory, segment["file"]), "ab") as f:
+                    # drop a member left half-written by a crash (not in the index)
+                    f.truncate(segment["bytes"])
+                    f.write(gzip.compress(to_jsonl_bytes(take), compresslevel=6))
+                    f.flush()
+                    os.fsync(f.fileno())
+                    segment["bytes"] = f.tell()
+                segment["rows"] += len(take)
+                # writers sharing the archive interleave, so rows are not in time order
+                first = min(take, key=lambda c: c.ts_ns)
+                last = max(take, key=lambda c: c.ts_ns)
+                if segment["first_ns"] is None or first.ts_ns < segment["first_ns"]:
+                    segment["first"], segment["first_ns"] = first.timestamp.isoformat(), first.ts_ns
+                if segment["last_ns"] is None or last.ts_ns > segment["last_ns"]:
+                    segment["last"], segment["last_ns"] = last.timestamp.isoformat(), last.ts_ns
+            self._write_index()
+        except OSError as e:
+            raise PersistenceError(f"Failed to archive history: {e}")
+
+    # ===== Reads =====
+    def _read_records(self, segment: dict) -> Iterator[dict]:
+        # only the indexed bytes: anything after them is an unfinished flush
+        with open(os.path.join(self.directory, segment["file"]), "rb") as f:
+            data = gzip.decompress(f.read(segment["bytes"]))
+        return (json.loads(line, object_hook=decode_exact) for line in data.splitlines())
+
+    def _read_segment(self, segment: dict) -> Iterator[Calculation]:
+        return map(Calculation.from_dict, self._read_records(segment))
+
+    def iter_rows(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        operation: Optional[str] = None,
+    ) -> Iterator[Calculation]:
+        """
+        Archived calculations, in the order they were archived. Segments
+        outside ``[since, until)`` are skipped, and rows are pre-filtered on
+        their raw fields before any ``Calculation`` is built. Bounds are
+        compared as UTC nanoseconds (naive bounds are taken as UTC).
+        """
+        self.flush()
+        lo = datetime_to_ns(since) if since is not None else None
+        hi = datetime_to_ns(until) if until is not None else None
+        for segment in list(self._index):
+            if not segment["rows"]:
+                continue
+            if lo is not None and segment["last_ns"] < lo:
+                continue
+            if hi is not None and segment["first_ns"] >= hi:
+                continue
+            for record in self._read_records(segment):
+                if operation is not None and record["operation"] != operation:
+                    continue
+                if lo is not None or hi is not None:
+                    ts = _record_ns(record)
+                    if (lo is not None and ts < lo) or (hi is not None and ts >= hi):
+                        continue
+                yield Calculation.from_dict(record)
+
+    def query(
+        self,
+        operation: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> List[Calculation]:
+        """Like ``SQLiteHistoryStore.query``: oldest first, newest ``limit`` matches."""
+        # with a limit only the newest matches are held while scanning
+        rows = deque(maxlen=limit or None)
+        try:
+            rows.extend(self.iter_rows(since, until, operation))
+        except (OSError, EOFError, ValueError, gzip.BadGzipFile) as e:
+            raise PersistenceError(f"Failed to read history archive: {e}")
+        return list(rows)
+
+
+_archives: Dict[str, HistoryArchive] = {}
+_archives_lock = threading.Lock()
+
+
+def get_archive(directory: str, segment_rows: int | None = None) -> HistoryArchive:
+    """Shared archive per directory, so every writer appends through one index."""
+    key = os.path.abspath(directory)
+    with _archives_lock:
+        archive = _archives.get(key)
+        if archive is None:
+            archive = _archives[key] = HistoryArchive(directory, segment_rows)
+        return archive
@@ -1,5 +1,6 @@
 # app/input_validators.py
-from typing import Tuple
+from dataclasses import dataclass, field
+from typing import Any, List, Tuple
 from .exceptions import ValidationError
 from .calculator_config import CalculatorConfig
 
@@ -22,3 +23,121 @@ def validate_numeric_pair(a, b) -> Tuple[float, float]:
         raise ValidationError(f"Inputs must be <= {cfg.max_input_value} in absolute value")
 
     return a_f, b_f
+
+
+@dataclass
+class BulkValidationResult:
+    """
+    Parsed operand columns plus a per-row error report. ``valid`` is a boolean
+    mask; ``errors`` lists ``(row, message)`` for every rejected row.
+    """
+    a: Any
+    b: Any
+    valid: Any
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def valid_pairs(self):
+        return self.a[self.valid], self.b[self.valid]
+
+
+_PARSE_CHUNK = 256
+
+
+def _parse_span(arr, parsed, bad, lo: int, hi: int):
+    import numpy as np
+
+    try:
+        parsed[lo:hi] = arr[lo:hi].astype(np.float64)
+        return
+    except (TypeError, ValueError):
+        pass
+    if hi - lo <= 8:
+        for i in range(lo, hi):
+            try:
+                parsed[i] = float(arr[i])
+            except (TypeError, ValueError):
+                parsed[i] = np.nan
+                bad[i] = True
+        return
+    # bisect, so a lone bad item costs a few C conversions, not a Python loop
+    mid = (lo + hi) // 2
+    _parse_span(arr, parsed, bad, lo, mid)
+    _parse_span(arr, parsed, bad, mid, hi)
+
+
+def _parse_column(values):
+    """Parse a column to float64; returns (array, bad_mask, object_array)."""
+    import numpy as np
+
+    if getattr(values, "dtype", None) is not None and values.dtype.kind in "fiu":
+        parsed = np.asarray(values, dtype=np.float64)
+        return parsed, np.zeros(parsed.shape, dtype=bool), values
+
+    # object -> float64 applies float() to every item in C, so it accepts
+    # exactly what validate_numeric_pair accepts. It stops at the first bad
+    # item, so a failing column is converted in chunks and failing chunks
+    # are bisected down to the bad items.
+    arr = np.asarray(values, dtype=object)
+    try:
+        return arr.astype(np.float64), np.zeros(arr.shape, dtype=bool), arr
+    except (TypeError, ValueError):
+        pass
+
+    parsed = np.empty(arr.shape, dtype=np.float64)
+    bad = np.zeros(arr.shape, dtype=bool)
+    for lo in range(0, arr.size, _PARSE_CHUNK):
+        _parse_span(arr, parsed, bad, lo, min(lo + _PARSE_CHUNK, arr.size))
+    return parsed, bad, arr
+
+
+def validate_numeric_columns(a_values, b_values) -> BulkValidationResult:
+    """
+    Vectorised ``validate_numeric_pair`` for whole operand columns (e.g.
+    millions of strings read from a command file). Columns are parsed to
+    float64 arrays and range-checked in bulk; bad rows are reported in
+    ``errors`` instead of raising.
+    """
+    import numpy as np
+
+    a, a_bad, a_raw = _parse_column(a_values)
+    b, b_bad, b_raw = _parse_column(b_values)
+    if a.shape != b.shape or a.ndim != 1:
+        raise ValidationError("Operand columns must be one-dimensional and the same length")
+
+    non_numeric = a_bad | b_bad
+    with np.errstate(invalid="ignore"):
+        out_of_range = ~non_numeric & ((np.abs(a) > cfg.max_input_value) | (np.abs(b) > cfg.max_input_value))
+
+    errors: List[Tuple[int, str]] = []
+    if non_numeric.any() or out_of_range.any():
+        for i in np.flatnonzero(non_numeric):
+            errors.append((int(i), f"Inputs must be numeric: got {a_raw[i]!r}, {b_raw[i]!r}"))
+        range_msg = f"Inputs must be <= {cfg.max_input_value} in absolute value"
+        errors.extend((int(i), range_msg) for i in np.flatnonzero(out_of_range))
+        errors.sort()
+
+    return BulkValidationResult(a=a, b=b, valid=~(non_numeric | out_of_range), errors=errors)
+
+
+def validate_numeric_sequence(values):
+    """
+    Validate one column of operands (list, tuple or numpy array) the way
+    ``validate_numeric_pair`` validates two. Returns a float64 array; the
+    first bad item raises ``ValidationError``.
+    """
+    import numpy as np
+
+    parsed, bad, raw = _parse_column(values)
+    if parsed.ndim != 1:
+        raise ValidationError("Operands must be a one-dimensional sequence")
+    if bad.any():
+        i = int(np.flatnonzero(bad)[0])
+        raise ValidationError(f"Inputs must be numeric: got {raw[i]!r} at position {i}")
+    with np.errstate(invalid="ignore"):
+        if (np.abs(parsed) > cfg.max_input_value).any():
+            raise ValidationError(f"Inputs must be <= {cfg.max_input_value} in absolute value")
+    return parsed
@@ -0,0 +1,144 @@
+# app/log_rotation.py
+"""
+Log rotation with background compression and retention.
+
+``CompressingRotatingFileHandler`` keeps rotation on the logging call cheap:
+it only renames the full log file to a timestamped segment and reopens.
+Compressing the segment (gzip) and pruning old segments (by count and age)
+happen on a single background thread, so the ``perform`` call that crosses
+the size limit is not held up.
+
+``JsonLinesFormatter`` is a compact structured alternative to the text
+format: one JSON object per record, with calculation fields when the record
+carries a ``calculation``.
+"""
+import atexit
+import glob
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+COMPRESSIONS = ("gzip", "none")
+
+
+class _SegmentWorker:
+    """Background thread compressing rotated segments and applying retention."""
+
+    def __init__(self):
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, segment: str, handler: "CompressingRotatingFileHandler"):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="calculator-log-rotation", daemon=True)
+                self._thread.start()
+        self._queue.put((segment, handler))
+
+    def _run(self):
+        while True:
+            segment, handler = self._queue.get()
+            try:
+                handler.finish_segment(segment)
+            except Exception:
+                # never let log housekeeping take the process down
+                pass
+            finally:
+                self._queue.task_done()
+
+    def drain(self):
+        """Wait for queued segments (used at exit and by tests)."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+
+_worker = _SegmentWorker()
+atexit.register(_worker.drain)
+
+
+def drain_rotation_queue():
+    _worker.drain()
+
+
+class CompressingRotatingFileHandler(RotatingFileHandler):
+    def __init__(
+        self,
+        filename: str,
+        max_bytes: int = 5_000_000,
+        backup_count: int = 3,
+        compression: str = "gzip",
+        retention_days: float = 0,
+        encoding: str | None = None,
+    ):
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unsupported log compression: {compression}")
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding=encoding)
+        self.compression = compression
+        self.retention_days = retention_days
+        self._rotations = 0
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        if os.path.exists(self.baseFilename):
+            self._rotations += 1
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            segment = f"{self.baseFilename}.{stamp}-{os.getpid()}-{self._rotations}"
+            os.rename(self.baseFilename, segment)
+            _worker.submit(segment, self)
+        if not self.delay:
+            self.stream = self._open()
+
+    # ===== Background work =====
+    def finish_segment(self, segment: str):
+        if self.compression == "gzip":
+            tmp = segment + ".gz.tmp"
+            with open(segment, "rb") as src, gzip.open(tmp, "wb", compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(tmp, segment + ".gz")
+            os.remove(segment)
+        self.apply_retention()
+
+    def segments(self):
+        """Rotated segments, oldest first."""
+        paths = [p for p in glob.glob(glob.escape(self.baseFilename) + ".*") if not p.endswith(".tmp")]
+        return sorted(paths, key=os.path.getmtime)
+
+    def apply_retention(self):
+        segments = self.segments()
+        doomed = []
+        if self.backupCount > 0 and len(segments) > self.backupCount:
+            doomed = segments[: len(segments) - self.backupCount]
+        if self.retention_days:
+            cutoff = time.time() - self.retention_days * 86400
+            doomed += [p for p in segments if p not in doomed and os.path.getmtime(p) < cutoff]
+        for path in doomed:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {"ts": round(record.created, 6), "level": record.levelname}
+        calc = getattr(record, "calculation", None)
+        if calc is not None:
+            payload["op"] = calc.operation
+            payload["operands"] = list(calc.operands)
+            payload["result"] = calc.result
+            if calc.expression is not None:
+                payload["expression"] = calc.expression
+        else:
+            payload["msg"] = record.getMessage()
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str, separators=(",", ":"))
@@ -1,11 +1,14 @@
 # app/logger.py
 import logging
-from logging.handlers import RotatingFileHandler
 from datetime import datetime
-from typing import Protocol
+from typing import FrozenSet, Optional, Protocol, Sequence
 from .calculation import Calculation
 from .calculator_config import CalculatorConfig
-from .exceptions import PersistenceError
+from .exceptions import PersistenceError, ValidationError
+from .log_rotation import CompressingRotatingFileHandler, JsonLinesFormatter
+from .persistence import atomic_write, get_wal, unapplied_records
+from .serialization import normalise_csv, records_to_csv_bytes, to_jsonl_bytes
+from .sqlite_store import get_store
 import os
 
 cfg = CalculatorConfig()
@@ -18,25 +21,69 @@ def _get_logger():
     logger = logging.getLogger("calculator")
     if not logger.handlers:
         logger.setLevel(logging.INFO)
-        handler = RotatingFileHandler(LOG_FILE, maxBytes=5_000_000, backupCount=3, encoding=cfg.default_encoding)
-        fmt = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+        # rotation renames inline; compression and retention run in background
+        handler = CompressingRotatingFileHandler(
+            LOG_FILE,
+            max_bytes=cfg.log_max_bytes,
+            backup_count=cfg.log_backup_count,
+            compression=cfg.log_compression,
+            retention_days=cfg.log_retention_days,
+            encoding=cfg.default_encoding,
+        )
+        if cfg.log_format == "json":
+            fmt = JsonLinesFormatter()
+        else:
+            fmt = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
         handler.setFormatter(fmt)
         logger.addHandler(handler)
     return logger
 
 
+# events a Calculator reports to observers
+EVENTS = ("perform", "clear", "undo", "redo", "load")
+
+
 class Observer(Protocol):
+    """
+    Receives new calculations through ``update``. Observers may also declare:
+
+    - ``events``: the events they want (default ``("perform",)``); events
+      other than ``perform`` go to ``on_event(event, history)``
+    - ``operations``: only calculations with these operation names are sent
+    - ``update_many(calculations)``: receives a batch in one call instead of
+      one ``update`` per calculation
+    """
     def update(self, calculation: Calculation) -> None:
         ...
 
 
+def observer_events(observer) -> FrozenSet[str]:
+    events = frozenset(getattr(observer, "events", None) or ("perform",))
+    unknown = events - set(EVENTS)
+    if unknown:
+        raise ValidationError(f"Unknown observer events: {', '.join(sorted(unknown))}")
+    return events
+
+
+def observer_operations(observer) -> Optional[FrozenSet[str]]:
+    operations = getattr(observer, "operations", None)
+    return None if operations is None else frozenset(operations)
+
+
 class LoggingObserver:
     def __init__(self):
         self._logger = _get_logger()
 
     def update(self, calculation: Calculation) -> None:
-        msg = f"{calculation.operation} | operands={calculation.operands} | result={calculation.result}"
+        self._reopen_if_moved()
+        self._log(calculation)
+
+    def update_many(self, calculations: Sequence[Calculation]) -> None:
+        self._reopen_if_moved()
+        for calculation in calculations:
+            self._log(calculation)
 
+    def _reopen_if_moved(self):
         # If tests or callers change a handler's baseFilename at runtime (tests do
         # this to redirect logging to a tmp file), the handler's stream will still
         # point to the original file. Detect that case and reopen the handler's
@@ -65,36 +112,73 @@ class LoggingObserver:
                 except Exception:
                     pass
 
-        self._logger.info(msg)
+    def _log(self, calculation: Calculation):
+        # formatted lazily: the JSON formatter reads ``calculation`` directly
+        self._logger.info(
+            "%s | operands=%s | result=%s",
+            calculation.operation,
+            calculation.operands,
+            calculation.result,
+            extra={"calculation": calculation},
+        )
 
 
 class AutoSaveObserver:
     """
-    Auto-saves history to CSV on update. Expects the subject to have a 'history_manager' attribute.
+    Auto-saves history on update. Each calculation is appended to a write-ahead
+    log next to the CSV (cheap, fsynced in groups); every ``checkpoint_every``
+    records the log is folded into the CSV with an atomic replace.
     """
-    def __init__(self, csv_path: str | None = None):
+    def __init__(self, csv_path: str | None = None, checkpoint_every: int | None = None):
         self.csv_path = csv_path or os.path.join(cfg.history_dir, "history.csv")
+        self.checkpoint_every = checkpoint_every or cfg.wal_checkpoint_every
         # make sure directory exists
-        os.makedirs(os.path.dirname(self.csv_path), exist_ok=True)
+        os.makedirs(os.path.dirname(self.csv_path) or ".", exist_ok=True)
+        self._wal = get_wal(self.csv_path)
 
     def update(self, calculation: Calculation) -> None:
-        # lazy import pandas
-        try:
-            import pandas as pd  # local import so only required when autosave is used
-        except Exception as e:
-            raise PersistenceError(f"pandas is required for autosave: {e}")
+        self.update_many((calculation,))
 
-        # append new row to csv safely
+    def update_many(self, calculations: Sequence[Calculation]) -> None:
+        """Log a batch with one write (and at most one checkpoint)."""
         try:
-            # If file exists, append; otherwise create new DataFrame
-            if os.path.exists(self.csv_path):
-                existing = pd.read_csv(self.csv_path, encoding=cfg.default_encoding)
-                # convert calc to dict and append
-                new_row = pd.DataFrame([calculation.to_dict()])
-                combined = pd.concat([existing, new_row], ignore_index=True)
-                combined.to_csv(self.csv_path, index=False, encoding=cfg.default_encoding)
-            else:
-                df = pd.DataFrame([calculation.to_dict()])
-                df.to_csv(self.csv_path, index=False, encoding=cfg.default_encoding)
+            self._wal.append_raw(to_jsonl_bytes(calculations), len(calculations))
+            if self._wal.pending >= self.checkpoint_every or not os.path.exists(self.csv_path):
+                self.checkpoint()
         except Exception as e:
             raise PersistenceError(f"Failed to autosave history: {e}")
+
+    def checkpoint(self) -> None:
+        """Fold the write-ahead log into the CSV and truncate the log."""
+        encoding = cfg.default_encoding
+        records = self._wal.replay()
+        existing = b""
+        if os.path.exists(self.csv_path):
+            with open(self.csv_path, "rb") as f:
+                existing = f.read()
+
+        if existing:
+            # the CSV is copied as bytes; only the new rows are serialized
+            existing, last_row = normalise_csv(existing, encoding)
+            records = unapplied_records(records, last_row)
+            if not records:
+                self._wal.truncate()
+                return
+            data = existing + records_to_csv_bytes(records, encoding=encoding)
+        else:
+            data = records_to_csv_bytes(records, header=True, encoding=encoding)
+        atomic_write(self.csv_path, data)
+        self._wal.truncate()
+
+
+class SQLiteAutoSaveObserver:
+    """Autosave for the SQLite history backend: one indexed insert per calculation."""
+    def __init__(self, db_path: str | None = None):
+        self.db_path = db_path or cfg.history_db
+        self._store = get_store(self.db_path)
+
+    def update(self, calculation: Calculation) -> None:
+        self._store.insert(calculation)
+
+    def update_many(self, calculations: Sequence[Calculation]) -> None:
+        self._store.insert_many(calculations)
@@ -0,0 +1,257 @@
+# app/memory_budget.py
+"""
+Memory budget for long-running calculators.
+
+``measure`` accounts for what a ``Calculator`` holds:
+
+- ``history``: the in-memory history list and its records (sizes of a
+  sample of up to ``_SAMPLE_ROWS`` records, scaled to the whole list),
+- ``undo``: undo/redo mementos -- list containers for live ones and
+  deltas (their records are shared with the history) and compressed bytes
+  for packed ones (spilled ones live on disk),
+- ``caches``: quantile sketches and rows buffered for the history archive.
+
+When ``tracemalloc`` is tracing (``CALCULATOR_MEMORY_TRACEMALLOC=true``
+starts it), the traced total is reported too and the budget applies to it
+instead, since it also covers transient allocations such as the pandas
+frames built while saving.
+
+``MemoryGovernor`` checks the budget every ``check_every`` calculations
+and after loads. Over budget, it applies the actions of
+``CALCULATOR_MEMORY_POLICY`` in order until usage fits:
+
+- ``trim_undo``: compress all but the newest undo step, then halve the
+  undo depth (down to 1),
+- ``shrink_caches``: drop compiled expression plans and flush the archive
+  buffer,
+- ``spill_history``: move the older half of the in-memory history to the
+  history archive (only when one is configured) and lower the in-memory
+  history limit to match.
+
+Limits lowered by the governor stay lowered, so usage does not grow back.
+Every enforcement produces a ``MemoryReport``, logged as a warning.
+"""
+import gc
+import logging
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+from .calculator_config import CalculatorConfig
+from .exceptions import ValidationError
+
+cfg = CalculatorConfig()
+
+POLICY_ACTIONS = ("trim_undo", "shrink_caches", "spill_history")
+
+_SAMPLE_ROWS = 256
+_MIB = 1024 * 1024
+
+
+def parse_policy(policy: str) -> List[str]:
+    actions = [a.strip() for a in policy.split(",") if a.strip()]
+    unknown = [a for a in actions if a not in POLICY_ACTIONS]
+    if unknown:
+        raise ValidationError(f"Unknown memory policy actions: {', '.join(unknown)}")
+    return actions
+
+
+def _record_size(calc) -> int:
+    size = sys.getsizeof(calc) + sys.getsizeof(calc.operands) + sys.getsizeof(calc.result)
+    size += sys.getsizeof(calc._dt if calc._dt is not None else calc._ns)
+    for operand in calc.operands:
+        size += sys.getsizeof(operand)
+    if calc.expression is not None:
+        size += sys.getsizeof(calc.expression)
+    return size
+
+
+def history_bytes(calcs: list) -> int:
+    n = len(calcs)
+    size = sys.getsizeof(calcs)
+    if n <= _SAMPLE_ROWS:
+        return size + sum(map(_record_size, calcs))
+    step = n / _SAMPLE_ROWS
+    sample = sum(_record_size(calcs[int(i * step)]) for i in range(_SAMPLE_ROWS))
+    return size + sample * n // _SAMPLE_ROWS
+
+
+def _sketch_bytes(stats) -> int:
+    size = 0
+    for sketches in stats._sketches.values():
+        for sketch in sketches.values():
+            for level in sketch._levels:
+                size += sys.getsizeof(level) + 24 * len(level)  # 24 bytes per float
+    return size
+
+
+@dataclass
+class MemoryUsage:
+    history: int
+    undo: int
+    caches: int
+    traced: Optional[int] = None  # tracemalloc's current total, when tracing
+
+    @property
+    def accounted(self) -> int:
+        return self.history + self.undo + self.caches
+
+    @property
+    def total(self) -> int:
+        """What the budget applies to."""
+        return self.traced if self.traced is not None else self.accounted
+
+    def __str__(self) -> str:
+        text = (
+            f"history {self.history / _MIB:.2f} MiB, undo {self.undo / _MIB:.2f} MiB, "
+            f"caches {self.caches / _MIB:.2f} MiB"
+        )
+        if self.traced is not None:
+            text += f", traced {self.traced / _MIB:.2f} MiB"
+        return text
+
+
+@dataclass
+class MemoryReport:
+    budget: int
+    before: MemoryUsage
+    after: MemoryUsage
+    actions: List[str] = field(default_factory=list)
+    # largest allocation sites, when tracemalloc is tracing
+    top_allocations: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.after.total <= self.budget
+
+    def __str__(self) -> str:
+        lines = [
+            f"Memory budget {self.budget / _MIB:.2f} MiB exceeded: {self.before.total / _MIB:.2f} MiB "
+            f"-> {self.after.total / _MIB:.2f} MiB ({'within budget' if self.ok else 'still over budget'})",
+            f"  before: {self.before}",
+            f"  after:  {self.after}",
+        ]
+        lines += [f"  action: {a}" for a in self.actions] or ["  action: none possible"]
+        lines += [f"  top: {t}" for t in self.top_allocations]
+        return "\n".join(lines)
+
+
+def measure(calculator) -> MemoryUsage:
+    undo = 0
+    for memento in calculator._caretaker.mementos():
+        if memento.history_snapshot is not None:
+            undo += sys.getsizeof(memento.history_snapshot)
+        elif memento.head is not None:
+            undo += sys.getsizeof(memento.head)
+        elif memento.packed is not None:
+            undo += len(memento.packed)
+    caches = _sketch_bytes(calculator.stats)
+    archive = calculator.history_manager.archive
+    if archive is not None:
+        caches += history_bytes(archive._buffer)
+    traced = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+    return MemoryUsage(history_bytes(calculator.history_manager._history), undo, caches, traced)
+
+
+class MemoryGovernor:
+    """Observer that keeps a calculator within a memory budget."""
+    events = ("perform", "load")
+
+    def __init__(
+        self,
+        calculator,
+        budget_mb: float | None = None,
+        policy: str | None = None,
+        check_every: int | None = None,
+        on_report: Optional[Callable[[MemoryReport], None]] = None,
+    ):
+        self._calculator = calculator
+        config = calculator.config
+        self.budget = int((budget_mb or config.memory_budget_mb) * _MIB)
+        self.policy = parse_policy(config.memory_policy if policy is None else policy)
+        self.check_every = check_every or config.memory_check_every
+        self.on_report = on_report
+        self.last_report: Optional[MemoryReport] = None
+        self._since_check = 0
+        if config.memory_tracemalloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    # ===== Observer interface =====
+    def _counted(self, count: int):
+        self._since_check += count
+        if self._since_check >= self.check_every:
+            self._since_check = 0
+            self.enforce()
+
+    def update(self, calculation) -> None:
+        self._counted(1)
+
+    def update_many(self, calculations) -> None:
+        self._counted(len(calculations))
+
+    def on_event(self, event, history) -> None:
+        self.enforce()
+
+    # ===== Enforcement =====
+    def enforce(self) -> Optional[MemoryReport]:
+        """Apply the policy when over budget; returns the report (None when within budget)."""
+        before = measure(self._calculator)
+        if before.total <= self.budget:
+            return None
+        top = []
+        if tracemalloc.is_tracing():
+            stats = tracemalloc.take_snapshot().statistics("filename")[:5]
+            top = [f"{s.traceback[0].filename}: {s.size / _MIB:.2f} MiB" for s in stats]
+
+        actions: List[str] = []
+        usage = before
+        for name in self.policy:
+            step = getattr(self, f"_{name}")
+            while usage.total > self.budget:
+                done = step()
+                if done is None:
+                    break
+                actions.append(done)
+                gc.collect()
+                usage = measure(self._calculator)
+            if usage.total <= self.budget:
+                break
+
+        report = MemoryReport(self.budget, before, usage, actions, top)
+        self.last_report = report
+        logging.getLogger("calculator").warning("%s", report)
+        if self.on_report is not None:
+            self.on_report(report)
+        return report
+
+    def _trim_undo(self) -> Optional[str]:
+        caretaker = self._calculator._caretaker
+        packed = caretaker.pack_all()
+        if packed:
+            return f"trim_undo: compressed {packed} undo/redo snapshots"
+        depth = caretaker.max_depth or len(caretaker.mementos())
+        if depth <= 1:
+            return None
+        caretaker.limit_depth(depth // 2)
+        return f"trim_undo: undo depth {depth} -> {caretaker.max_depth}"
+
+    def _shrink_caches(self) -> Optional[str]:
+        from .expressions import _compile_source
+
+        plans = _compile_source.cache_info().currsize
+        archive = self._calculator.history_manager.archive
+        buffered = len(archive._buffer) if archive is not None else 0
+        if not plans and not buffered:
+            return None
+        _compile_source.cache_clear()
+        if buffered:
+            archive.flush()
+        return f"shrink_caches: dropped {plans} expression plans, flushed {buffered} archive rows"
+
+    def _spill_history(self) -> Optional[str]:
+        history = self._calculator.history_manager
+        if history.archive is None or history.size() <= 1:
+            return None
+        keep = history.size() // 2
+        moved = history.spill(keep)
+        return f"spill_history: moved {moved} rows to the archive, keeping {keep} in memory"
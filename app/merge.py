@@ -0,0 +1,147 @@
+# app/merge.py
+"""
+Streaming merge of history files from several nodes.
+
+Each input must already be in timestamp order (as ``history.csv`` files
+are). The inputs are read row by row and combined with a heap-based k-way
+merge on ``timestamp`` (``heapq.merge``), so memory use is independent of
+file size. Identical calculations (same row in every column) that appear
+in more than one input are written once. The output uses the standard
+history layout, so ``Calculator.load_history`` can read it.
+
+    python -m app.merge merged.csv node1/history.csv node2/history.csv ...
+"""
+import argparse
+import csv
+import heapq
+import io
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterator, List, Sequence, Tuple
+from .calculator_config import CalculatorConfig
+from .exceptions import PersistenceError
+from .persistence import atomic_writer
+from .serialization import COLUMNS
+
+cfg = CalculatorConfig()
+
+# rows are buffered and written in blocks of this many
+_WRITE_BATCH = 4096
+
+
+@dataclass
+class MergeStats:
+    files: int = 0
+    rows_in: int = 0
+    rows_out: int = 0
+    duplicates: int = 0
+
+
+def _timestamp_key(value: str) -> datetime:
+    ts = datetime.fromisoformat(value)
+    # naive timestamps (older files) are taken as UTC so they order with aware ones
+    return ts if ts.tzinfo is not None else ts.replace(tzinfo=timezone.utc)
+
+
+def iter_history_rows(
+    path: str, encoding: str = "utf-8", ordered: bool = True
+) -> Iterator[Tuple[datetime, Tuple[str, ...]]]:
+    """
+    Yield ``(timestamp, row)`` for each row of a history CSV, row in
+    ``COLUMNS`` order. With ``ordered``, rows out of timestamp order raise
+    ``PersistenceError``.
+    """
+    with open(path, newline="", encoding=encoding) as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        missing = {"operation", "timestamp"} - set(header)
+        if missing:
+            raise PersistenceError(f"{path} is not a history file (missing {', '.join(sorted(missing))})")
+        # map columns by name so files with an older column order merge too
+        index = {name: i for i, name in enumerate(header)}
+        # seq numbers belong to the process that wrote each file; merged rows
+        # are numbered afresh when loaded
+        picks = [index.get(col) if col != "seq" else None for col in COLUMNS]
+        ts_col = index["timestamp"]
+        width = len(header)
+        previous = None
+        for line_no, record in enumerate(reader, start=2):
+            if len(record) < width:
+                record += [""] * (width - len(record))
+            try:
+                key = _timestamp_key(record[ts_col])
+            except ValueError:
+                raise PersistenceError(f"{path}:{line_no}: bad timestamp {record[ts_col]!r}")
+            if ordered and previous is not None and key < previous:
+                raise PersistenceError(f"{path}:{line_no}: rows are not in timestamp order")
+            previous = key
+            yield key, tuple("" if i is None else record[i] for i in picks)
+
+
+def merge_histories(
+    paths: Sequence[str],
+    out_path: str,
+    encoding: str | None = None,
+    dedupe: bool = True,
+) -> MergeStats:
+    """Merge time-ordered history files into ``out_path`` (written atomically)."""
+    encoding = encoding or cfg.default_encoding
+    stats = MergeStats(files=len(paths))
+    streams = [iter_history_rows(p, encoding) for p in paths]
+
+    # duplicates share a timestamp, so only rows of the current timestamp are remembered
+    current_ts = None
+    seen = set()
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(COLUMNS)
+    pending = 0
+
+    try:
+        with atomic_writer(out_path) as out:
+            for ts, row in heapq.merge(*streams, key=lambda item: item[0]):
+                stats.rows_in += 1
+                if dedupe:
+                    if ts != current_ts:
+                        current_ts = ts
+                        seen.clear()
+                    if row in seen:
+                        stats.duplicates += 1
+                        continue
+                    seen.add(row)
+                writer.writerow(row)
+                stats.rows_out += 1
+                pending += 1
+                if pending >= _WRITE_BATCH:
+                    out.write(buf.getvalue().encode(encoding))
+                    buf.seek(0)
+                    buf.truncate()
+                    pending = 0
+            out.write(buf.getvalue().encode(encoding))
+    except OSError as e:
+        raise PersistenceError(f"Failed to merge histories: {e}")
+    return stats
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.merge", description="Merge time-ordered history files.")
+    parser.add_argument("output")
+    parser.add_argument("inputs", nargs="+")
+    parser.add_argument("--keep-duplicates", action="store_true")
+    args = parser.parse_args(argv)
+
+    try:
+        stats = merge_histories(args.inputs, args.output, dedupe=not args.keep_duplicates)
+    except PersistenceError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    print(
+        f"Merged {stats.files} files: {stats.rows_in} rows in, {stats.rows_out} rows out, "
+        f"{stats.duplicates} duplicates dropped."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+# app/numeric.py
+"""
+Numeric engines used to evaluate operations.
+
+The default ``float`` engine keeps the original behaviour (binary floats,
+results rounded to ``CalculatorConfig.precision``). The ``decimal`` and
+``fraction`` engines give exact results for financial workloads; both take a
+float fast path when the operands are small integers, because float
+arithmetic on those is exact and much cheaper.
+"""
+import decimal
+import math
+from decimal import Decimal
+from fractions import Fraction
+from typing import Any, Optional, Tuple
+from .calculator_config import CalculatorConfig
+from .exceptions import OperationError, ValidationError
+from .input_validators import validate_numeric_pair, validate_numeric_sequence
+
+cfg = CalculatorConfig()
+
+# Integers below this magnitude survive float add/subtract/multiply/divmod
+# without rounding (products stay below 2**53).
+_FAST_LIMIT = 2 ** 26
+
+
+def _small_int_float(value):
+    """Return ``value`` as a float if it is a small integer, else None."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        try:
+            value = int(value)
+        except ValueError:
+            return None
+    elif isinstance(value, (float, Decimal, Fraction)):
+        try:
+            if value != int(value):
+                return None
+        except (ValueError, OverflowError, ArithmeticError):
+            return None
+    elif not isinstance(value, int):
+        return None
+    return float(value) if -_FAST_LIMIT < value < _FAST_LIMIT else None
+
+
+class NumericEngine:
+    """Float engine: the calculator's original arithmetic."""
+    name = "float"
+
+    def coerce_pair(self, a, b) -> Tuple[Any, Any]:
+        return validate_numeric_pair(a, b)
+
+    def fast_pair(self, a, b) -> Optional[Tuple[float, float]]:
+        """
+        Float operands for an operation that is exact on small integers
+        (``Operation.float_exact``), or None to use ``coerce_pair``.
+        """
+        return None
+
+    def coerce(self, value) -> Any:
+        """Validate and convert a single operand."""
+        return self.coerce_pair(value, 0)[0]
+
+    def coerce_many(self, values) -> Any:
+        """Validate and convert a sequence of operands (a float64 array here)."""
+        return validate_numeric_sequence(values)
+
+    def evaluate(self, operation) -> Any:
+        return operation.compute()
+
+    def round(self, value, precision: int) -> Any:
+        # apply precision if numeric real
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = round(float(value), precision)
+            # handle -0.0
+            if value == 0.0:
+                value = 0.0
+        return value
+
+
+class _ExactEngine(NumericEngine):
+    """Shared coercion and fast path for the exact engines."""
+    exact_type: type = object
+
+    def __init__(self, fast_path: bool = True, max_input_value: float | None = None):
+        self.fast_path = fast_path
+        self.max_input_value = cfg.max_input_value if max_input_value is None else max_input_value
+
+    def _coerce(self, value):
+        raise NotImplementedError
+
+    def fast_pair(self, a, b):
+        if not self.fast_path:
+            return None
+        # float fast path: small integers are exact as floats, and the
+        # operation (``float_exact``) keeps them exact
+        a_f = _small_int_float(a)
+        b_f = _small_int_float(b)
+        if a_f is not None and b_f is not None:
+            return a_f, b_f
+        return None
+
+    def coerce_pair(self, a, b):
+        try:
+            a_x = self._coerce(a)
+            b_x = self._coerce(b)
+        except (TypeError, ValueError, ArithmeticError):
+            raise ValidationError(f"Inputs must be numeric: got {a!r}, {b!r}")
+
+        limit = self.max_input_value
+        if abs(a_x) > limit or abs(b_x) > limit:
+            raise ValidationError(f"Inputs must be <= {limit} in absolute value")
+        return a_x, b_x
+
+    def coerce_many(self, values):
+        out = []
+        limit = self.max_input_value
+        for value in values:
+            try:
+                x = self._coerce(value)
+            except (TypeError, ValueError, ArithmeticError):
+                raise ValidationError(f"Inputs must be numeric: got {value!r}")
+            if abs(x) > limit:
+                raise ValidationError(f"Inputs must be <= {limit} in absolute value")
+            out.append(x)
+        return out
+
+    def _fast(self, operation):
+        """Evaluate fast-path (float) operands and convert the exact result."""
+        return self.exact_type(int(operation.compute()))
+
+
+class DecimalEngine(_ExactEngine):
+    """decimal.Decimal arithmetic under a configurable context."""
+    name = "decimal"
+    exact_type = Decimal
+
+    def __init__(
+        self,
+        precision: int = 28,
+        rounding: str = decimal.ROUND_HALF_EVEN,
+        fast_path: bool = True,
+        max_input_value: float | None = None,
+    ):
+        super().__init__(fast_path, max_input_value)
+        try:
+            self.context = decimal.Context(prec=precision, rounding=rounding)
+        except (TypeError, ValueError) as e:
+            raise ValidationError(f"Invalid decimal context: {e}")
+
+    def _coerce(self, value):
+        if isinstance(value, Decimal):
+            result = value
+        elif isinstance(value, (int, Fraction)) and not isinstance(value, bool):
+            result = Decimal(value) if isinstance(value, int) else Decimal(value.numerator) / value.denominator
+        else:
+            # str() gives the shortest repr for floats, so 0.1 stays 0.1
+            result = Decimal(str(value).strip())
+        if not result.is_finite():
+            raise ValueError("non-finite value")
+        return result
+
+    def evaluate(self, operation):
+        if isinstance(operation.a, float):
+            return self._fast(operation)
+        with decimal.localcontext(self.context):
+            try:
+                return operation.compute()
+            except decimal.DecimalException as e:
+                raise OperationError(f"Decimal error: {e!r}")
+
+    def round(self, value, precision: int):
+        if not isinstance(value, Decimal):
+            return super().round(value, precision)
+        try:
+            value = value.quantize(Decimal(1).scaleb(-precision), context=self.context)
+        except decimal.InvalidOperation:
+            # more digits than the context holds; keep the context-rounded value
+            return value
+        # handle -0
+        return abs(value) if not value else value
+
+
+class FractionEngine(_ExactEngine):
+    """fractions.Fraction arithmetic; rational results are never rounded."""
+    name = "fraction"
+    exact_type = Fraction
+
+    def _coerce(self, value):
+        if isinstance(value, bool):
+            raise TypeError("bool is not a number")
+        if isinstance(value, (int, Fraction, Decimal)):
+            return Fraction(value)
+        # Fraction("0.1") == 1/10, whereas Fraction(0.1) is the binary value
+        return Fraction(str(value).strip())
+
+    def evaluate(self, operation):
+        if isinstance(operation.a, float):
+            return self._fast(operation)
+        from .operations import Power  # operations imports this module
+
+        if isinstance(operation, Power):
+            self._check_power(operation.a, operation.b)
+        result = operation.compute()
+        if isinstance(result, complex):
+            raise OperationError("Result is not a real number")
+        return result
+
+    def _check_power(self, base: Fraction, exponent: Fraction):
+        """
+        Reject integer powers whose numerator or denominator would exceed
+        ``max_input_value`` -- the exact counterpart of float overflow, and
+        what keeps ``power 10 99999999`` from running for hours.
+        """
+        if exponent.denominator != 1 or not base:
+            return  # fractional exponents give floats
+        size = max(abs(base.numerator), base.denominator)
+        if size > 1 and abs(exponent.numerator) * math.log2(size) > math.log2(self.max_input_value):
+            raise OperationError(f"Power error: result exceeds {self.max_input_value} as an exact fraction")
+
+    def round(self, value, precision: int):
+        if isinstance(value, Fraction):
+            return value
+        # irrational results (powers/roots) come back as floats
+        return super().round(value, precision)
+
+
+FLOAT_ENGINE = NumericEngine()
+
+_ENGINES = {
+    "float": lambda config: FLOAT_ENGINE,
+    "decimal": lambda config: DecimalEngine(
+        precision=config.decimal_precision,
+        rounding=config.decimal_rounding,
+        fast_path=config.numeric_fast_path,
+        max_input_value=config.max_input_value,
+    ),
+    "fraction": lambda config: FractionEngine(
+        fast_path=config.numeric_fast_path,
+        max_input_value=config.max_input_value,
+    ),
+}
+
+
+def get_engine(config: CalculatorConfig | None = None) -> NumericEngine:
+    """Build the numeric engine selected by ``config.numeric_engine``."""
+    config = config or cfg
+    key = config.numeric_engine.lower()
+    if key not in _ENGINES:
+        raise ValidationError(f"Unknown numeric engine: {config.numeric_engine}")
+    return _ENGINES[key](config)
@@ -0,0 +1,151 @@
+# app/operation_registry.py
+"""
+Registry of operations by name, with lazy loading.
+
+Built-in operations are registered as classes. Plugins are discovered by name
+only -- from the ``calculator.operations`` entry point group and from
+``<plugins_dir>/<name>.py`` files -- and imported on first use, so startup
+does not pay for operations that are rarely called.
+
+A plugin module exposes its ``Operation`` subclass as ``OPERATION``. Any
+operation may also define ``compute_vectorized(a, b)`` over numpy arrays;
+``compute_many`` uses it when present and falls back to the scalar
+``compute`` otherwise.
+"""
+import importlib.util
+import os
+import sys
+from importlib import metadata
+from typing import Callable, Dict, Tuple
+from .calculator_config import CalculatorConfig
+from .exceptions import OperationError, ValidationError
+
+cfg = CalculatorConfig()
+
+ENTRY_POINT_GROUP = "calculator.operations"
+PLUGIN_ATTRIBUTE = "OPERATION"
+
+
+def _load_plugin_file(name: str, path: str):
+    module_name = f"calculator_plugins.{name}"
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        sys.modules.pop(module_name, None)
+        raise
+    return getattr(module, PLUGIN_ATTRIBUTE)
+
+
+class OperationRegistry:
+    def __init__(self, plugins_dir: str | None = None, builtins: Dict[str, type] | None = None):
+        self._plugins_dir = plugins_dir
+        self._loaded: Dict[str, type] = {name.lower(): op for name, op in (builtins or {}).items()}
+        self._lazy: Dict[str, Callable[[], type]] = {}
+        self._plugins: set[str] = set()
+        self._discovered = False
+
+    # ===== Registration =====
+    def register(self, name: str, operation: type):
+        self._loaded[name.lower()] = operation
+
+    def register_lazy(self, name: str, loader: Callable[[], type]):
+        """Register ``loader``; it is called the first time ``name`` is used."""
+        key = name.lower()
+        if key not in self._loaded:
+            self._lazy[key] = loader
+            self._plugins.add(key)
+
+    def discover(self):
+        """Find plugin names (without importing them). Runs once."""
+        if self._discovered:
+            return
+        self._discovered = True
+
+        try:
+            entry_points = metadata.entry_points(group=ENTRY_POINT_GROUP)
+        except Exception:
+            entry_points = ()
+        for ep in entry_points:
+            self.register_lazy(ep.name, ep.load)
+
+        if self._plugins_dir and os.path.isdir(self._plugins_dir):
+            for filename in sorted(os.listdir(self._plugins_dir)):
+                name, ext = os.path.splitext(filename)
+                if ext == ".py" and not name.startswith("_"):
+                    path = os.path.join(self._plugins_dir, filename)
+                    self.register_lazy(name, lambda name=name, path=path: _load_plugin_file(name, path))
+
+    # ===== Lookup =====
+    def names(self) -> Tuple[str, ...]:
+        self.discover()
+        return tuple(self._loaded) + tuple(k for k in self._lazy if k not in self._loaded)
+
+    def plugin_names(self) -> Tuple[str, ...]:
+        self.discover()
+        return tuple(sorted(self._plugins))
+
+    def is_loaded(self, name: str) -> bool:
+        return name.lower() in self._loaded
+
+    def __contains__(self, name: str) -> bool:
+        key = name.lower()
+        if key in self._loaded:
+            return True
+        self.discover()
+        return key in self._lazy
+
+    def get(self, name: str) -> type:
+        key = name.lower()
+        operation = self._loaded.get(key)
+        if operation is not None:
+            return operation
+
+        self.discover()
+        loader = self._lazy.get(key)
+        if loader is None:
+            raise OperationError(f"Unsupported operation: {name}")
+        try:
+            operation = loader()
+        except Exception as e:
+            raise OperationError(f"Failed to load operation plugin '{name}': {e}")
+
+        from .operations import Operation
+        if not (isinstance(operation, type) and issubclass(operation, Operation)):
+            raise OperationError(f"Plugin '{name}' does not provide an Operation subclass")
+        self._loaded[key] = operation
+        del self._lazy[key]
+        return operation
+
+    # ===== Bulk evaluation =====
+    def compute_many(self, name: str, a, b):
+        """
+        Evaluate ``name`` over two operand sequences and return a float64 array.
+        Uses the operation's ``compute_vectorized`` when it declares one.
+        """
+        import numpy as np
+
+        operation = self.get(name)
+        try:
+            a = np.asarray(a, dtype=np.float64)
+            b = np.asarray(b, dtype=np.float64)
+        except (TypeError, ValueError) as e:
+            raise ValidationError(f"Inputs must be numeric: {e}")
+        if a.shape != b.shape:
+            raise ValidationError("Operand sequences must have the same length")
+
+        limit = cfg.max_input_value
+        if a.size and (np.abs(a).max() > limit or np.abs(b).max() > limit):
+            raise ValidationError(f"Inputs must be <= {limit} in absolute value")
+
+        vectorized = getattr(operation, "compute_vectorized", None)
+        if vectorized is not None:
+            with np.errstate(all="ignore"):
+                return np.asarray(vectorized(a, b), dtype=np.float64)
+        return np.fromiter(
+            (operation(x, y).compute() for x, y in zip(a.tolist(), b.tolist())),
+            dtype=np.float64,
+            count=a.size,
+        )
@@ -1,14 +1,27 @@
 # app/operations.py
 from abc import ABC, abstractmethod
-from typing import Tuple
+from decimal import Decimal
+from .calculator_config import CalculatorConfig
 from .exceptions import OperationError
-from .input_validators import validate_numeric_pair
+from .numeric import FLOAT_ENGINE, NumericEngine
+from .operation_registry import OperationRegistry
 import math
 
+cfg = CalculatorConfig()
+
 
 class Operation(ABC):
-    def __init__(self, a, b):
-        self.a, self.b = validate_numeric_pair(a, b)
+    # True when the float result is exact for small integer operands, which
+    # lets the exact numeric engines take the float fast path.
+    float_exact = False
+    # Optional ``staticmethod(a, b)`` over numpy float arrays; see
+    # OperationRegistry.compute_many.
+    compute_vectorized = None
+
+    def __init__(self, a, b, engine: NumericEngine | None = None):
+        engine = engine or FLOAT_ENGINE
+        pair = engine.fast_pair(a, b) if self.float_exact else None
+        self.a, self.b = pair or engine.coerce_pair(a, b)
 
     @abstractmethod
     def compute(self):
@@ -16,19 +29,37 @@ class Operation(ABC):
 
 
 class Add(Operation):
+    float_exact = True
+
     def compute(self):
         return self.a + self.b
 
+    @staticmethod
+    def compute_vectorized(a, b):
+        return a + b
+
 
 class Subtract(Operation):
+    float_exact = True
+
     def compute(self):
         return self.a - self.b
 
+    @staticmethod
+    def compute_vectorized(a, b):
+        return a - b
+
 
 class Multiply(Operation):
+    float_exact = True
+
     def compute(self):
         return self.a * self.b
 
+    @staticmethod
+    def compute_vectorized(a, b):
+        return a * b
+
 
 class Divide(Operation):
     def compute(self):
@@ -36,14 +67,24 @@ class Divide(Operation):
             raise OperationError("Division by zero")
         return self.a / self.b
 
+    @staticmethod
+    def compute_vectorized(a, b):
+        if (b == 0).any():
+            raise OperationError("Division by zero")
+        return a / b
+
 
 class Power(Operation):
     def compute(self):
         # handle negative bases with fractional exponents may produce complex result;
         # raise OperationError for invalid real result
         try:
-            result = math.pow(self.a, self.b)
-        except ValueError as e:
+            if isinstance(self.a, float):
+                result = math.pow(self.a, self.b)
+            else:
+                # Decimal/Fraction keep their own type under ``**``
+                result = self.a ** self.b
+        except (ValueError, ArithmeticError) as e:
             raise OperationError(f"Power error: {e}")
         return result
 
@@ -57,23 +98,47 @@ class Root(Operation):
         if self.a < 0 and int(self.b) % 2 == 0:
             raise OperationError("Even root of negative number is not a real number")
         try:
-            return self.a ** (1.0 / self.b)
+            return self.a ** (1 / self.b)
         except Exception as e:
             raise OperationError(f"Root error: {e}")
 
 
 class Modulus(Operation):
+    float_exact = True
+
     def compute(self):
         if self.b == 0:
             raise OperationError("Modulus by zero")
-        return self.a % self.b
+        result = self.a % self.b
+        # Decimal's % truncates toward zero; keep float's floored semantics
+        if isinstance(result, Decimal) and result and (result < 0) != (self.b < 0):
+            result += self.b
+        return result
+
+    @staticmethod
+    def compute_vectorized(a, b):
+        if (b == 0).any():
+            raise OperationError("Modulus by zero")
+        return a % b
 
 
 class IntDivide(Operation):
+    float_exact = True
+
     def compute(self):
         if self.b == 0:
             raise OperationError("Integer division by zero")
-        return self.a // self.b
+        result = self.a // self.b
+        # Decimal's // truncates toward zero; keep float's floored semantics
+        if isinstance(result, Decimal) and result * self.b != self.a and (self.a < 0) != (self.b < 0):
+            result -= 1
+        return result
+
+    @staticmethod
+    def compute_vectorized(a, b):
+        if (b == 0).any():
+            raise OperationError("Integer division by zero")
+        return a // b
 
 
 class Percent(Operation):
@@ -81,32 +146,52 @@ class Percent(Operation):
         # percent of a with respect to b: (a / b) * 100
         if self.b == 0:
             raise OperationError("Percent calculation division by zero")
-        return (self.a / self.b) * 100.0
+        return (self.a / self.b) * 100
+
+    @staticmethod
+    def compute_vectorized(a, b):
+        if (b == 0).any():
+            raise OperationError("Percent calculation division by zero")
+        return (a / b) * 100.0
 
 
 class AbsDiff(Operation):
+    float_exact = True
+
     def compute(self):
         return abs(self.a - self.b)
 
 
 class OperationFactory:
-    _map = {
-        "add": Add,
-        "subtract": Subtract,
-        "multiply": Multiply,
-        "divide": Divide,
-        "power": Power,
-        "root": Root,
-        "modulus": Modulus,
-        "int_divide": IntDivide,
-        "percent": Percent,
-        "abs_diff": AbsDiff,
-    }
+    registry = OperationRegistry(
+        cfg.plugins_dir,
+        builtins={
+            "add": Add,
+            "subtract": Subtract,
+            "multiply": Multiply,
+            "divide": Divide,
+            "power": Power,
+            "root": Root,
+            "modulus": Modulus,
+            "int_divide": IntDivide,
+            "percent": Percent,
+            "abs_diff": AbsDiff,
+        },
+    )
+
+    @classmethod
+    def create(cls, name: str, a, b, engine: NumericEngine | None = None) -> Operation:
+        OpClass = cls.registry.get(name)
+        return OpClass(a, b, engine)
+
+    @classmethod
+    def register(cls, name: str, operation: type):
+        cls.registry.register(name, operation)
+
+    @classmethod
+    def supports(cls, name: str) -> bool:
+        return name in cls.registry
 
     @classmethod
-    def create(cls, name: str, a, b) -> Operation:
-        key = name.lower()
-        if key not in cls._map:
-            raise OperationError(f"Unsupported operation: {name}")
-        OpClass = cls._map[key]
-        return OpClass(a, b)
+    def names(cls):
+        return cls.registry.names()
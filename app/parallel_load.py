@@ -0,0 +1,215 @@
+# app/parallel_load.py
+"""
+Multi-core loading of large history CSVs.
+
+The file is split into byte ranges that start and end on row boundaries.
+Each range is parsed in a worker process -- CSV fields, numbers and ISO
+timestamps -- into columns (``RangeColumns``: operation codes, operand,
+result, nanosecond and ``seq`` arrays, with the few exact or text values,
+expressions and naive timestamps kept aside by row index). Arrays pickle as raw bytes, so
+sending a range back costs a copy rather than a pickle per record; the
+parent builds the ``Calculation`` records, in file order.
+
+``Calculator.load_history`` uses this when ``load_workers`` is not 1 and
+the file has at least ``parallel_load_min_bytes``; otherwise the file is
+read with pandas as before.
+
+Quoted fields may contain newlines (an expression's bound variables are
+recorded as given), so ranges only end on a newline that is outside
+quotes: one with an even number of ``"`` before it, as CSV escapes a quote
+by doubling it.
+"""
+import csv
+import io
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from .calculation import Calculation, datetime_to_ns, observe_seq, parse_number
+from .calculator_config import CalculatorConfig
+from .exceptions import PersistenceError
+
+cfg = CalculatorConfig()
+
+# ranges per worker, so a slow range does not leave the other cores idle
+_RANGES_PER_WORKER = 4
+_BLOCK = 1 << 20
+_NAIVE_EPOCH = datetime(1970, 1, 1)
+
+
+@dataclass
+class RangeColumns:
+    """The rows of one byte range, column by column."""
+    operations: List[str] = field(default_factory=list)
+    codes: array = field(default_factory=lambda: array("H"))
+    operand_1: array = field(default_factory=lambda: array("d"))
+    operand_2: array = field(default_factory=lambda: array("d"))
+    results: array = field(default_factory=lambda: array("d"))
+    ts_ns: array = field(default_factory=lambda: array("q"))
+    # -1 where the file has no seq (older files): numbered when built
+    seqs: array = field(default_factory=lambda: array("q"))
+    # row index -> value, for the rows that do not fit the arrays: operands
+    # and result of rows with exact (Decimal, Fraction) or text values
+    values: Dict[int, tuple] = field(default_factory=dict)
+    expressions: Dict[int, str] = field(default_factory=dict)
+    naive: List[int] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+
+def _count_quotes(f, start: int, end: int) -> int:
+    f.seek(start)
+    count = 0
+    while start < end:
+        block = f.read(min(_BLOCK, end - start))
+        if not block:
+            break
+        count += block.count(b'"')
+        start += len(block)
+    return count
+
+
+def split_ranges(path: str, parts: int) -> Tuple[bytes, List[Tuple[int, int]]]:
+    """Header line and up to ``parts`` ``(start, end)`` byte ranges of whole rows."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        header = f.readline()
+        start = f.tell()
+        ranges = []
+        step = max((size - start) // max(parts, 1), 1)
+        while start < size:
+            target = min(start + step, size)
+            # parity of the quotes since ``start`` (a row boundary) tells
+            # whether a newline is inside a quoted field
+            quotes = _count_quotes(f, start, target)
+            f.seek(target)
+            while f.tell() < size:
+                quotes += f.readline().count(b'"')  # to the end of the current line
+                if quotes % 2 == 0:
+                    break
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return header, ranges
+
+
+def parse_range(path: str, start: int, end: int, header: bytes, encoding: str = "utf-8") -> RangeColumns:
+    """Parse the rows in ``[start, end)`` into columns (runs in worker processes)."""
+    columns = next(csv.reader([header.decode(encoding)]))
+    index = {name: i for i, name in enumerate(columns)}
+    i_op, i_a, i_b = index["operation"], index["operand_1"], index["operand_2"]
+    i_result, i_ts = index["result"], index["timestamp"]
+    i_expr = index.get("expression")
+    i_seq = index.get("seq")
+
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode(encoding)
+
+    out = RangeColumns()
+    codes: Dict[str, int] = {}
+    nan = float("nan")
+    fromisoformat = datetime.fromisoformat
+    for row in csv.reader(io.StringIO(text)):
+        if not row:
+            continue
+        n = len(out.codes)
+        op = row[i_op]
+        code = codes.get(op)
+        if code is None:
+            code = codes[op] = len(out.operations)
+            out.operations.append(op)
+        out.codes.append(code)
+
+        expression = row[i_expr] if i_expr is not None and i_expr < len(row) else ""
+        if expression:
+            out.expressions[n] = expression
+            a = b = ""
+        else:
+            a, b = row[i_a], row[i_b]
+        try:
+            values = (float(a) if a else nan, float(b) if b else nan, float(row[i_result]))
+        except ValueError:
+            # exact values ("fraction:1/3") and complex results, decoded as
+            # ``Calculation.from_dict`` decodes them for the sequential load
+            out.values[n] = tuple(parse_number(v) if v else nan for v in (a, b, row[i_result]))
+            values = (nan, nan, nan)
+        out.operand_1.append(values[0])
+        out.operand_2.append(values[1])
+        out.results.append(values[2])
+
+        ts = fromisoformat(row[i_ts])
+        if ts.tzinfo is None:
+            out.naive.append(n)
+        out.ts_ns.append(datetime_to_ns(ts))
+        seq = row[i_seq] if i_seq is not None and i_seq < len(row) else ""
+        out.seqs.append(int(float(seq)) if seq else -1)
+    return out
+
+
+def build_records(columns: RangeColumns) -> List[Calculation]:
+    """``Calculation`` records for a parsed range, in row order."""
+    ops = [columns.operations[code] for code in columns.codes]
+    if columns.seqs:
+        observe_seq(max(columns.seqs))
+    records = [
+        Calculation(op, (a, b), result, ts_ns=ns, seq=seq if seq >= 0 else None)
+        for op, a, b, result, ns, seq in zip(
+            ops, columns.operand_1, columns.operand_2, columns.results, columns.ts_ns, columns.seqs
+        )
+    ]
+    if columns.values or columns.expressions or columns.naive:
+        for i in sorted({*columns.values, *columns.expressions, *columns.naive}):
+            calc = records[i]
+            operands, result = calc.operands, calc.result
+            if i in columns.values:
+                *operands, result = columns.values[i]
+                operands = tuple(operands)
+            expression = columns.expressions.get(i)
+            if expression is not None:
+                operands = ()
+            if i in columns.naive:
+                timestamp = _NAIVE_EPOCH + timedelta(microseconds=calc.ts_ns // 1000)
+                records[i] = Calculation(calc.operation, operands, result, timestamp, expression, seq=calc.seq)
+            else:
+                records[i] = Calculation(
+                    calc.operation, operands, result, expression=expression, ts_ns=calc.ts_ns, seq=calc.seq
+                )
+    return records
+
+
+def read_history_parallel(
+    path: str,
+    workers: Optional[int] = None,
+    encoding: str | None = None,
+) -> List[Calculation]:
+    """All rows of a history CSV, parsed across ``workers`` processes, in file order."""
+    encoding = encoding or cfg.default_encoding
+    workers = workers or cfg.load_workers or os.cpu_count() or 1
+    try:
+        header, ranges = split_ranges(path, workers * _RANGES_PER_WORKER)
+        if workers == 1 or len(ranges) <= 1:
+            chunks = [parse_range(path, start, end, header, encoding) for start, end in ranges]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # map keeps submission order, so ranges come back in file order
+                chunks = list(
+                    pool.map(
+                        parse_range,
+                        [path] * len(ranges),
+                        [start for start, _ in ranges],
+                        [end for _, end in ranges],
+                        [header] * len(ranges),
+                        [encoding] * len(ranges),
+                    )
+                )
+    except (OSError, ValueError, KeyError, IndexError) as e:
+        raise PersistenceError(f"Failed to parse {path}: {e}")
+
+    calcs: List[Calculation] = []
+    for chunk in chunks:
+        calcs.extend(build_records(chunk))
+    return calcs
@@ -0,0 +1,237 @@
+# app/persistence.py
+"""
+Crash-safe history persistence.
+
+``atomic_write`` writes to a temporary file in the target directory, fsyncs
+it and renames it over the target, so a crash leaves either the old or the
+new file, never a torn one.
+
+``WriteAheadLog`` appends calculations as JSON lines next to the history CSV.
+Writes are flushed to the OS immediately and fsynced in groups (every
+``fsync_batch`` records or ``fsync_interval`` seconds, i.e. group commit).
+The log is replayed at load time and truncated once its rows have been
+checkpointed into the CSV.
+"""
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+from .calculation import parse_seq
+from .calculator_config import CalculatorConfig
+from .serialization import decode_exact, encode_exact
+
+cfg = CalculatorConfig()
+
+WAL_SUFFIX = ".wal"
+
+
+def _fsync_dir(directory: str):
+    # make the rename itself durable; not supported on every platform
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_writer(path: str):
+    """
+    Binary file object whose contents replace ``path`` atomically when the
+    block exits cleanly (for output that is streamed rather than built in
+    memory). On error the target is left untouched.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(directory)
+
+
+def atomic_write(path: str, data: bytes):
+    """Replace ``path`` with ``data`` atomically (write temp, fsync, rename)."""
+    with atomic_writer(path) as f:
+        f.write(data)
+
+
+def unapplied_records(records: List[dict], last_row: dict | None) -> List[dict]:
+    """
+    Drop WAL records already present in the CSV.
+
+    A checkpoint appends WAL records, in order, to the end of the CSV and then
+    truncates the log. If a crash happens between the two steps, the CSV's
+    last row matches a WAL record and everything up to it is already applied.
+    Rows are matched on their ``seq``, so records sharing a timestamp stay
+    apart; files and logs written before ``seq`` was saved fall back to
+    operation and timestamp.
+    """
+    if not last_row:
+        return records
+    seq = parse_seq(last_row.get("seq"))
+    if seq is not None and records and parse_seq(records[-1].get("seq")) is not None:
+        def key(r):
+            return parse_seq(r.get("seq"))
+
+        target = seq
+    else:
+        def key(r):
+            return str(r.get("operation")), str(r.get("timestamp"))
+
+        target = key(last_row)
+    for i in range(len(records) - 1, -1, -1):
+        if key(records[i]) == target:
+            return records[i + 1:]
+    return records
+
+
+class WriteAheadLog:
+    def __init__(self, path: str, fsync_batch: int | None = None, fsync_interval: float | None = None):
+        self.path = path
+        self._fsync_batch = cfg.wal_fsync_batch if fsync_batch is None else fsync_batch
+        self._fsync_interval = cfg.wal_fsync_interval if fsync_interval is None else fsync_interval
+        self._lock = threading.Lock()
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._pending: int | None = None
+
+    def _open(self):
+        if self._file is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._drop_torn_tail()
+            self._file = open(self.path, "ab")
+        return self._file
+
+    def _drop_torn_tail(self):
+        # a crash mid-append leaves a partial last line; cut it so new
+        # records start on a fresh line
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    @property
+    def pending(self) -> int:
+        """Number of records in the log (not yet checkpointed)."""
+        if self._pending is None:
+            self._pending = len(self.replay())
+        return self._pending
+
+    def append(self, record: dict):
+        self.append_many([record])
+
+    def append_many(self, records: List[dict]):
+        data = b"".join(
+            json.dumps(r, default=encode_exact, separators=(",", ":")).encode("utf-8") + b"\n" for r in records
+        )
+        self.append_raw(data, len(records))
+
+    def append_raw(self, data: bytes, count: int):
+        """Append ``count`` already-encoded JSON lines."""
+        with self._lock:
+            pending = self.pending
+            f = self._open()
+            f.write(data)
+            f.flush()
+            self._pending = pending + count
+            self._unsynced += count
+            # group commit: one fsync covers every record written since the last
+            if self._unsynced >= self._fsync_batch or time.monotonic() - self._last_sync >= self._fsync_interval:
+                self._sync_locked()
+
+    def _sync_locked(self):
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def sync(self):
+        with self._lock:
+            self._sync_locked()
+
+    def replay(self) -> List[dict]:
+        """Return logged records in order, ignoring a torn trailing line."""
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line, object_hook=decode_exact))
+                except ValueError:
+                    # torn trailing write from a crash
+                    continue
+        return records
+
+    def truncate(self):
+        """Discard the log after its records were checkpointed."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if os.path.exists(self.path):
+                os.remove(self.path)
+                _fsync_dir(os.path.dirname(os.path.abspath(self.path)))
+            self._pending = 0
+            self._unsynced = 0
+
+    def close(self):
+        with self._lock:
+            self._sync_locked()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_wals: Dict[str, WriteAheadLog] = {}
+_wals_lock = threading.Lock()
+
+
+def get_wal(csv_path: str) -> WriteAheadLog:
+    """Shared write-ahead log for a history CSV (one instance per file)."""
+    key = os.path.abspath(csv_path)
+    with _wals_lock:
+        wal = _wals.get(key)
+        if wal is None:
+            wal = _wals[key] = WriteAheadLog(csv_path + WAL_SUFFIX)
+        return wal
+
+
+def release_wal(csv_path: str):
+    """Close a history CSV's write-ahead log and forget it (``get_wal`` reopens it)."""
+    key = os.path.abspath(csv_path)
+    with _wals_lock:
+        wal = _wals.pop(key, None)
+    if wal is not None:
+        wal.close()
+
+
+@atexit.register
+def _close_wals():
+    for wal in list(_wals.values()):
+        try:
+            wal.close()
+        except Exception:
+            pass
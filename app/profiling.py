@@ -0,0 +1,185 @@
+# app/profiling.py
+"""
+On-demand profiling of a running calculator session.
+
+``Profiler.start`` turns on two collectors for the calling thread, which is
+where operations, observers (autosave, logging, event stream writes) and
+undo snapshots run:
+
+- ``cProfile``, for exact call counts and times,
+- a sampling thread that records that thread's Python stack every
+  ``interval`` seconds.
+
+``stop`` returns a ``ProfileReport`` covering calculator code only:
+
+- ``summary()`` lists the calculator functions with the most *own* time,
+  where own time also counts the time spent in the library calls the
+  function makes directly (pandas, ``json``, ``logging``...). A slow
+  autosave therefore shows up as ``AutoSaveObserver.update`` rather than as
+  pandas internals.
+- ``write_collapsed(path)`` writes the samples as collapsed stacks
+  (``frame;frame;frame count`` per line), the input format of
+  ``flamegraph.pl`` and speedscope. Library frames are folded into one
+  frame per package, e.g. ``[pandas]``.
+
+Samples taken while the REPL waits for input contain no calculator frames
+and are dropped.
+"""
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from .calculator_config import CalculatorConfig
+from .exceptions import PersistenceError, ValidationError
+
+cfg = CalculatorConfig()
+
+_APP_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+# the REPL loop and the profiler itself are not calculator code paths
+_SKIPPED = {os.path.join(_APP_DIR, "calculator_repl.py"), os.path.abspath(__file__)}
+
+
+def _is_app(filename: str) -> bool:
+    return filename.startswith(_APP_DIR) and filename not in _SKIPPED
+
+
+def _app_label(module: str, qualname: str) -> str:
+    return f"{module.removeprefix('app.')}:{qualname}"
+
+
+def _frame_label(frame) -> Tuple[str, bool]:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    if _is_app(code.co_filename):
+        return _app_label(module, code.co_qualname), True
+    return f"[{module.partition('.')[0]}]", False
+
+
+def collapse_stack(frame) -> Optional[str]:
+    """
+    ``outer;...;inner`` for a frame's stack, from the outermost calculator
+    frame inwards (None when there is none); runs of library frames are
+    folded into one ``[package]`` frame.
+    """
+    labels: List[Tuple[str, bool]] = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    first = next((i for i, (_, app) in enumerate(labels) if app), None)
+    if first is None:
+        return None
+    out: List[str] = []
+    for label, app in labels[first:]:
+        if app or not out or out[-1] != label:
+            out.append(label)
+    return ";".join(out)
+
+
+class ProfileReport:
+    def __init__(self, stats: pstats.Stats, samples: Counter, interval: float, seconds: float):
+        self.stats = stats
+        self.samples = samples
+        self.interval = interval
+        self.seconds = seconds
+
+    def hotspots(self, limit: int = 20) -> List[Tuple[str, int, float, float]]:
+        """
+        ``(function, calls, own seconds, cumulative seconds)`` for calculator
+        functions, most own time first; own time includes direct library calls.
+        """
+        raw: Dict[tuple, tuple] = self.stats.stats  # type: ignore[attr-defined]
+        own: Dict[tuple, float] = {}
+        for func, (_, _, tottime, _, callers) in raw.items():
+            if _is_app(func[0]):
+                own[func] = own.get(func, 0.0) + tottime
+                continue
+            # library (or builtin) call: charge it to the calculator functions that made it
+            for caller, edge in callers.items():
+                if _is_app(caller[0]):
+                    own[caller] = own.get(caller, 0.0) + edge[3]
+        rows = []
+        for func, seconds in own.items():
+            if func not in raw:
+                continue
+            calls, cumulative = raw[func][1], raw[func][3]
+            rows.append((self._name(func), calls, seconds, cumulative))
+        rows.sort(key=lambda r: r[2], reverse=True)
+        return rows[:limit]
+
+    @staticmethod
+    def _name(func: tuple) -> str:
+        filename, line, name = func
+        module = "app." + os.path.splitext(os.path.relpath(filename, _APP_DIR))[0].replace(os.sep, ".")
+        return f"{_app_label(module, name)}:{line}"
+
+    def summary(self, limit: int = 20) -> str:
+        lines = [
+            f"Profiled {self.seconds:.2f} s, {sum(self.samples.values())} samples "
+            f"every {self.interval * 1e3:g} ms",
+            f"{'own s':>9} {'cum s':>9} {'calls':>9}  function",
+        ]
+        for name, calls, own, cumulative in self.hotspots(limit):
+            lines.append(f"{own:>9.4f} {cumulative:>9.4f} {calls:>9}  {name}")
+        return "\n".join(lines)
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.samples.items()))
+
+    def write_collapsed(self, path: str):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(self.collapsed())
+        except OSError as e:
+            raise PersistenceError(f"Failed to write profile to {path}: {e}")
+
+
+class Profiler:
+    """cProfile plus stack sampling of the thread that calls ``start``."""
+
+    def __init__(self, interval: float | None = None):
+        self.interval = interval or cfg.profile_interval
+        self._profile: Optional[cProfile.Profile] = None
+        self._samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._started = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._profile is not None
+
+    def start(self):
+        if self.running:
+            raise ValidationError("Profiling is already running")
+        self._samples = Counter()
+        self._stop.clear()
+        target = threading.get_ident()
+        self._sampler = threading.Thread(target=self._sample, args=(target,), name="profile-sampler", daemon=True)
+        self._profile = cProfile.Profile()
+        self._started = time.perf_counter()
+        self._sampler.start()
+        self._profile.enable()
+
+    def _sample(self, target: int):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(target)
+            stack = collapse_stack(frame) if frame is not None else None
+            if stack is not None:
+                self._samples[stack] += 1
+
+    def stop(self) -> ProfileReport:
+        if not self.running:
+            raise ValidationError("Profiling is not running")
+        self._profile.disable()
+        seconds = time.perf_counter() - self._started
+        self._stop.set()
+        self._sampler.join()
+        stats = pstats.Stats(self._profile)
+        self._profile = self._sampler = None
+        return ProfileReport(stats, self._samples, self.interval, seconds)
@@ -0,0 +1,258 @@
+# app/quantiles.py
+"""
+Streaming quantiles over calculation results and compute times.
+
+``KLLSketch`` is a KLL quantile sketch (Karnin, Lang & Liberty): a stack of
+compactors where level ``h`` holds items of weight ``2**h``. When a level
+fills up it is sorted and every other item (random offset) is promoted to
+the next level. Memory stays around ``3 * k`` items however many values are
+added, and the rank error is roughly ``1.7 / k`` (about 1% for the default
+``k=200``). Two sketches merge by concatenating their levels and
+compacting, so sketches built in different processes combine into one.
+
+``CalculationStats`` keeps one result sketch and one latency sketch per
+operation; ``Calculator`` feeds it from ``perform``, ``perform_many`` and
+``evaluate``.
+"""
+import math
+import random
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence
+from .calculator_config import CalculatorConfig
+from .exceptions import ValidationError
+
+cfg = CalculatorConfig()
+
+# each level's capacity is this fraction of the one above it
+_DECAY = 2 / 3
+_MIN_CAPACITY = 2
+
+
+class KLLSketch:
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        if k < 8:
+            raise ValidationError(f"Sketch size k must be at least 8, got {k}")
+        self.k = k
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._levels: List[list] = [[]]
+        self._size = 0
+        self._limit = self._capacity(0)
+        self._rng = random.Random(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - level - 1
+        return max(_MIN_CAPACITY, int(math.ceil(self.k * _DECAY ** depth)))
+
+    def _update_limit(self):
+        self._limit = sum(self._capacity(h) for h in range(len(self._levels)))
+
+    # ===== Updates =====
+    def update(self, value: float):
+        value = float(value)
+        if value != value:  # NaN has no rank
+            return
+        self.n += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self._levels[0].append(value)
+        self._size += 1
+        if self._size >= self._limit:
+            self._compress()
+
+    def update_many(self, values: Iterable[float]):
+        for value in values:
+            self.update(value)
+
+    def _compress(self):
+        for h in range(len(self._levels)):
+            level = self._levels[h]
+            if len(level) < self._capacity(h):
+                continue
+            if h + 1 == len(self._levels):
+                self._levels.append([])
+                self._update_limit()
+            level.sort()
+            # an odd item out stays behind, so weights stay exact
+            keep = [level.pop()] if len(level) % 2 else []
+            self._levels[h + 1].extend(level[self._rng.getrandbits(1)::2])
+            self._levels[h] = keep
+            self._size = sum(map(len, self._levels))
+            if self._size < self._limit:
+                break
+
+    def merge(self, other: "KLLSketch"):
+        """Fold ``other`` into this sketch (``other`` is not modified)."""
+        if other.n == 0:
+            return self
+        while len(self._levels) < len(other._levels):
+            self._levels.append([])
+        for h, level in enumerate(other._levels):
+            self._levels[h].extend(level)
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._update_limit()
+        self._size = sum(map(len, self._levels))
+        while self._size >= self._limit:
+            self._compress()
+        return self
+
+    # ===== Queries =====
+    def _cumulative(self):
+        weighted = sorted((v, 1 << h) for h, level in enumerate(self._levels) for v in level)
+        values, cumulative, total = [], [], 0
+        for value, weight in weighted:
+            total += weight
+            values.append(value)
+            cumulative.append(total)
+        return values, cumulative, total
+
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        """Estimated values at each rank fraction in ``qs`` (None when empty)."""
+        for q in qs:
+            if not 0 <= q <= 1:
+                raise ValidationError(f"Quantile must be between 0 and 1, got {q}")
+        if self.n == 0:
+            return [None] * len(qs)
+        values, cumulative, total = self._cumulative()
+        out = []
+        for q in qs:
+            if q == 0:
+                out.append(self.min)
+            elif q == 1:
+                out.append(self.max)
+            else:
+                i = bisect_left(cumulative, q * total)
+                out.append(values[min(i, len(values) - 1)])
+        return out
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.quantiles((q,))[0]
+
+    def rank(self, value: float) -> float:
+        """Estimated fraction of values ``<= value``."""
+        if self.n == 0:
+            return 0.0
+        values, cumulative, total = self._cumulative()
+        i = bisect_left(values, value)
+        while i < len(values) and values[i] == value:
+            i += 1
+        return cumulative[i - 1] / total if i else 0.0
+
+    def retained(self) -> int:
+        """Items currently held (the sketch's memory footprint)."""
+        return self._size
+
+    # ===== Serialisation =====
+    def to_dict(self) -> dict:
+        """JSON-friendly state, for shipping sketches between processes."""
+        return {
+            "k": self.k,
+            "n": self.n,
+            "min": self.min if self.n else None,
+            "max": self.max if self.n else None,
+            "levels": [list(level) for level in self._levels],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "KLLSketch":
+        sketch = cls(int(data["k"]))
+        sketch.n = int(data["n"])
+        if sketch.n:
+            sketch.min, sketch.max = float(data["min"]), float(data["max"])
+        sketch._levels = [[float(v) for v in level] for level in data["levels"]] or [[]]
+        sketch._size = sum(map(len, sketch._levels))
+        sketch._update_limit()
+        return sketch
+
+
+class CalculationStats:
+    """Per-operation result and latency sketches."""
+
+    KINDS = ("result", "latency")
+
+    def __init__(self, k: int | None = None):
+        self.k = k or cfg.sketch_k
+        self._sketches: Dict[str, Dict[str, KLLSketch]] = {}
+        self._lock = threading.Lock()
+
+    def _for(self, operation: str) -> Dict[str, KLLSketch]:
+        # keyed like the operation registry, so "ADD" and "add" share sketches
+        operation = operation.lower()
+        sketches = self._sketches.get(operation)
+        if sketches is None:
+            sketches = self._sketches[operation] = {kind: KLLSketch(self.k) for kind in self.KINDS}
+        return sketches
+
+    def record(self, operation: str, result, seconds: float):
+        """Add one calculation; non-real or non-finite results only count towards latency."""
+        with self._lock:
+            sketches = self._for(operation)
+            sketches["latency"].update(seconds)
+            try:
+                value = float(result)
+            except (TypeError, ValueError, OverflowError):
+                return
+            if math.isfinite(value):
+                sketches["result"].update(value)
+
+    def operations(self) -> List[str]:
+        return sorted(self._sketches)
+
+    def sketch(self, operation: str | None = None, kind: str = "result") -> KLLSketch:
+        """The sketch for one operation, or all operations merged when None."""
+        if kind not in self.KINDS:
+            raise ValidationError(f"Unknown statistic: {kind} (expected one of {', '.join(self.KINDS)})")
+        with self._lock:
+            if operation is not None:
+                sketches = self._sketches.get(operation.lower())
+                return KLLSketch.from_dict(sketches[kind].to_dict()) if sketches else KLLSketch(self.k)
+            merged = KLLSketch(self.k)
+            for sketches in self._sketches.values():
+                merged.merge(sketches[kind])
+            return merged
+
+    def quantiles(self, qs: Sequence[float], operation: str | None = None, kind: str = "result"):
+        return self.sketch(operation, kind).quantiles(qs)
+
+    def count(self, operation: str | None = None) -> int:
+        with self._lock:
+            if operation is not None:
+                sketches = self._sketches.get(operation.lower())
+                return sketches["latency"].n if sketches else 0
+            return sum(s["latency"].n for s in self._sketches.values())
+
+    def merge(self, other: "CalculationStats"):
+        """Fold another process's (or session's) stats into these."""
+        for operation, theirs in other.to_dict()["operations"].items():
+            with self._lock:
+                ours = self._for(operation)
+                for kind in self.KINDS:
+                    ours[kind].merge(KLLSketch.from_dict(theirs[kind]))
+        return self
+
+    def clear(self):
+        with self._lock:
+            self._sketches.clear()
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "k": self.k,
+                "operations": {
+                    op: {kind: sketch.to_dict() for kind, sketch in sketches.items()}
+                    for op, sketches in self._sketches.items()
+                },
+            }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CalculationStats":
+        stats = cls(int(data["k"]))
+        for op, sketches in data["operations"].items():
+            stats._sketches[op] = {kind: KLLSketch.from_dict(sketches[kind]) for kind in cls.KINDS}
+        return stats
@@ -0,0 +1,143 @@
+# app/reductions.py
+"""
+N-ary reductions over a whole sequence of operands.
+
+``sum``, ``product``, ``min``, ``max`` and ``mean`` fold any number of
+operands into one result, and the cumulative variants (``cumsum``,
+``cumprod``, ``cummin``, ``cummax``) also return every running value. Under
+the float engine operands are validated and reduced as one numpy array;
+sums and means use ``math.fsum`` (exactly rounded), the rest are numpy
+reductions. The exact engines reduce their own ``Decimal``/``Fraction``
+values, under the engine's decimal context.
+
+``Calculator.reduce``/``accumulate`` record a reduction as a single history
+entry. Its operands are not stored: the entry's expression names the
+operand count and a hash of the operands (see ``operand_ref``), e.g.
+``sum(<10000 operands #3f2a...>)``.
+"""
+import decimal
+import hashlib
+import itertools
+import math
+import operator
+from contextlib import nullcontext
+from typing import Any
+from .calculator_config import CalculatorConfig
+from .exceptions import OperationError, ValidationError
+from .numeric import NumericEngine
+
+cfg = CalculatorConfig()
+
+REDUCTIONS = ("sum", "product", "min", "max", "mean")
+# cumulative variant -> the reduction it runs
+ACCUMULATIONS = {"cumsum": "sum", "cumprod": "product", "cummin": "min", "cummax": "max"}
+
+_STEPS = {"sum": operator.add, "product": operator.mul, "min": min, "max": max}
+
+
+def is_reduction(name: str) -> bool:
+    return name in REDUCTIONS or name in ACCUMULATIONS
+
+
+def operand_ref(values) -> str:
+    """Short content hash of coerced operands, recorded in place of the operands."""
+    digest = hashlib.blake2b(digest_size=8)
+    if hasattr(values, "tobytes"):
+        digest.update(values.tobytes())
+    else:
+        digest.update("\0".join(map(str, values)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def describe(name: str, values) -> str:
+    """History expression for a reduction over ``values``."""
+    return f"{name}(<{len(values)} operands #{operand_ref(values)}>)"
+
+
+def _context(engine: NumericEngine):
+    context = getattr(engine, "context", None)
+    return decimal.localcontext(context) if context is not None else nullcontext()
+
+
+def _check(name: str, values):
+    if name not in REDUCTIONS and name not in ACCUMULATIONS:
+        raise OperationError(f"Unsupported reduction: {name}")
+    if not len(values):
+        raise ValidationError(f"{name} requires at least one operand")
+
+
+def _finite(name: str, result: float, values) -> float:
+    import numpy as np
+
+    if not math.isfinite(result) and np.isfinite(values).all():
+        raise OperationError(f"{name} overflowed")
+    return result
+
+
+def reduce_values(engine: NumericEngine, name: str, values) -> Any:
+    """Fold coerced ``values`` (from ``engine.coerce_many``) with reduction ``name``."""
+    _check(name, values)
+    if name not in REDUCTIONS:
+        raise OperationError(f"Unsupported reduction: {name}")
+    if hasattr(values, "dtype"):
+        import numpy as np
+
+        if name in ("sum", "mean"):
+            # tolist() first: fsum over Python floats is several times faster
+            total = math.fsum(values.tolist())
+            return _finite(name, total / len(values) if name == "mean" else total, values)
+        if name == "product":
+            with np.errstate(over="ignore"):
+                return _finite(name, float(values.prod()), values)
+        return float(values.min() if name == "min" else values.max())
+
+    with _context(engine):
+        try:
+            if name == "mean":
+                return sum(values[1:], values[0]) / len(values)
+            return _reduce_exact(name, values)
+        except decimal.DecimalException as e:
+            raise OperationError(f"Decimal error: {e!r}")
+
+
+def _reduce_exact(name: str, values):
+    if name == "sum":
+        return sum(values[1:], values[0])
+    if name == "product":
+        return math.prod(values[1:], start=values[0])
+    return min(values) if name == "min" else max(values)
+
+
+def accumulate_values(engine: NumericEngine, name: str, values):
+    """
+    Running values of cumulative reduction ``name``: a float64 array under
+    the float engine, a list under the exact engines.
+    """
+    _check(name, values)
+    base = ACCUMULATIONS.get(name)
+    if base is None:
+        raise OperationError(f"Unsupported cumulative reduction: {name}")
+    if hasattr(values, "dtype"):
+        import numpy as np
+
+        ufunc = {"sum": np.add, "product": np.multiply, "min": np.minimum, "max": np.maximum}[base]
+        with np.errstate(over="ignore", invalid="ignore"):
+            running = ufunc.accumulate(values)
+        _finite(name, float(running[-1]), values)
+        return running
+
+    with _context(engine):
+        try:
+            return list(itertools.accumulate(values, _STEPS[base]))
+        except decimal.DecimalException as e:
+            raise OperationError(f"Decimal error: {e!r}")
+
+
+def round_running(engine: NumericEngine, running, precision: int):
+    """Apply the engine's result rounding to every running value."""
+    if hasattr(running, "dtype"):
+        import numpy as np
+
+        # + 0.0 turns -0.0 into 0.0, like NumericEngine.round
+        return np.round(running, precision) + 0.0
+    return [engine.round(v, precision) for v in running]
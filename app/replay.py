@@ -0,0 +1,312 @@
+# app/replay.py
+"""
+Replay and verify a stored history file.
+
+Every binary-operation row of a history CSV is re-executed through the
+operation registry and compared with the recorded ``result`` within the
+configured ``precision``. The file is streamed in chunks; chunks are checked
+in worker processes, and each chunk is evaluated per operation with
+``OperationRegistry.compute_many``. Rows with Decimal or Fraction values are
+replayed one by one with that numeric engine. No ``Calculator`` is involved,
+so the live history, undo stack and observers are untouched.
+
+    python -m app.replay [path] [--workers N] [--chunk-size N]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field, replace
+from decimal import Decimal
+from fractions import Fraction
+from typing import List, Optional, Tuple
+from .calculation import parse_number
+from .calculator_config import CalculatorConfig
+from .exceptions import CalculatorError, PersistenceError
+
+cfg = CalculatorConfig()
+
+
+@dataclass
+class ReplayMismatch:
+    row: int
+    operation: str
+    operands: Tuple[object, object]
+    recorded: object
+    replayed: object = None
+    error: Optional[str] = None
+
+    def __str__(self) -> str:
+        a, b = self.operands
+        got = self.error if self.error is not None else self.replayed
+        return f"row {self.row}: {self.operation}({a}, {b}) recorded {self.recorded}, replayed {got}"
+
+
+@dataclass
+class ReplayReport:
+    rows: int = 0
+    checked: int = 0
+    # rows that are not a single binary operation (e.g. expressions)
+    skipped: int = 0
+    mismatches: List[ReplayMismatch] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.mismatches
+
+    @property
+    def throughput(self) -> float:
+        """Rows per second."""
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def merge(self, other: "ReplayReport"):
+        self.rows += other.rows
+        self.checked += other.checked
+        self.skipped += other.skipped
+        self.mismatches.extend(other.mismatches)
+
+
+def _replay_one(name: str, a: float, b: float):
+    from .operations import OperationFactory
+    return OperationFactory.create(name, a, b).compute()
+
+
+def _as_complex(value) -> Optional[complex]:
+    try:
+        return complex(str(value).replace(" ", ""))
+    except (TypeError, ValueError):
+        return None
+
+
+def verify_chunk(
+    start: int, ops, a, b, recorded, precision: int, config: CalculatorConfig | None = None
+) -> ReplayReport:
+    """
+    Check one chunk of rows (``start`` is the row number of the first one).
+    Runs in worker processes, so it only takes plain lists. Rows with exact
+    (Decimal or Fraction) values are replayed with that numeric engine and
+    compared exactly; ``config`` supplies the engines' settings.
+    """
+    import numpy as np
+    from .operations import OperationFactory
+
+    report = ReplayReport(rows=len(ops))
+    ops = np.asarray(ops, dtype=object)
+    (a_raw, a, parsed_a), (b_raw, b, parsed_b), (recorded_raw, recorded, parsed) = map(_column, (a, b, recorded))
+    if parsed_a or parsed_b or parsed:
+        exact = np.array([_exact_type(*row) is not None for row in zip(a_raw, b_raw, recorded_raw)], dtype=bool)
+    else:
+        exact = np.zeros(len(ops), dtype=bool)
+    # results are stored rounded to ``precision`` places
+    tolerance = 10.0 ** -precision
+
+    binary = ~(np.isnan(a) | np.isnan(b))
+    report.skipped = int((~binary).sum())
+
+    def mismatch(i, replayed=None, error=None):
+        report.mismatches.append(
+            ReplayMismatch(start + int(i), ops[i], (a_raw[i], b_raw[i]), recorded_raw[i], replayed, error)
+        )
+
+    exact_rows = np.flatnonzero(binary & exact)
+    if exact_rows.size:
+        report.checked += exact_rows.size
+        engines = _exact_engines(config or cfg)
+        for i in exact_rows:
+            if not OperationFactory.supports(ops[i]):
+                mismatch(i, error=f"Unsupported operation: {ops[i]}")
+                continue
+            engine = engines[_exact_type(a_raw[i], b_raw[i], recorded_raw[i])]
+            try:
+                value = engine.evaluate(OperationFactory.create(ops[i], a_raw[i], b_raw[i], engine))
+                value = engine.round(value, precision)
+            except (CalculatorError, ArithmeticError, ValueError, TypeError) as e:
+                mismatch(i, error=str(e))
+                continue
+            if not _exact_close(value, recorded_raw[i], precision):
+                mismatch(i, replayed=value)
+    binary &= ~exact
+
+    for name in sorted(set(ops[binary].tolist())):
+        rows = np.flatnonzero(binary & (ops == name))
+        report.checked += rows.size
+        if not OperationFactory.supports(name):
+            for i in rows:
+                mismatch(i, error=f"Unsupported operation: {name}")
+            continue
+        try:
+            replayed = OperationFactory.registry.compute_many(name, a[rows], b[rows])
+        except (CalculatorError, ArithmeticError, TypeError, ValueError):
+            # some row raises (e.g. division by zero) or has a complex result
+            # (e.g. an odd root of a negative number); check row by row
+            replayed = np.empty(rows.size, dtype=np.float64)
+            for k, i in enumerate(rows):
+                try:
+                    value = _replay_one(name, a[i], b[i])
+                except (CalculatorError, ArithmeticError, ValueError, TypeError) as e:
+                    mismatch(i, error=str(e))
+                    rows[k] = -1
+                    continue
+                if isinstance(value, complex):
+                    expected = _as_complex(recorded_raw[i])
+                    if expected is None or abs(value - expected) > tolerance + 1e-12 * abs(expected):
+                        mismatch(i, replayed=value)
+                    rows[k] = -1
+                    continue
+                replayed[k] = float(value)
+            keep = rows >= 0
+            rows, replayed = rows[keep], replayed[keep]
+
+        bad = ~np.isclose(replayed, recorded[rows], rtol=1e-12, atol=tolerance, equal_nan=True)
+        for k in np.flatnonzero(bad):
+            mismatch(rows[k], replayed=float(replayed[k]))
+
+    report.mismatches.sort(key=lambda m: m.row)
+    return report
+
+
+def _column(values):
+    """
+    ``(values, float64 array, parsed)``. Only when some text is not a plain
+    number (exact values, complex results) are the values run through
+    ``parse_number`` (``parsed`` is then True).
+    """
+    import numpy as np
+
+    values = list(values)
+    try:
+        return values, np.asarray(values, dtype=np.float64), False
+    except (TypeError, ValueError):
+        values = [parse_number(v) for v in values]
+        return values, np.array([_as_float(v) for v in values], dtype=np.float64), True
+
+
+def _as_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError, OverflowError):
+        return float("nan")
+
+
+def _exact_type(*values) -> Optional[type]:
+    """Fraction if any value is one, else Decimal if any is, else None."""
+    types = {type(v) for v in values}
+    if Fraction in types:
+        return Fraction
+    return Decimal if Decimal in types else None
+
+
+def _exact_engines(config: CalculatorConfig) -> dict:
+    from .numeric import get_engine
+
+    return {kind: get_engine(replace(config, numeric_engine=kind.__name__.lower())) for kind in (Decimal, Fraction)}
+
+
+def _exact_close(value, expected, precision: int) -> bool:
+    """
+    Compare in exact arithmetic: Fractions must match, Decimals (rounded to
+    ``precision`` places) within the rounding step.
+    """
+    if isinstance(value, complex) or isinstance(expected, (str, complex)) or expected is None:
+        return False
+    if type(value) is Fraction and type(expected) is Fraction:
+        return value == expected  # never rounded
+    try:
+        value, expected = Fraction(value), Fraction(expected)
+    except (TypeError, ValueError, OverflowError):
+        return False
+    return abs(value - expected) <= Fraction(1, 10 ** precision) + abs(expected) / 10 ** 12
+
+
+def _chunks(path: str, chunk_size: int, encoding: str):
+    import pandas as pd
+
+    start = 0
+    reader = pd.read_csv(
+        path,
+        encoding=encoding,
+        chunksize=chunk_size,
+        usecols=lambda c: c in ("operation", "operand_1", "operand_2", "result"),
+        dtype={"operation": str, "result": object},
+    )
+    with reader:
+        for df in reader:
+            yield (
+                start,
+                df["operation"].fillna("").tolist(),
+                df["operand_1"].tolist(),
+                df["operand_2"].tolist(),
+                df["result"].tolist(),
+            )
+            start += len(df)
+
+
+def replay_history(
+    path: str | None = None,
+    config: CalculatorConfig | None = None,
+    workers: int | None = None,
+    chunk_size: int = 50_000,
+) -> ReplayReport:
+    """
+    Verify every row of a history CSV (default: ``config.history_file``).
+    ``workers=1`` checks the chunks in this process.
+    """
+    config = config or cfg
+    path = path or config.history_file
+    if not os.path.exists(path):
+        raise PersistenceError(f"History file not found: {path}")
+    workers = workers or os.cpu_count() or 1
+
+    report = ReplayReport()
+    started = time.perf_counter()
+    try:
+        chunks = _chunks(path, chunk_size, config.default_encoding)
+        if workers == 1:
+            for chunk in chunks:
+                report.merge(verify_chunk(*chunk, config.precision, config))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # keep a bounded number of chunks in flight so the file is
+                # streamed rather than read up front
+                pending = set()
+                for chunk in chunks:
+                    if len(pending) >= workers * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            report.merge(future.result())
+                    pending.add(pool.submit(verify_chunk, *chunk, config.precision, config))
+                for future in pending:
+                    report.merge(future.result())
+    except (OSError, ValueError) as e:
+        raise PersistenceError(f"Failed to replay history: {e}")
+    report.elapsed = time.perf_counter() - started
+    report.mismatches.sort(key=lambda m: m.row)
+    return report
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.replay", description="Verify a history file.")
+    parser.add_argument("path", nargs="?", default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    args = parser.parse_args(argv)
+
+    try:
+        report = replay_history(args.path, workers=args.workers, chunk_size=args.chunk_size)
+    except PersistenceError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    for m in report.mismatches:
+        print(m)
+    print(
+        f"{report.rows} rows, {report.checked} checked, {report.skipped} skipped, "
+        f"{len(report.mismatches)} mismatches in {report.elapsed:.2f} s "
+        f"({report.throughput:,.0f} rows/s)"
+    )
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
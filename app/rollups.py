@@ -0,0 +1,323 @@
+# app/rollups.py
+"""
+Time-bucketed rollups of the history.
+
+For each configured resolution (``minute``, ``hour``, ``day``) a
+``RollupStore`` keeps, per time bucket and operation: the number of
+calculations, how many had a real numeric result, and the sum, min and max
+of those results. Long-range reports ("adds per hour last quarter") read
+these instead of loading and grouping the whole history CSV.
+
+Rollups are updated as calculations arrive and persisted next to the
+history file as ``<history file>.rollup-<resolution>``: an append-only
+file of fixed-size binary records. Each flush appends one *delta* record
+per bucket touched since the previous flush, and readers combine records
+of the same bucket (counts and sums add, min/max fold), so flushing
+never rewrites earlier records and late or out-of-order calculations
+need no special handling. ``compact`` folds the deltas into one record
+per bucket.
+
+Rollups describe the calculations that were performed: undo and clear
+do not subtract from them. ``python -m app.rollups build history.csv``
+builds them from an existing history file.
+"""
+import argparse
+import atexit
+import math
+import os
+import struct
+import sys
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence
+from .calculation import Calculation, datetime_to_ns, parse_number
+from .calculator_config import CalculatorConfig
+from .exceptions import PersistenceError, ValidationError
+from .persistence import atomic_writer
+
+cfg = CalculatorConfig()
+
+RESOLUTIONS = {"minute": 60, "hour": 3600, "day": 86400}
+NAME_WIDTH = 24
+
+# bucket start (epoch seconds), count, numeric count, sum, min, max, operation
+_RECORD = struct.Struct(f"<qIIddd{NAME_WIDTH}s")
+
+
+def parse_resolutions(value: str) -> List[str]:
+    names = [r.strip() for r in value.split(",") if r.strip()]
+    unknown = [r for r in names if r not in RESOLUTIONS]
+    if unknown:
+        raise ValidationError(f"Unknown rollup resolutions: {', '.join(unknown)}")
+    return names
+
+
+def rollup_path(history_path: str, resolution: str) -> str:
+    return f"{history_path}.rollup-{resolution}"
+
+
+def _numeric(result) -> Optional[float]:
+    try:
+        value = float(result)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+@dataclass
+class Rollup:
+    start: datetime
+    operation: str
+    count: int
+    numeric: int  # calculations with a real, finite result
+    total: float
+    min: Optional[float]
+    max: Optional[float]
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.numeric if self.numeric else None
+
+
+class _Bucket:
+    __slots__ = ("count", "numeric", "total", "min", "max")
+
+    def __init__(self):
+        self.count = self.numeric = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: Optional[float]):
+        self.count += 1
+        if value is not None:
+            self.numeric += 1
+            self.total += value
+            if value < self.min:
+                self.min = value
+            if value > self.max:
+                self.max = value
+
+
+class RollupStore:
+    """Rollups for one history file, at each of ``resolutions``."""
+
+    def __init__(self, history_path: str, resolutions: Sequence[str] | None = None):
+        self.history_path = history_path
+        self.resolutions = list(resolutions) if resolutions is not None else parse_resolutions(cfg.rollup_resolutions)
+        for name in self.resolutions:
+            if name not in RESOLUTIONS:
+                raise ValidationError(f"Unknown rollup resolution: {name}")
+        # resolution -> (bucket start, operation) -> changes since the last flush
+        self._pending: Dict[str, Dict[tuple, _Bucket]] = {name: {} for name in self.resolutions}
+        self._lock = threading.Lock()
+
+    def path(self, resolution: str) -> str:
+        return rollup_path(self.history_path, resolution)
+
+    # ===== Updates =====
+    def add(self, calc: Calculation):
+        self.add_many((calc,))
+
+    def add_many(self, calcs: Iterable[Calculation]):
+        with self._lock:
+            for calc in calcs:
+                self._add_locked(calc.operation, calc.ts_ns // 1_000_000_000, _numeric(calc.result))
+
+    def _add_locked(self, operation: str, seconds: int, value: Optional[float]):
+        for name, pending in self._pending.items():
+            width = RESOLUTIONS[name]
+            key = (seconds // width * width, operation)
+            bucket = pending.get(key)
+            if bucket is None:
+                bucket = pending[key] = _Bucket()
+            bucket.add(value)
+
+    def flush(self):
+        """Append the pending deltas to the rollup files."""
+        with self._lock:
+            for name, pending in self._pending.items():
+                if not pending:
+                    continue
+                data = b"".join(
+                    _RECORD.pack(start, b.count, b.numeric, b.total, b.min, b.max, op.encode("utf-8")[:NAME_WIDTH])
+                    for (start, op), b in sorted(pending.items())
+                )
+                try:
+                    with open(self.path(name), "ab") as f:
+                        # a torn record from a crash would misalign every record after it
+                        f.truncate(f.tell() - f.tell() % _RECORD.size)
+                        f.write(data)
+                except OSError as e:
+                    raise PersistenceError(f"Failed to write rollups: {e}")
+                pending.clear()
+
+    # ===== Reads =====
+    def _read(self, resolution: str) -> Dict[tuple, _Bucket]:
+        merged: Dict[tuple, _Bucket] = {}
+        try:
+            with open(self.path(resolution), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return merged
+        except OSError as e:
+            raise PersistenceError(f"Failed to read rollups: {e}")
+        usable = len(data) - len(data) % _RECORD.size
+        for start, count, numeric, total, lo, hi, name in _RECORD.iter_unpack(data[:usable]):
+            key = (start, name.rstrip(b"\0").decode("utf-8", "replace"))
+            bucket = merged.get(key)
+            if bucket is None:
+                bucket = merged[key] = _Bucket()
+            bucket.count += count
+            bucket.numeric += numeric
+            bucket.total += total
+            bucket.min = min(bucket.min, lo)
+            bucket.max = max(bucket.max, hi)
+        return merged
+
+    def query(
+        self,
+        resolution: str = "hour",
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        operation: Optional[str] = None,
+    ) -> List[Rollup]:
+        """Buckets starting in ``[since, until)``, oldest first, including unflushed changes."""
+        if resolution not in self.resolutions:
+            raise ValidationError(f"No {resolution!r} rollups (configured: {', '.join(self.resolutions) or 'none'})")
+        self.flush()
+        # naive bounds are taken as UTC, like naive timestamps
+        lo = datetime_to_ns(since) / 1e9 if since is not None else -math.inf
+        hi = datetime_to_ns(until) / 1e9 if until is not None else math.inf
+        rows = []
+        for (start, op), b in sorted(self._read(resolution).items()):
+            if not lo <= start < hi or (operation is not None and op != operation):
+                continue
+            rows.append(
+                Rollup(
+                    datetime.fromtimestamp(start, timezone.utc),
+                    op,
+                    b.count,
+                    b.numeric,
+                    b.total,
+                    b.min if b.numeric else None,
+                    b.max if b.numeric else None,
+                )
+            )
+        return rows
+
+    def compact(self):
+        """Rewrite each rollup file with one record per bucket."""
+        self.flush()
+        with self._lock:
+            for name in self.resolutions:
+                merged = self._read(name)
+                if not merged:
+                    continue
+                with atomic_writer(self.path(name)) as f:
+                    for (start, op), b in sorted(merged.items()):
+                        f.write(_RECORD.pack(start, b.count, b.numeric, b.total, b.min, b.max, op.encode("utf-8")[:NAME_WIDTH]))
+
+    def size(self) -> int:
+        """Bytes on disk across all resolutions."""
+        return sum(os.path.getsize(self.path(n)) for n in self.resolutions if os.path.exists(self.path(n)))
+
+
+_stores: Dict[tuple, RollupStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_rollups(history_path: str, resolutions: Sequence[str]) -> RollupStore:
+    """Shared store per history file, so every writer appends through one buffer."""
+    key = (os.path.abspath(history_path), tuple(resolutions))
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = RollupStore(history_path, resolutions)
+        return store
+
+
+@atexit.register
+def _flush_stores():
+    for store in list(_stores.values()):
+        try:
+            store.flush()
+        except Exception:
+            pass
+
+
+class RollupObserver:
+    """Feeds new calculations into a ``RollupStore``, flushing every ``flush_every``."""
+
+    def __init__(self, store: RollupStore, flush_every: int | None = None):
+        self.store = store
+        self.flush_every = flush_every or cfg.rollup_flush_every
+        self._unflushed = 0
+
+    def update(self, calculation: Calculation) -> None:
+        self.update_many((calculation,))
+
+    def update_many(self, calculations: Sequence[Calculation]) -> None:
+        self.store.add_many(calculations)
+        self._unflushed += len(calculations)
+        if self._unflushed >= self.flush_every:
+            self._unflushed = 0
+            self.store.flush()
+
+
+def build_from_history(history_path: str, resolutions: Sequence[str], encoding: str | None = None) -> RollupStore:
+    """
+    Replace the rollups of ``history_path`` with ones computed from the file
+    (streamed). Buckets do not depend on row order, so the file need not be
+    in timestamp order.
+    """
+    from .merge import iter_history_rows
+
+    store = RollupStore(history_path, resolutions)
+    for name in store.resolutions:
+        if os.path.exists(store.path(name)):
+            os.remove(store.path(name))
+    added = 0
+    for timestamp, row in iter_history_rows(history_path, encoding or cfg.default_encoding, ordered=False):
+        with store._lock:
+            # exact results are text ("fraction:1/3"); parse them as the loaders do
+            value = _numeric(parse_number(row[3]))
+            store._add_locked(row[0], datetime_to_ns(timestamp) // 1_000_000_000, value)
+        added += 1
+        if added % 100_000 == 0:
+            store.flush()
+    store.compact()
+    return store
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.rollups", description="Build or show history rollups.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="(re)build rollups from a history CSV")
+    build.add_argument("history", nargs="?", default=cfg.history_file)
+    show = sub.add_parser("show", help="print rollups")
+    show.add_argument("history", nargs="?", default=cfg.history_file)
+    show.add_argument("--resolution", default="hour", choices=sorted(RESOLUTIONS))
+    show.add_argument("--operation")
+    parser.add_argument("--resolutions", default=cfg.rollup_resolutions or "minute,hour")
+    args = parser.parse_args(argv)
+
+    try:
+        resolutions = parse_resolutions(args.resolutions)
+        if args.command == "build":
+            store = build_from_history(args.history, resolutions)
+            print(f"Built {', '.join(resolutions)} rollups ({store.size()} bytes) from {args.history}")
+            return 0
+        store = RollupStore(args.history, resolutions)
+        for r in store.query(args.resolution, operation=args.operation):
+            mean = "-" if r.mean is None else f"{r.mean:.6g}"
+            print(f"{r.start.isoformat()}  {r.operation:<12} count={r.count} mean={mean} min={r.min} max={r.max}")
+    except (PersistenceError, ValidationError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+# app/serialization.py
+"""
+Bulk serialization of calculation histories.
+
+Histories are converted in a single pass into column lists (for pandas),
+CSV bytes or JSON Lines bytes, without building a dict per row. The CSV
+layout matches what ``Calculator.load_history`` reads back.
+
+In JSON Lines, exact results keep their type: a ``Decimal`` is written as
+``{"decimal": "0.1"}`` and a ``Fraction`` as ``{"fraction": "1/3"}``, and
+``decode_exact`` turns those back into numbers when the lines are read. CSV
+cells have no types, so there they are written as ``decimal:0.1`` and
+``fraction:1/3`` (``calculation.exact_text``) and ``Calculation.from_dict``
+parses them back.
+"""
+import csv
+import io
+import json
+from decimal import Decimal
+from fractions import Fraction
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from .calculation import Calculation, exact_text
+
+COLUMNS = ("operation", "operand_1", "operand_2", "result", "timestamp", "expression", "seq")
+CSV_HEADER = ",".join(COLUMNS)
+_NUMBER_COLUMNS = ("operand_1", "operand_2", "result")
+
+
+def to_columns(calcs: Iterable[Calculation]) -> Dict[str, list]:
+    """Column arrays keyed by ``COLUMNS`` (``pd.DataFrame`` accepts this directly)."""
+    ops, first, second, results, stamps, expressions, seqs = [], [], [], [], [], [], []
+    for c in calcs:
+        ops.append(c.operation)
+        if c.operands:
+            first.append(c.operands[0])
+            second.append(c.operands[1])
+        else:
+            first.append(None)
+            second.append(None)
+        results.append(c.result)
+        stamps.append(c.timestamp.isoformat())
+        expressions.append(c.expression)
+        seqs.append(c.seq)
+    return dict(zip(COLUMNS, (ops, first, second, results, stamps, expressions, seqs)))
+
+
+def _csv_bytes(rows, header: bool, encoding: str) -> bytes:
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    if header:
+        writer.writerow(COLUMNS)
+    writer.writerows(rows)
+    return buf.getvalue().encode(encoding)
+
+
+def to_csv_bytes(calcs: Iterable[Calculation], header: bool = True, encoding: str = "utf-8") -> bytes:
+    columns = to_columns(calcs)
+    for name in _NUMBER_COLUMNS:
+        columns[name] = list(map(exact_text, columns[name]))
+    return _csv_bytes(zip(*columns.values()), header, encoding)
+
+
+def records_to_csv_bytes(records: Iterable[dict], header: bool = False, encoding: str = "utf-8") -> bytes:
+    """CSV rows for ``to_dict``-shaped records (e.g. replayed write-ahead log lines)."""
+    return _csv_bytes(([exact_text(r.get(col)) for col in COLUMNS] for r in records), header, encoding)
+
+
+def normalise_csv(data: bytes, encoding: str = "utf-8") -> Tuple[bytes, Optional[dict]]:
+    """
+    Return history CSV bytes in the ``COLUMNS`` layout (ready for rows to be
+    appended) and the last row as a dict. Files written by older versions,
+    with another column order, are rewritten once.
+    """
+    text = data.decode(encoding)
+    header, _, body = text.partition("\n")
+    if header.strip() != CSV_HEADER:
+        rows = list(csv.DictReader(io.StringIO(text)))
+        data = records_to_csv_bytes(rows, header=True, encoding=encoding)
+        return data, (rows[-1] if rows else None)
+
+    if not text.endswith("\n"):
+        data += "\n".encode(encoding)
+    lines = body.rstrip("\n").rsplit("\n", 1)
+    last_line = lines[-1]
+    if not last_line:
+        return data, None
+    return data, dict(zip(COLUMNS, next(csv.reader([last_line]))))
+
+
+# one JSON object per line, keys in COLUMNS order
+_JSONL_TEMPLATE = "{" + ",".join(f'"{col}":%s' for col in COLUMNS) + "}"
+
+
+def encode_exact(value) -> Any:
+    """``json`` ``default`` hook: tag exact numbers, ``str`` anything else."""
+    if isinstance(value, Decimal):
+        return {"decimal": str(value)}
+    if isinstance(value, Fraction):
+        return {"fraction": str(value)}
+    return str(value)
+
+
+def decode_exact(obj: dict) -> Any:
+    """``json`` ``object_hook`` undoing ``encode_exact``."""
+    if len(obj) == 1:
+        if "decimal" in obj:
+            return Decimal(obj["decimal"])
+        if "fraction" in obj:
+            return Fraction(obj["fraction"])
+    return obj
+
+
+def to_jsonl_bytes(calcs: Iterable[Calculation]) -> bytes:
+    dumps = json.JSONEncoder(default=encode_exact).encode
+    lines: List[str] = [
+        _JSONL_TEMPLATE % tuple(map(dumps, row)) for row in zip(*to_columns(calcs).values())
+    ]
+    return ("\n".join(lines) + "\n").encode("utf-8") if lines else b""
@@ -0,0 +1,125 @@
+# app/sessions.py
+"""
+Per-user Calculator sessions in one process.
+
+``SessionManager`` creates a ``Calculator`` per session id on first use. All
+sessions share the manager's config, numeric engine and observers (one
+``LoggingObserver``, no per-session file handlers), and directories are set
+up once. At most ``max_sessions`` calculators stay in memory; the least
+recently used one is saved to ``<session_dir>/<id>.csv`` and dropped, and is
+reloaded from there the next time it is requested. With a history archive
+configured, each session archives to its own ``<archive dir>/<id>``
+subdirectory, so sessions never see each other's evicted rows. Sessions do
+not publish to a shared-memory history ring (``CALCULATOR_SHARED_HISTORY``):
+one ring follows one calculator.
+"""
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import replace
+from typing import List
+from .calculator import Calculator
+from .calculator_config import CalculatorConfig
+from .exceptions import ValidationError
+from .logger import LoggingObserver, Observer
+from .numeric import get_engine
+from .persistence import release_wal
+
+cfg = CalculatorConfig()
+
+_SESSION_ID = re.compile(r"^[A-Za-z0-9_.-]{1,128}$")
+
+
+class SessionManager:
+    def __init__(
+        self,
+        config: CalculatorConfig | None = None,
+        max_sessions: int | None = None,
+        session_dir: str | None = None,
+        observers: List[Observer] | None = None,
+    ):
+        self.config = config or cfg
+        self.config.ensure_dirs()
+        self.max_sessions = max_sessions or self.config.max_sessions
+        self.session_dir = session_dir or self.config.session_dir
+        os.makedirs(self.session_dir, exist_ok=True)
+
+        self._observers = observers if observers is not None else [LoggingObserver()]
+        self._engine = get_engine(self.config)
+        self._sessions: "OrderedDict[str, Calculator]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.evictions = 0
+
+    def _path(self, session_id: str) -> str:
+        if not _SESSION_ID.match(session_id) or session_id in (".", ".."):
+            raise ValidationError(f"Invalid session id: {session_id!r}")
+        return os.path.join(self.session_dir, f"{session_id}.csv")
+
+    def get(self, session_id: str) -> Calculator:
+        """Return the session's calculator, creating or reloading it as needed."""
+        path = self._path(session_id)
+        with self._lock:
+            calc = self._sessions.get(session_id)
+            if calc is not None:
+                self._sessions.move_to_end(session_id)
+                return calc
+
+            config = replace(self.config, shared_history="")
+            if config.history_archive_dir:
+                config = replace(config, history_archive_dir=os.path.join(config.history_archive_dir, session_id))
+            calc = Calculator(config, observers=self._observers, engine=self._engine)
+            if os.path.exists(path):
+                calc.load_history(path)
+            self._sessions[session_id] = calc
+            self._evict()
+            return calc
+
+    def _evict(self):
+        while len(self._sessions) > self.max_sessions:
+            session_id, calc = self._sessions.popitem(last=False)
+            self._drop(session_id, calc)
+            self.evictions += 1
+
+    def _spill(self, session_id: str, calc: Calculator):
+        calc.save_history(self._path(session_id))
+
+    def _drop(self, session_id: str, calc: Calculator):
+        """Save an evicted or closed session and release its write-ahead log."""
+        self._spill(session_id, calc)
+        release_wal(self._path(session_id))
+
+    def close(self, session_id: str):
+        """Save a session to disk and drop it from memory."""
+        with self._lock:
+            calc = self._sessions.pop(session_id, None)
+            if calc is not None:
+                self._drop(session_id, calc)
+
+    def discard(self, session_id: str):
+        """Forget a session entirely, including its saved history."""
+        path = self._path(session_id)
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            release_wal(path)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def flush(self):
+        """Save every in-memory session (they stay loaded)."""
+        with self._lock:
+            for session_id, calc in self._sessions.items():
+                self._spill(session_id, calc)
+
+    def active_sessions(self) -> List[str]:
+        """In-memory session ids, least recently used first."""
+        with self._lock:
+            return list(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._sessions
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
@@ -0,0 +1,270 @@
+# app/shared_history.py
+"""
+Live history in shared memory for readers in other processes.
+
+The calculator process publishes each new calculation into a ring of
+fixed-width records in a ``multiprocessing.shared_memory`` block. Other
+processes attach read-only by name and poll for records they have not seen,
+reading them straight out of the block as a numpy structured array -- no
+file I/O, no pickling.
+
+Layout: a small header (magic, capacity, next sequence number, generation)
+followed by ``capacity`` records. Record ``n`` lives in slot
+``n % capacity`` and carries its own sequence number, which the writer
+stores last; readers check that number before and after copying a slot and
+drop records where either does not match (overwritten while being read). The generation changes whenever the history is replaced
+as a whole (clear, undo, redo, load), so readers know to resync.
+
+A block name can only be created once, so calculators in one process that
+are configured with the same name share one ring (``get_ring``).
+"""
+import atexit
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, Optional
+from .calculation import Calculation
+from .calculator_config import CalculatorConfig
+from .exceptions import PersistenceError
+
+cfg = CalculatorConfig()
+
+MAGIC = 0x43414C4352494E47  # "CALCRING"
+NAME_WIDTH = 24
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# record flags
+FLAG_EXPRESSION = 1  # no operands; the expression text is not shared
+FLAG_INEXACT = 2  # result converted to float from an exact type
+FLAG_NAIVE = 4  # timestamp had no timezone
+
+_HEADER_FIELDS = [("magic", "<u8"), ("capacity", "<u8"), ("next_seq", "<u8"), ("generation", "<u8")]
+_RECORD_FIELDS = [
+    ("seq", "<u8"),
+    ("timestamp_us", "<i8"),
+    ("operand_1", "<f8"),
+    ("operand_2", "<f8"),
+    ("result", "<f8"),
+    ("flags", "<u4"),
+    ("operation", f"S{NAME_WIDTH}"),
+]
+
+
+def _dtypes():
+    import numpy as np
+    return np.dtype(_HEADER_FIELDS), np.dtype(_RECORD_FIELDS)
+
+
+def _views(buf, capacity: int | None = None):
+    import numpy as np
+    header_dtype, record_dtype = _dtypes()
+    header = np.ndarray((1,), dtype=header_dtype, buffer=buf)
+    if capacity is None:
+        capacity = int(header["capacity"][0])
+    records = np.ndarray((capacity,), dtype=record_dtype, buffer=buf, offset=header_dtype.itemsize)
+    return header, records
+
+
+def ring_size(capacity: int) -> int:
+    header_dtype, record_dtype = _dtypes()
+    return header_dtype.itemsize + capacity * record_dtype.itemsize
+
+
+class SharedHistoryRing:
+    """Writer side, owned by the calculator process (creates and unlinks the block)."""
+
+    def __init__(self, name: str | None = None, capacity: int | None = None):
+        self.capacity = capacity or cfg.shared_history_capacity
+        try:
+            self._shm = shared_memory.SharedMemory(name=name or None, create=True, size=ring_size(self.capacity))
+        except (OSError, ValueError) as e:
+            raise PersistenceError(f"Failed to create shared history {name!r}: {e}")
+        self.name = self._shm.name
+        self._header, self._records = _views(self._shm.buf, self.capacity)
+        self._records[:] = 0
+        self._header["capacity"] = self.capacity
+        self._header["next_seq"] = 0
+        self._header["generation"] = 0
+        self._header["magic"] = MAGIC
+        self._closed = False
+        atexit.register(self.close)
+
+    @property
+    def next_seq(self) -> int:
+        return int(self._header["next_seq"][0])
+
+    def publish(self, calc: Calculation):
+        self.publish_many((calc,))
+
+    def publish_many(self, calcs):
+        seq = self.next_seq
+        records, seqs = self._records, self._records["seq"]
+        for calc in calcs:
+            slot = seq % self.capacity
+            flags = 0
+            operands = calc.operands
+            if operands:
+                a, b = float(operands[0]), float(operands[1])
+            else:
+                flags |= FLAG_EXPRESSION
+                a = b = float("nan")
+            result = calc.result
+            if type(result) is not float:
+                if not isinstance(result, int):
+                    flags |= FLAG_INEXACT
+                try:
+                    result = float(result)
+                except (TypeError, ValueError):
+                    result = float("nan")
+            if calc.naive:
+                flags |= FLAG_NAIVE
+            micros = calc.ts_ns // 1000
+            # written with seq 0 first; the sequence number goes in last and
+            # marks the record complete
+            records[slot] = (0, micros, a, b, result, flags, calc.operation.encode("utf-8")[:NAME_WIDTH])
+            seqs[slot] = seq + 1
+            seq += 1
+        self._header["next_seq"] = seq
+
+    def reset(self, calcs=()):
+        """The history was replaced: bump the generation and republish its tail."""
+        calcs = list(calcs)[-self.capacity:]
+        self._header["generation"] += 1
+        self.publish_many(calcs)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._header = self._records = None
+        self._shm.close()
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+
+_rings: Dict[str, SharedHistoryRing] = {}
+_rings_lock = threading.Lock()
+
+
+def get_ring(name: str, capacity: int | None = None) -> SharedHistoryRing:
+    """The process's ring for ``name``, created on first use."""
+    with _rings_lock:
+        ring = _rings.get(name)
+        if ring is None or ring._closed:
+            ring = _rings[name] = SharedHistoryRing(name, capacity)
+        return ring
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # Attaching must not register the block with this process's resource
+    # tracker, or the tracker would unlink the writer's block when this
+    # process exits. Python 3.13 has ``track=False``; older versions register
+    # unconditionally, so registration is skipped for the duration of the call.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class SharedHistoryReader:
+    """
+    Read-only view of a ring published by another process.
+
+    ``poll`` returns the records published since the previous call, as a
+    structured array (``seq``, ``timestamp_us``, ``operand_1``,
+    ``operand_2``, ``result``, ``flags``, ``operation``). Only the new slots
+    are copied out of the block (one memcpy); ``records`` is a read-only
+    view of the whole ring.
+    """
+
+    def __init__(self, name: str, from_start: bool = False):
+        try:
+            self._shm = _attach(name)
+        except (OSError, ValueError) as e:
+            raise PersistenceError(f"Failed to attach shared history {name!r}: {e}")
+        header, _ = _views(self._shm.buf, 0)
+        if int(header["magic"][0]) != MAGIC:
+            self._shm.close()
+            raise PersistenceError(f"{name!r} is not a calculator history ring")
+        self.name = name
+        self._header, self._records = _views(self._shm.buf)
+        self.capacity = len(self._records)
+        self.generation = int(self._header["generation"][0])
+        self.cursor = 0 if from_start else int(self._header["next_seq"][0])
+        # records overwritten before this reader got to them
+        self.dropped = 0
+
+    @property
+    def resynced(self) -> bool:
+        """
+        True when the writer replaced its history since the last poll; the
+        replacement's newest records follow in the next ``poll``.
+        """
+        return int(self._header["generation"][0]) != self.generation
+
+    def poll(self, limit: Optional[int] = None):
+        import numpy as np
+
+        if self.resynced:
+            self.generation = int(self._header["generation"][0])
+        end = int(self._header["next_seq"][0])
+        start = max(self.cursor, end - self.capacity)
+        self.dropped += start - self.cursor
+        if limit is not None:
+            end = min(end, start + limit)
+        if end <= start:
+            self.cursor = max(self.cursor, start)
+            return self._records[:0].copy()
+
+        lo, hi = start % self.capacity, (end - 1) % self.capacity + 1
+        seqs = self._records["seq"]
+        if lo < hi:
+            out = self._records[lo:hi].copy()
+            after = seqs[lo:hi].copy()
+        else:
+            out = np.concatenate((self._records[lo:], self._records[:hi]))
+            after = np.concatenate((seqs[lo:], seqs[:hi]))
+        # seqlock check: a slot is intact only if its sequence number was the
+        # expected one both in the copy and after it; a writer lapping us
+        # mid-copy changes it (to 0, then to a newer number)
+        expected = np.arange(start + 1, end + 1, dtype=np.uint64)
+        ok = (out["seq"] == expected) & (after == expected)
+        self.dropped += int((~ok).sum())
+        self.cursor = end
+        return out if ok.all() else out[ok]
+
+    @property
+    def records(self):
+        view = self._records.view()
+        view.flags.writeable = False
+        return view
+
+    def poll_calculations(self, limit: Optional[int] = None) -> List[Calculation]:
+        return to_calculations(self.poll(limit))
+
+    def close(self):
+        self._header = self._records = None
+        self._shm.close()
+
+
+def to_calculations(records) -> List[Calculation]:
+    """Rebuild ``Calculation`` objects from polled records."""
+    calcs = []
+    for rec in records.tolist():
+        _, ts_us, a, b, result, flags, operation = rec
+        operands = () if flags & FLAG_EXPRESSION else (a, b)
+        name = operation.decode("utf-8", "replace")
+        if flags & FLAG_NAIVE:
+            ts = (_EPOCH + timedelta(microseconds=ts_us)).replace(tzinfo=None)
+            calcs.append(Calculation(name, operands, result, ts))
+        else:
+            calcs.append(Calculation(name, operands, result, ts_ns=ts_us * 1000))
+    return calcs
@@ -0,0 +1,146 @@
+# app/snapshot.py
+"""
+Warm-restart snapshots of a ``Calculator``.
+
+A snapshot holds the whole in-memory state -- history and both undo/redo
+stacks -- in one checksummed binary pickle, so a restart does not parse the
+history CSV and keeps undo/redo (and the quantile sketches). It also records:
+
+- a fingerprint of the config values that shape that state (numeric engine,
+  precision, size limits, history location), and
+- the version of the persisted history it was taken against (size and
+  mtime of the CSV and its write-ahead log, or the SQLite row count).
+
+``load_snapshot`` rejects the file when any of these no longer match, e.g.
+the CSV was saved again by another process, so callers fall back to
+``load_history``.
+"""
+import hashlib
+import os
+import pickle
+from typing import Optional
+from .calculator_config import CalculatorConfig
+from .persistence import WAL_SUFFIX, atomic_write
+from .quantiles import CalculationStats
+
+cfg = CalculatorConfig()
+
+MAGIC = b"CALCSNAP"
+FORMAT_VERSION = 1
+_DIGEST_SIZE = 32
+
+# config fields that change what a restored state means
+_FINGERPRINT_FIELDS = (
+    "numeric_engine",
+    "decimal_precision",
+    "decimal_rounding",
+    "precision",
+    "max_history_size",
+    "max_undo_depth",
+    "history_backend",
+    "history_file",
+    "history_db",
+)
+
+
+def config_fingerprint(config: CalculatorConfig) -> str:
+    values = "\0".join(f"{name}={getattr(config, name)!r}" for name in _FINGERPRINT_FIELDS)
+    return hashlib.sha256(values.encode("utf-8")).hexdigest()
+
+
+def _file_stamp(path: str) -> Optional[tuple]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+def source_version(config: CalculatorConfig) -> tuple:
+    """Identifies the persisted history the in-memory state corresponds to."""
+    if config.history_backend == "sqlite":
+        from .sqlite_store import get_store
+        return ("sqlite", get_store(config.history_db).version())
+    return ("csv", _file_stamp(config.history_file), _file_stamp(config.history_file + WAL_SUFFIX))
+
+
+def save_snapshot(calculator, path: str | None = None):
+    """Write ``calculator``'s state to ``path`` (default ``config.snapshot_file``) atomically."""
+    config = calculator.config
+    state = {
+        "fingerprint": config_fingerprint(config),
+        "source": source_version(config),
+        "history": calculator.history_manager.list(),
+        "caretaker": calculator._caretaker.export_state(),
+        "stats": calculator.stats.to_dict(),
+    }
+    # not compressed as a whole: older undo mementos already are, and
+    # inflating the file would dominate restore time
+    body = pickle.dumps(state, pickle.HIGHEST_PROTOCOL)
+    header = MAGIC + bytes([FORMAT_VERSION]) + hashlib.sha256(body).digest()
+    atomic_write(path or config.snapshot_file, header + body)
+
+
+def read_snapshot(path: str) -> Optional[dict]:
+    """Decoded snapshot state, or None when the file is missing or damaged."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    prefix = len(MAGIC) + 1
+    if data[: len(MAGIC)] != MAGIC or len(data) < prefix + _DIGEST_SIZE or data[len(MAGIC)] != FORMAT_VERSION:
+        return None
+    digest, body = data[prefix:prefix + _DIGEST_SIZE], data[prefix + _DIGEST_SIZE:]
+    if hashlib.sha256(body).digest() != digest:
+        return None
+    try:
+        return pickle.loads(body)
+    except Exception:
+        return None
+
+
+def load_snapshot(calculator, path: str | None = None) -> bool:
+    """
+    Restore ``calculator`` from a snapshot. Returns False (and leaves the
+    calculator untouched) when the snapshot is missing, damaged, taken under
+    a different config, or older than the persisted history.
+    """
+    config = calculator.config
+    state = read_snapshot(path or config.snapshot_file)
+    if state is None or state.get("fingerprint") != config_fingerprint(config):
+        return False
+    if state.get("source") != source_version(config):
+        return False
+
+    calculator.history_manager.replace(state["history"])
+    calculator._caretaker.import_state(state["caretaker"])
+    if "stats" in state:
+        calculator.stats = CalculationStats.from_dict(state["stats"])
+    return True
+
+
+class SnapshotObserver:
+    """Writes a snapshot after every ``every`` history changes."""
+    events = ("perform", "clear", "undo", "redo", "load")
+
+    def __init__(self, calculator, every: int | None = None, path: str | None = None):
+        self._calculator = calculator
+        self.every = every or calculator.config.snapshot_every
+        self.path = path
+        self._changes = 0
+
+    def _changed(self, count: int):
+        self._changes += count
+        if self._changes >= self.every:
+            self._changes = 0
+            save_snapshot(self._calculator, self.path)
+
+    def update(self, calculation) -> None:
+        self._changed(1)
+
+    def update_many(self, calculations) -> None:
+        self._changed(len(calculations))
+
+    def on_event(self, event, history) -> None:
+        self._changed(1)
@@ -0,0 +1,277 @@
+# app/sqlite_store.py
+"""
+SQLite history backend.
+
+``SQLiteHistoryStore`` keeps calculations in one table with indexed
+``operation`` and ``timestamp`` columns. The database runs in WAL journal
+mode, so readers do not block the writer. Writes go through one connection
+and are batched inside transactions; reads borrow a connection from a small
+pool, so several threads can query at once.
+
+Selected with ``CALCULATOR_HISTORY_BACKEND=sqlite``: autosave becomes a
+single-row insert (``app.logger.SQLiteAutoSaveObserver``), and ``Calculator`` loads
+and queries history with SQL instead of whole-file reads.
+"""
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from decimal import Decimal
+from fractions import Fraction
+from typing import Dict, Iterable, List, Optional
+from .calculation import Calculation, exact_text, observe_seq, parse_number
+from .calculator_config import CalculatorConfig
+from .exceptions import PersistenceError
+
+cfg = CalculatorConfig()
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS calculations (
+    id INTEGER PRIMARY KEY,
+    operation TEXT NOT NULL,
+    operand_1 REAL,
+    operand_2 REAL,
+    result,
+    timestamp TEXT NOT NULL,
+    expression TEXT,
+    seq INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_calculations_operation ON calculations(operation);
+CREATE INDEX IF NOT EXISTS idx_calculations_timestamp ON calculations(timestamp);
+"""
+
+_INSERT = (
+    "INSERT INTO calculations (operation, operand_1, operand_2, result, timestamp, expression, seq) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+_SELECT = "SELECT id, operation, operand_1, operand_2, result, timestamp, expression, seq FROM calculations"
+
+
+def _row(calc: Calculation) -> tuple:
+    operands = calc.operands
+    result = calc.result
+    # floats are stored as REAL; exact values (Decimal, Fraction) as tagged
+    # text, anything else (e.g. complex results) as plain text
+    if isinstance(result, (Decimal, Fraction)):
+        result = exact_text(result)
+    elif not isinstance(result, (int, float)) or isinstance(result, bool):
+        result = str(result)
+    return (
+        calc.operation,
+        exact_text(operands[0]) if operands else None,
+        exact_text(operands[1]) if operands else None,
+        result,
+        _stored(calc.timestamp),
+        calc.expression,
+        calc.seq,
+    )
+
+
+def _stored(ts: datetime) -> str:
+    # aware timestamps are stored as UTC so that text order is time order
+    # (naive ones are taken as UTC already, see ``_bound``)
+    return ts.isoformat() if ts.tzinfo is None else ts.astimezone(timezone.utc).isoformat()
+
+
+def _bound(ts: datetime) -> str:
+    # stored timestamps are UTC isoformat text, so bounds must be too for the
+    # text comparison to order correctly; naive bounds are taken as UTC
+    if ts.tzinfo is None:
+        return ts.replace(tzinfo=timezone.utc).isoformat()
+    return ts.astimezone(timezone.utc).isoformat()
+
+
+def _calculation(row) -> Calculation:
+    _, operation, a, b, result, timestamp, expression, seq = row
+    if seq is not None:
+        observe_seq(seq)
+    operands = () if a is None else (parse_number(a), parse_number(b))
+    return Calculation(
+        operation, operands, parse_number(result), datetime.fromisoformat(timestamp), expression=expression, seq=seq
+    )
+
+
+def is_sqlite_path(path: str) -> bool:
+    return path.lower().endswith(SQLITE_SUFFIXES)
+
+
+class SQLiteHistoryStore:
+    def __init__(self, path: str, pool_size: int | None = None):
+        self.path = path
+        self.pool_size = pool_size or cfg.sqlite_pool_size
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._write_lock = threading.Lock()
+        self._writer = self._connect()
+        with self._write_lock:
+            self._writer.executescript(_SCHEMA)
+            columns = {r[1] for r in self._writer.execute("PRAGMA table_info(calculations)")}
+            if "seq" not in columns:
+                # databases created before rows kept their seq
+                self._writer.execute("ALTER TABLE calculations ADD COLUMN seq INTEGER")
+        self._readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._opened = 0
+        self._pool_lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        try:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # WAL + NORMAL: commits are durable once checkpointed, and a crash
+            # never corrupts the database
+            conn.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.Error as e:
+            raise PersistenceError(f"Failed to open history database {self.path}: {e}")
+        return conn
+
+    # ===== Connections =====
+    @contextmanager
+    def _reader(self):
+        """Borrow a pooled read connection (opened lazily, up to ``pool_size``)."""
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            with self._pool_lock:
+                grow = self._opened < self.pool_size
+                if grow:
+                    self._opened += 1
+            conn = self._connect() if grow else self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    @contextmanager
+    def _transaction(self):
+        with self._write_lock:
+            conn = self._writer
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    # ===== Writes =====
+    def insert(self, calc: Calculation):
+        try:
+            with self._write_lock:
+                self._writer.execute(_INSERT, _row(calc))
+        except sqlite3.Error as e:
+            raise PersistenceError(f"Failed to insert calculation: {e}")
+
+    def insert_many(self, calcs: Iterable[Calculation]):
+        """Insert several calculations in one transaction."""
+        try:
+            with self._transaction() as conn:
+                conn.executemany(_INSERT, map(_row, calcs))
+        except sqlite3.Error as e:
+            raise PersistenceError(f"Failed to insert calculations: {e}")
+
+    def replace_all(self, calcs: Iterable[Calculation]):
+        """Replace the stored history with ``calcs`` (one transaction)."""
+        try:
+            with self._transaction() as conn:
+                conn.execute("DELETE FROM calculations")
+                conn.executemany(_INSERT, map(_row, calcs))
+        except sqlite3.Error as e:
+            raise PersistenceError(f"Failed to save history: {e}")
+
+    def clear(self):
+        self.replace_all(())
+
+    # ===== Reads =====
+    def query(
+        self,
+        operation: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> List[Calculation]:
+        """
+        Calculations in insertion order, filtered by operation and by a
+        ``[since, until)`` timestamp range. With ``limit``, the newest
+        ``limit`` matches are returned.
+        """
+        where, params = [], []
+        if operation is not None:
+            where.append("operation = ?")
+            params.append(operation)
+        if since is not None:
+            where.append("timestamp >= ?")
+            params.append(_bound(since))
+        if until is not None:
+            where.append("timestamp < ?")
+            params.append(_bound(until))
+        sql = _SELECT + (" WHERE " + " AND ".join(where) if where else "")
+        if limit is not None:
+            sql = f"SELECT * FROM ({sql} ORDER BY id DESC LIMIT ?) ORDER BY id"
+            params.append(int(limit))
+        else:
+            sql += " ORDER BY id"
+        try:
+            with self._reader() as conn:
+                rows = conn.execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            raise PersistenceError(f"Failed to query history: {e}")
+        return [_calculation(r) for r in rows]
+
+    def count(self, operation: Optional[str] = None) -> int:
+        sql, params = "SELECT COUNT(*) FROM calculations", ()
+        if operation is not None:
+            sql, params = sql + " WHERE operation = ?", (operation,)
+        try:
+            with self._reader() as conn:
+                return conn.execute(sql, params).fetchone()[0]
+        except sqlite3.Error as e:
+            raise PersistenceError(f"Failed to query history: {e}")
+
+    def version(self) -> tuple:
+        """``(row count, last id)``; changes whenever rows are added or replaced."""
+        try:
+            with self._reader() as conn:
+                return tuple(conn.execute("SELECT COUNT(*), COALESCE(MAX(id), 0) FROM calculations").fetchone())
+        except sqlite3.Error as e:
+            raise PersistenceError(f"Failed to query history: {e}")
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        with self._write_lock:
+            self._writer.close()
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_stores: Dict[str, SQLiteHistoryStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path: str) -> SQLiteHistoryStore:
+    """Shared store for a database file (one writer connection per file)."""
+    key = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None or store._closed:
+            store = _stores[key] = SQLiteHistoryStore(path)
+        return store
+
+
+@atexit.register
+def _close_stores():
+    for store in list(_stores.values()):
+        try:
+            store.close()
+        except Exception:
+            pass
+
@@ -0,0 +1,54 @@
+# benchmarks/bench_autosave.py
+"""
+Per-operation cost of autosave: full CSV rewrite vs write-ahead log vs
+SQLite insert.
+
+    python -m benchmarks.bench_autosave
+
+"rewrite" is the previous AutoSaveObserver behaviour (read the CSV, append
+one row, write it back). "wal" is the current observer: one JSON line per
+calculation, fsync in groups, and a checkpoint every N records. "sqlite" is
+the SQLite backend's observer (one insert into a WAL-mode database).
+"""
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from app.calculation import Calculation
+from app.logger import AutoSaveObserver, SQLiteAutoSaveObserver
+
+
+def rewrite_update(csv_path, calculation):
+    new_row = pd.DataFrame([calculation.to_dict()])
+    if os.path.exists(csv_path):
+        existing = pd.read_csv(csv_path)
+        new_row = pd.concat([existing, new_row], ignore_index=True)
+    new_row.to_csv(csv_path, index=False)
+
+
+def run(label, update, n):
+    calcs = [Calculation("add", (i, 1), i + 1, datetime.now(timezone.utc)) for i in range(n)]
+    start = time.perf_counter()
+    for c in calcs:
+        update(c)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10}{n:>8} ops {elapsed / n * 1e6:>12.1f} us/op")
+
+
+def main(n: int = 2000):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rewrite.csv")
+        run("rewrite", lambda c: rewrite_update(path, c), n)
+
+        observer = AutoSaveObserver(os.path.join(tmp, "wal.csv"))
+        run("wal", observer.update, n)
+        observer.checkpoint()
+
+        run("sqlite", SQLiteAutoSaveObserver(os.path.join(tmp, "history.db")).update, n)
+
+
+if __name__ == "__main__":
+    main()
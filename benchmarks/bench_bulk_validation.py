@@ -0,0 +1,52 @@
+# benchmarks/bench_bulk_validation.py
+"""
+Per-pair validation vs the vectorised column validator, on clean columns and
+on columns with 0.1% non-numeric rows.
+
+    python -m benchmarks.bench_bulk_validation
+"""
+import random
+import time
+
+from app.exceptions import ValidationError
+from app.input_validators import validate_numeric_columns, validate_numeric_pair
+
+
+def _best(fn, repeat: int = 3) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def _per_pair(a, b):
+    errors = 0
+    for x, y in zip(a, b):
+        try:
+            validate_numeric_pair(x, y)
+        except ValidationError:
+            errors += 1
+    return errors
+
+
+def main(n: int = 1_000_000):
+    rng = random.Random(0)
+    a = [f"{rng.uniform(-1e6, 1e6):.6f}" for _ in range(n)]
+    b = [str(rng.randint(-1000, 1000)) for _ in range(n)]
+    dirty = list(a)
+    for i in range(0, n, 1000):
+        dirty[i] = "oops"
+
+    for label, col in (("clean", a), ("0.1% bad", dirty)):
+        per_pair = _best(lambda: _per_pair(col, b))
+        bulk = _best(lambda: validate_numeric_columns(col, b))
+        print(
+            f"{label:9} {n} rows  per-pair {per_pair:.3f} s  bulk {bulk:.3f} s  "
+            f"speed-up {per_pair / bulk:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# benchmarks/bench_calculation_memory.py
+"""
+Bytes per history record before and after the slotted Calculation.
+
+    python -m benchmarks.bench_calculation_memory
+
+"before" replicates the previous plain ``@dataclass`` record; "after" is the
+current frozen, slotted record with interned operation names; "packed" is
+``Calculation.pack()``. Each figure is the tracemalloc delta for building
+N records divided by N (operation names are built at runtime, as they are
+when parsed from input or CSV, so only the interned variant shares them).
+"""
+import copy
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Tuple
+
+from app.calculation import Calculation
+
+OPERATIONS = ("add", "subtract", "multiply", "divide", "power")
+
+
+@dataclass
+class LegacyCalculation:
+    operation: str
+    operands: Tuple[float, float]
+    result: Any
+    timestamp: datetime
+
+
+def build(factory, n):
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    records = []
+    for i in range(n):
+        op = " ".join([OPERATIONS[i % len(OPERATIONS)], ""]).strip()  # a fresh str
+        records.append(factory(op, (float(i), 2.0), float(i) * 2.0, start + timedelta(seconds=i)))
+    return records
+
+
+def measure(label, fn, n):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = fn()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{label:<22}{(after - before) / n:>10.1f} bytes/record")
+    return kept
+
+
+def main(n: int = 100_000):
+    legacy = measure("before (dataclass)", lambda: build(LegacyCalculation, n), n)
+    current = measure("after (slots+intern)", lambda: build(Calculation, n), n)
+    measure("after, packed", lambda: [c.pack() for c in current], n)
+    # a Caretaker snapshot is a deepcopy of the history list
+    measure("snapshot before", lambda: copy.deepcopy(legacy), n)
+    measure("snapshot after", lambda: copy.deepcopy(current), n)
+
+
+if __name__ == "__main__":
+    main()
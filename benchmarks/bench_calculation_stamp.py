@@ -0,0 +1,56 @@
+# benchmarks/bench_calculation_stamp.py
+"""
+Cost of stamping new calculations: a ``datetime.now(timezone.utc)`` per
+record (the previous scheme) vs ``stamp()`` (sequence number + integer
+nanoseconds, ``datetime`` built only when read).
+
+    python -m benchmarks.bench_calculation_stamp
+"""
+import gc
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from app.calculation import Calculation, stamp
+
+
+def with_datetime(n):
+    return [Calculation("add", (1.0, 2.0), 3.0, datetime.now(timezone.utc)) for _ in range(n)]
+
+
+def with_stamp(n):
+    out = []
+    for _ in range(n):
+        seq, ts_ns = stamp()
+        out.append(Calculation("add", (1.0, 2.0), 3.0, ts_ns=ts_ns, seq=seq))
+    return out
+
+
+def run(label, fn, n):
+    gc.disable()
+    elapsed = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        fn(n)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    gc.enable()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = fn(n)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{label:<20}{elapsed / n * 1e9:>8.0f} ns/record {(after - before) / n:>8.1f} bytes/record")
+    return kept
+
+
+def main(n: int = 200_000):
+    run("datetime.now", with_datetime, n)
+    records = run("stamp (seq+ns)", with_stamp, n)
+    start = time.perf_counter()
+    for c in records:
+        c.timestamp.isoformat()
+    print(f"{'isoformat on export':<20}{(time.perf_counter() - start) / n * 1e9:>8.0f} ns/record")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# benchmarks/bench_memory_budget.py
+"""
+A long-running calculator with and without a memory budget: accounted
+memory, traced peak and per-operation time.
+
+    python -m benchmarks.bench_memory_budget
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+
+
+def run(label: str, ops: int, **overrides):
+    with tempfile.TemporaryDirectory() as tmp:
+        config = CalculatorConfig(
+            log_dir=tmp,
+            history_dir=tmp,
+            auto_save=False,
+            max_history_size=5000,
+            max_undo_depth=100,
+            undo_uncompressed=20,
+            history_archive_dir=os.path.join(tmp, "archive"),
+            **overrides,
+        )
+        tracemalloc.start()
+        calc = Calculator(config=config, observers=[])
+        calc.perform_many(("add", i, 1) for i in range(4000))
+        start = time.perf_counter()
+        for i in range(ops):
+            calc.perform("multiply", i, 2)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        usage = calc.memory_usage()
+        actions = len(calc.memory_governor.last_report.actions) if calc.memory_governor and calc.memory_governor.last_report else 0
+        print(
+            f"{label:16} accounted {usage.accounted / 2**20:6.2f} MiB  traced peak {peak / 2**20:6.2f} MiB  "
+            f"{elapsed / ops * 1e3:6.2f} ms/op  history rows {len(calc.history()):>5}  governor actions {actions}"
+        )
+
+
+def main(ops: int = 300):
+    run("no budget", ops)
+    run("budget 2 MiB", ops, memory_budget_mb=2, memory_check_every=50)
+
+
+if __name__ == "__main__":
+    main()
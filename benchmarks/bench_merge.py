@@ -0,0 +1,58 @@
+# benchmarks/bench_merge.py
+"""
+Merging node histories: pandas concat + sort vs the streaming k-way merge.
+Peak Python memory is measured with tracemalloc (in a separate run).
+
+    python -m benchmarks.bench_merge
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from app.calculation import Calculation
+from app.merge import merge_histories
+from app.serialization import to_csv_bytes
+
+
+def _measure(fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    # second run traced: tracemalloc slows allocation-heavy code a lot
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def main(nodes: int = 4, rows: int = 100_000):
+    t0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for n in range(nodes):
+            calcs = [
+                Calculation("add", (float(i), 1.0), i + 1.0, t0 + timedelta(milliseconds=i * nodes + n))
+                for i in range(rows)
+            ]
+            paths.append(os.path.join(tmp, f"node{n}.csv"))
+            with open(paths[-1], "wb") as f:
+                f.write(to_csv_bytes(calcs))
+
+        def with_pandas():
+            import pandas as pd
+            df = pd.concat([pd.read_csv(p) for p in paths]).sort_values("timestamp", kind="stable")
+            df.drop_duplicates().to_csv(os.path.join(tmp, "pandas.csv"), index=False)
+
+        def streaming():
+            merge_histories(paths, os.path.join(tmp, "merged.csv"))
+
+        for label, fn in (("pandas", with_pandas), ("k-way merge", streaming)):
+            elapsed, peak = _measure(fn)
+            print(f"{label:12} {nodes * rows} rows  {elapsed:6.2f} s  peak {peak:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
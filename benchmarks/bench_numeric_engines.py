@@ -0,0 +1,60 @@
+# benchmarks/bench_numeric_engines.py
+"""
+Per-operation overhead of each numeric engine.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_numeric_engines
+
+For every operation the table shows the time of one ``create`` + ``evaluate``
++ ``round`` cycle, for small-integer operands (the exact engines take the
+float fast path) and for decimal-string operands (always the exact path).
+"""
+import timeit
+
+from app.calculator_config import CalculatorConfig
+from app.numeric import DecimalEngine, FractionEngine, NumericEngine
+from app.operations import OperationFactory
+
+OPERATIONS = (
+    "add", "subtract", "multiply", "divide", "power",
+    "root", "modulus", "int_divide", "percent", "abs_diff",
+)
+
+ENGINES = {
+    "float": NumericEngine(),
+    "decimal": DecimalEngine(),
+    "decimal/nofast": DecimalEngine(fast_path=False),
+    "fraction": FractionEngine(),
+    "fraction/nofast": FractionEngine(fast_path=False),
+}
+
+INPUTS = {
+    "int": (1234, 17),
+    "str": ("1234.5678", "17.25"),
+}
+
+
+def bench_one(engine, op, a, b, number):
+    precision = CalculatorConfig().precision
+
+    def run():
+        engine.round(engine.evaluate(OperationFactory.create(op, a, b, engine=engine)), precision)
+
+    return min(timeit.repeat(run, number=number, repeat=3)) / number
+
+
+def main(number: int = 5000):
+    header = f"{'operation':<12}{'input':<6}" + "".join(f"{name:>17}" for name in ENGINES)
+    print(header)
+    print("-" * len(header))
+    for op in OPERATIONS:
+        for kind, (a, b) in INPUTS.items():
+            cells = []
+            for engine in ENGINES.values():
+                cells.append(f"{bench_one(engine, op, a, b, number) * 1e6:>14.2f} us")
+            print(f"{op:<12}{kind:<6}" + "".join(cells))
+
+
+if __name__ == "__main__":
+    main()
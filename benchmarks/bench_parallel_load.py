@@ -0,0 +1,46 @@
+# benchmarks/bench_parallel_load.py
+"""
+Loading a large history: pandas (``load_history``'s default path) vs the
+chunked loader in one process and across worker processes.
+
+    python -m benchmarks.bench_parallel_load
+"""
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.calculation import Calculation
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+from app.parallel_load import read_history_parallel
+from app.serialization import to_csv_bytes
+
+
+def _time(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main(rows: int = 500_000):
+    t0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    calcs = [Calculation("add", (i * 0.5, 1.0), i * 0.5 + 1.0, t0 + timedelta(milliseconds=i)) for i in range(rows)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "history.csv")
+        with open(path, "wb") as f:
+            f.write(to_csv_bytes(calcs))
+        print(f"{rows} rows, {os.path.getsize(path) / 2**20:.0f} MiB, {os.cpu_count()} cores")
+
+        config = CalculatorConfig(
+            log_dir=tmp, history_dir=tmp, history_file=path, max_history_size=rows, parallel_load_min_bytes=2**62
+        )
+        calc = Calculator(config=config, observers=[])
+        print(f"pandas load_history  {_time(calc.load_history):6.2f} s")
+        for workers in (1, 4):
+            elapsed = _time(lambda: read_history_parallel(path, workers=workers))
+            print(f"chunked workers={workers}    {elapsed:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
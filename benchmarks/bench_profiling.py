@@ -0,0 +1,47 @@
+# benchmarks/bench_profiling.py
+"""
+Overhead of an active profile on an autosaving calculator, and what it
+reports.
+
+    python -m benchmarks.bench_profiling
+"""
+import os
+import tempfile
+import time
+
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+
+
+def run(calc, ops: int) -> float:
+    start = time.perf_counter()
+    for i in range(ops):
+        calc.perform("add", i, 1)
+    return (time.perf_counter() - start) / ops
+
+
+def make_calculator(tmp: str, ops: int) -> Calculator:
+    config = CalculatorConfig(
+        log_dir=tmp,
+        history_dir=tmp,
+        history_file=os.path.join(tmp, "history.csv"),
+        auto_save=True,
+        max_history_size=ops * 3,
+    )
+    return Calculator(config=config)
+
+
+def main(ops: int = 500):
+    with tempfile.TemporaryDirectory() as plain_dir, tempfile.TemporaryDirectory() as profiled_dir:
+        plain = run(make_calculator(plain_dir, ops), ops)
+        calc = make_calculator(profiled_dir, ops)
+        calc.start_profiling()
+        profiled = run(calc, ops)
+        report = calc.stop_profiling(os.path.join(profiled_dir, "profile.folded"))
+        print(f"perform             {plain * 1e6:8.1f} us/op")
+        print(f"perform, profiled   {profiled * 1e6:8.1f} us/op ({profiled / plain:.2f}x)")
+        print(report.summary(8))
+
+
+if __name__ == "__main__":
+    main()
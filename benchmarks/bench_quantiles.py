@@ -0,0 +1,46 @@
+# benchmarks/bench_quantiles.py
+"""
+Quantile sketches vs keeping every value: update cost, memory held and
+rank error at p50/p99, plus the extra cost of recording a calculation.
+
+    python -m benchmarks.bench_quantiles
+"""
+import random
+import time
+from bisect import bisect_right
+
+from app.quantiles import CalculationStats, KLLSketch
+
+
+def main(values: int = 1_000_000, k: int = 200):
+    rng = random.Random(42)
+    data = [rng.lognormvariate(0, 1) for _ in range(values)]
+
+    sketch = KLLSketch(k)
+    start = time.perf_counter()
+    for v in data:
+        sketch.update(v)
+    update_us = (time.perf_counter() - start) / values * 1e6
+
+    start = time.perf_counter()
+    kept = list(data)
+    kept.sort()
+    sort_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{values:,} values, k={k}")
+    print(f"sketch  {update_us:5.2f} us/update  holds {sketch.retained():>9,} values")
+    print(f"exact   list + sort {sort_ms:.0f} ms  holds {len(kept):>9,} values")
+    for q in (0.5, 0.99, 0.999):
+        estimate = sketch.quantile(q)
+        error = bisect_right(kept, estimate) / values - q
+        print(f"p{q * 100:g}: sketch {estimate:.4f}  exact {kept[int(q * values)]:.4f}  rank error {error:+.4%}")
+
+    stats = CalculationStats(k)
+    start = time.perf_counter()
+    for i, v in enumerate(data[:200_000]):
+        stats.record("add", v, 1e-6)
+    print(f"CalculationStats.record {(time.perf_counter() - start) / 200_000 * 1e6:.2f} us/calculation")
+
+
+if __name__ == "__main__":
+    main()
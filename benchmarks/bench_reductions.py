@@ -0,0 +1,42 @@
+# benchmarks/bench_reductions.py
+"""
+Summing 2k operands: a chain of binary ``add`` calls vs one ``reduce``
+call -- time, history rows and undo snapshots taken.
+
+    python -m benchmarks.bench_reductions
+"""
+import math
+import tempfile
+import time
+
+import numpy as np
+
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+
+
+def main(values: int = 2_000):
+    data = np.random.default_rng(1).uniform(-1e6, 1e6, values)
+    with tempfile.TemporaryDirectory() as tmp:
+        config = CalculatorConfig(log_dir=tmp, history_dir=tmp, auto_save=False, max_history_size=values + 10)
+
+        calc = Calculator(config=config, observers=[])
+        start = time.perf_counter()
+        total = 0.0
+        for v in data.tolist():
+            total = calc.perform("add", total, v).result
+        chained = time.perf_counter() - start
+        print(f"binary add chain {chained * 1000:9.1f} ms  {len(calc.history()):>6} rows  "
+              f"{len(calc._caretaker._undo_stack):>4} undo snapshots  sum {total!r}")
+
+        calc = Calculator(config=config, observers=[])
+        start = time.perf_counter()
+        entry = calc.reduce("sum", data)
+        reduced = time.perf_counter() - start
+        print(f"reduce('sum')    {reduced * 1000:9.1f} ms  {len(calc.history()):>6} rows  "
+              f"{len(calc._caretaker._undo_stack):>4} undo snapshots  sum {entry.result!r}")
+        print(f"exact (fsum)     {round(math.fsum(data.tolist()), config.precision)!r}  speed-up {chained / reduced:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# benchmarks/bench_replay.py
+"""
+History verification throughput: replaying through ``Calculator.perform``
+vs ``app.replay`` in-process and across worker processes.
+
+    python -m benchmarks.bench_replay
+"""
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from app.calculation import Calculation
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+from app.replay import replay_history
+from app.serialization import to_csv_bytes
+
+OPS = ("add", "subtract", "multiply", "divide", "power", "modulus", "percent")
+
+
+def main(n: int = 500_000):
+    rng = random.Random(0)
+    now = datetime.now(timezone.utc)
+    calcs = []
+    engine = Calculator(config=CalculatorConfig(max_history_size=1), observers=[])
+    for _ in range(n):
+        op = rng.choice(OPS)
+        a, b = rng.uniform(1, 100), rng.uniform(1, 5)
+        calcs.append(Calculation(op, (a, b), engine.perform(op, a, b).result, now))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "history.csv")
+        with open(path, "wb") as f:
+            f.write(to_csv_bytes(calcs))
+
+        start = time.perf_counter()
+        for c in calcs[:50_000]:
+            engine.perform(c.operation, *c.operands)
+        perform_rate = 50_000 / (time.perf_counter() - start)
+        print(f"Calculator.perform   {perform_rate:12,.0f} rows/s")
+
+        replay_history(path, workers=1, chunk_size=1000)  # warm up imports
+        for workers in (1, 4):
+            report = replay_history(path, workers=workers)
+            assert report.ok, report.mismatches[:3]
+            print(f"replay workers={workers:<3} {report.throughput:12,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# benchmarks/bench_rollups.py
+"""
+Hourly counts and mean result per operation over a long history: grouping
+the history CSV with pandas vs reading the hour rollups.
+
+    python -m benchmarks.bench_rollups
+"""
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.calculation import Calculation
+from app.rollups import RollupStore
+from app.serialization import to_csv_bytes
+
+OPERATIONS = ("add", "subtract", "multiply", "divide", "power")
+
+
+def main(rows: int = 1_000_000):
+    import pandas as pd
+
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    # one calculation every 3 s: ~35 days of history
+    calcs = [
+        Calculation(OPERATIONS[i % 5], (float(i), 2.0), float(i % 1000), start + timedelta(seconds=3 * i))
+        for i in range(rows)
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        history = os.path.join(tmp, "history.csv")
+        with open(history, "wb") as f:
+            f.write(to_csv_bytes(calcs))
+
+        store = RollupStore(history, ["minute", "hour"])
+        t = time.perf_counter()
+        for calc in calcs:
+            store.add(calc)
+        store.flush()
+        add_us = (time.perf_counter() - t) / rows * 1e6
+
+        t = time.perf_counter()
+        df = pd.read_csv(history, usecols=["operation", "result", "timestamp"])
+        df["hour"] = pd.to_datetime(df["timestamp"], format="ISO8601").dt.floor("h")
+        grouped = df.groupby(["hour", "operation"])["result"].agg(["count", "mean"])
+        pandas_s = time.perf_counter() - t
+
+        t = time.perf_counter()
+        hourly = RollupStore(history, ["minute", "hour"]).query("hour")
+        rollup_s = time.perf_counter() - t
+        assert len(hourly) == len(grouped)
+
+        print(f"{rows} rows, CSV {os.path.getsize(history) / 2**20:.1f} MiB")
+        print(f"rollup update       {add_us:6.2f} us/calculation (minute + hour)")
+        print(f"pandas groupby      {pandas_s * 1e3:8.1f} ms")
+        print(
+            f"hour rollups        {rollup_s * 1e3:8.1f} ms  "
+            f"({os.path.getsize(store.path('hour')) / 1024:.0f} KiB, {len(hourly)} buckets)"
+        )
+
+
+if __name__ == "__main__":
+    main()
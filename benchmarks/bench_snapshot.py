@@ -0,0 +1,45 @@
+# benchmarks/bench_snapshot.py
+"""
+Startup cost: loading the history CSV (pandas) vs restoring a snapshot,
+for a full history with a full undo stack.
+
+    python -m benchmarks.bench_snapshot
+"""
+import os
+import tempfile
+import time
+
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+
+
+def main(rows: int = 1000):
+    with tempfile.TemporaryDirectory() as tmp:
+        config = CalculatorConfig(
+            log_dir=tmp,
+            history_dir=tmp,
+            history_file=os.path.join(tmp, "history.csv"),
+            snapshot_file=os.path.join(tmp, "calc.snapshot"),
+            max_history_size=rows,
+            auto_save=False,
+        )
+        calc = Calculator(config=config, observers=[])
+        calc.perform_many(("add", i, 1) for i in range(rows))
+        for i in range(100):
+            calc.perform("multiply", i, 2)
+        calc.save_history()
+        calc.save_snapshot()
+        print(f"snapshot size {os.path.getsize(config.snapshot_file) / 1024:.0f} KiB")
+
+        for label, restore in (("load_history", Calculator.load_history), ("snapshot", Calculator.restore_state)):
+            best = float("inf")
+            for _ in range(5):
+                fresh = Calculator(config=config, observers=[])
+                start = time.perf_counter()
+                restore(fresh)
+                best = min(best, time.perf_counter() - start)
+            print(f"{label:13} {best * 1000:8.1f} ms  undo available: {fresh.can_undo() and len(fresh._caretaker._undo_stack) > 1}")
+
+
+if __name__ == "__main__":
+    main()
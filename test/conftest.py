@@ -0,0 +1,16 @@
+import os
+import tempfile
+
+# Module-level configs (and the shared log file) are built from these when
+# app modules are first imported; point them away from the repo's logs/ and
+# data/ so tests that use the defaults do not write runtime output there.
+_RUNTIME_DIR = tempfile.mkdtemp(prefix="calculator-tests-")
+for name, path in (
+    ("CALCULATOR_LOG_DIR", "logs"),
+    ("CALCULATOR_HISTORY_DIR", "data"),
+    ("CALCULATOR_HISTORY_FILE", "data/history.csv"),
+    ("CALCULATOR_SESSION_DIR", "data/sessions"),
+    ("CALCULATOR_HISTORY_DB", "data/history.db"),
+    ("CALCULATOR_SNAPSHOT_FILE", "data/calculator.snapshot"),
+):
+    os.environ.setdefault(name, os.path.join(_RUNTIME_DIR, path))
@@ -3,12 +3,22 @@ from datetime import datetime, timezone
 import pytest
 
 from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
 from app.calculation import Calculation
 from app.exceptions import OperationError
 
 
-def test_perform_and_history_and_str():
-    calc = Calculator()
+def make_calc(tmp_path):
+    # autosave goes to tmp_path, not the default data/history.csv
+    return Calculator(CalculatorConfig(
+        log_dir=str(tmp_path / "logs"),
+        history_dir=str(tmp_path),
+        history_file=str(tmp_path / "history.csv"),
+    ))
+
+
+def test_perform_and_history_and_str(tmp_path):
+    calc = make_calc(tmp_path)
     # ensure clean start
     calc.clear_history()
     assert calc.history() == []
@@ -23,8 +33,8 @@ def test_perform_and_history_and_str():
     assert str(history[0]).startswith("Add(")
 
 
-def test_undo_and_redo():
-    calc = Calculator()
+def test_undo_and_redo(tmp_path):
+    calc = make_calc(tmp_path)
     calc.clear_history()
     calc.perform("add", 1, 1)
     calc.perform("multiply", 2, 2)
@@ -39,7 +49,7 @@ def test_undo_and_redo():
     assert len(calc.history()) == 2
 
 
-def test_operation_errors():
-    calc = Calculator()
+def test_operation_errors(tmp_path):
+    calc = make_calc(tmp_path)
     with pytest.raises(OperationError):
         calc.perform("divide", 1, 0)
@@ -1,4 +1,6 @@
 from datetime import datetime
+
+import pytest
 from app.calculation import Calculation
 
 
@@ -10,3 +12,78 @@ def test_calculation_to_dict_structure():
     assert d["operand_2"] == 3
     assert d["result"] == 5
     assert "timestamp" in d
+
+
+def test_calculation_is_compact_and_immutable():
+    import copy
+    from dataclasses import FrozenInstanceError
+
+    c = Calculation("".join(["mul", "tiply"]), (2.0, 3.0), 6.0, datetime(2024, 1, 1))
+    assert not hasattr(c, "__dict__")
+    assert c.operation is Calculation("multiply", (1.0, 1.0), 1.0, datetime(2024, 1, 1)).operation
+    assert copy.deepcopy(c) is c
+    with pytest.raises(FrozenInstanceError):
+        c.result = 7.0
+
+
+def test_calculation_pack_round_trip():
+    from datetime import timezone
+
+    for ts in (datetime(2024, 1, 1, 12, 30, 0, 123456), datetime(2024, 1, 1, tzinfo=timezone.utc)):
+        c = Calculation("add", (2.0, 3.5), 5.5, ts)
+        assert Calculation.unpack(c.pack()) == c
+
+
+def test_new_calculations_are_sequenced_with_lazy_timestamps(monkeypatch):
+    import pickle
+    import time
+    from datetime import timezone
+    from app.calculation import stamp
+
+    seq, ns = stamp()
+    c = Calculation("add", (2.0, 3.0), 5.0, ts_ns=ns, seq=seq)
+    assert c.ts_ns == ns and c.timestamp.tzinfo is timezone.utc
+    assert c.timestamp.timestamp() == pytest.approx(ns / 1e9, abs=2e-6)  # truncated to µs
+    # a clock stepped back still yields increasing seq and ts_ns
+    monkeypatch.setattr(time, "time_ns", lambda: ns - 10**9)
+    seq2, ns2 = stamp()
+    assert seq2 > seq and ns2 > ns
+    # records read back (datetime, microsecond precision) compare equal
+    assert Calculation.from_dict(c.to_dict()) == c
+    assert Calculation("add", (2.0, 3.0), 5.0, datetime(2024, 1, 1)).seq > seq2
+    # pickled and packed records keep their seq
+    restored = pickle.loads(pickle.dumps(c))
+    assert restored == c and restored.ts_ns == ns and restored.seq == seq
+    assert Calculation.unpack(c.pack()).seq == seq
+
+
+def test_restored_seq_stays_below_new_ones():
+    import pickle
+    from app.calculation import stamp
+
+    seq, ns = stamp()
+    ahead = Calculation("add", (1.0, 1.0), 2.0, ts_ns=ns, seq=seq + 1000)
+    data = pickle.dumps([ahead])
+    assert pickle.loads(data)[0].seq == seq + 1000
+    assert stamp()[0] > seq + 1000
+    assert Calculation("add", (1.0, 1.0), 2.0, ts_ns=ns).seq > seq + 1000
+
+
+def test_stamp_is_ordered_across_threads():
+    import threading
+    from app.calculation import stamp
+
+    stamps = []
+
+    def worker():
+        for _ in range(2000):
+            stamps.append(stamp())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stamps.sort()
+    assert len({seq for seq, _ in stamps}) == len(stamps)
+    assert all(a[1] < b[1] for a, b in zip(stamps, stamps[1:]))
@@ -14,6 +14,8 @@ def mock_calculator(monkeypatch):
 
         def load_history(self, path=None): pass
         def save_history(self, path=None): pass
+        def restore_state(self, path=None): return "history"
+        def save_snapshot(self, path=None): pass
         def history(self): return self._history
         def clear_history(self): self._history.clear()
         def can_undo(self): return bool(self._history)
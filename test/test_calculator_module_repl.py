@@ -7,15 +7,15 @@ import pytest
 
 
 def test_calc_repl_basic_flow(monkeypatch, tmp_path, capsys):
-    # redirect calculator config to temp dirs
-    hist_file = tmp_path / "history.csv"
-    monkeypatch.setenv("CALCULATOR_HISTORY_FILE", str(hist_file))
-    monkeypatch.setenv("CALCULATOR_HISTORY_DIR", str(tmp_path))
-    monkeypatch.setenv("CALCULATOR_LOG_DIR", str(tmp_path / "logs"))
-
-    # reload module so Calculator picks up env vars
     import app.calculator as calc_mod
-    importlib.reload(calc_mod)
+    from app.calculator_config import CalculatorConfig
+
+    # history and autosave log go to temp dirs
+    config = CalculatorConfig(
+        log_dir=str(tmp_path / "logs"),
+        history_dir=str(tmp_path),
+        history_file=str(tmp_path / "history.csv"),
+    )
 
     inputs = iter([
         "",                # empty input -> ignored
@@ -40,7 +40,7 @@ def test_calc_repl_basic_flow(monkeypatch, tmp_path, capsys):
     monkeypatch.setattr("builtins.input", fake_input)
 
     # run repl (will exit normally)
-    calc_mod.repl()
+    calc_mod.repl(config)
 
     out = capsys.readouterr().out
     assert "Advanced Calculator REPL" in out
@@ -62,18 +62,16 @@ def test_calc_repl_keyboard_interrupt(monkeypatch):
         calc_mod.repl()
 
 
-def test_init_registers_autosave_and_logging(tmp_path, monkeypatch):
-    # ensure auto_save True
-    monkeypatch.setenv("CALCULATOR_AUTO_SAVE", "true")
-    monkeypatch.setenv("CALCULATOR_HISTORY_FILE", str(tmp_path / "history.csv"))
-    monkeypatch.setenv("CALCULATOR_LOG_DIR", str(tmp_path / "logs"))
-    monkeypatch.setenv("CALCULATOR_HISTORY_DIR", str(tmp_path))
-
-    import importlib
-    import app.calculator as calc_mod
-    importlib.reload(calc_mod)
+def test_init_registers_autosave_and_logging(tmp_path):
+    from app.calculator import Calculator
+    from app.calculator_config import CalculatorConfig
 
-    calc = calc_mod.Calculator()
+    calc = Calculator(CalculatorConfig(
+        auto_save=True,
+        history_file=str(tmp_path / "history.csv"),
+        log_dir=str(tmp_path / "logs"),
+        history_dir=str(tmp_path),
+    ))
     # should have at least LoggingObserver and AutoSaveObserver registered
     types = [type(obs).__name__ for obs in calc._observers]
     assert "LoggingObserver" in types
@@ -0,0 +1,114 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+import pytest
+
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+from app.event_stream import EventStreamObserver, EventStreamReader, subscribe
+
+
+def make_calculator(tmp_path, stream, **overrides):
+    config = CalculatorConfig(log_dir=str(tmp_path), history_dir=str(tmp_path), auto_save=False, **overrides)
+    calc = Calculator(config=config, observers=[])
+    calc.register_observer(stream)
+    return calc
+
+
+def test_events_are_sequenced_buffered_and_resumable(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    stream = EventStreamObserver(path, flush_every=3, flush_interval=0)
+    calc = make_calculator(tmp_path, stream)
+    calc.perform("add", 1, 2)
+    calc.perform("multiply", 2, 3)
+    assert os.path.getsize(path) == 0  # still buffered
+
+    calc.undo()
+    reader = EventStreamReader(path)
+    records = reader.poll()
+    assert [(r["seq"], r["event"]) for r in records] == [(1, "perform"), (2, "perform"), (3, "undo")]
+    assert records[0]["operation"] == "add" and records[0]["result"] == 3.0
+    assert records[2]["history_size"] == 1
+
+    calc.perform_many([("subtract", 5, 1), ("divide", 8, 2)])
+    stream.close()
+
+    # a torn trailing line is not returned, and is dropped on reopen
+    with open(path, "ab") as f:
+        f.write(b'{"seq":6,"ev')
+    assert [r["seq"] for r in EventStreamReader(path, offset=reader.offset).poll()] == [4, 5]
+
+    reopened = EventStreamObserver(path, flush_interval=0)
+    assert reopened.seq == 5
+    make_calculator(tmp_path, reopened).clear_history()
+    reopened.close()
+    assert [r["seq"] for r in EventStreamReader(path, after_seq=4)] == [5, 6]
+
+
+def test_periodic_flush(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    stream = EventStreamObserver(path, flush_every=1000, flush_interval=0.05)
+    make_calculator(tmp_path, stream).perform("add", 1, 1)
+    deadline = time.monotonic() + 2
+    while not EventStreamReader(path).poll() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [r["seq"] for r in EventStreamReader(path).poll()] == [1]
+    stream.close()
+
+
+
+def test_streams_share_one_flush_thread_and_release_it(tmp_path):
+    import gc
+    import weakref
+
+    from app.event_stream import _flusher
+
+    def flush_threads():
+        return [t for t in threading.enumerate() if t.name == "event-stream-flush"]
+
+    streams = [EventStreamObserver(str(tmp_path / f"events-{i}.jsonl"), flush_interval=0.05) for i in range(5)]
+    assert len(flush_threads()) == 1
+    for stream in streams:
+        stream.close()
+    deadline = time.monotonic() + 2
+    while flush_threads() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert flush_threads() == [] and len(_flusher._streams) == 0
+
+    # closed streams are not kept alive by the flusher or an exit hook
+    ref = weakref.ref(streams.pop())
+    del stream
+    gc.collect()
+    assert ref() is None
+
+@pytest.mark.skipif(not hasattr(__import__("socket"), "AF_UNIX"), reason="needs Unix sockets")
+def test_socket_subscribers_get_records_immediately(tmp_path):
+    # socket paths are length-limited, so keep this one short
+    sock_dir = tempfile.mkdtemp(prefix="ev")
+    sock_path = os.path.join(sock_dir, "s")
+    stream = EventStreamObserver(str(tmp_path / "events.jsonl"), flush_every=1000, flush_interval=0, socket_path=sock_path)
+    calc = make_calculator(tmp_path, stream)
+
+    received = []
+
+    def listen():
+        for record in subscribe(sock_path, timeout=2):
+            received.append(record)
+            if len(received) == 2:
+                return
+
+    t = threading.Thread(target=listen)
+    t.start()
+    deadline = time.monotonic() + 2
+    while not stream._fanout.clients and time.monotonic() < deadline:
+        time.sleep(0.01)
+    calc.perform("add", 2, 2)
+    calc.clear_history()
+    t.join(3)
+    stream.close()
+    assert [(r["seq"], r["event"]) for r in received] == [(1, "perform"), (2, "clear")]
+    assert not os.path.exists(sock_path)
+    assert json.loads(open(tmp_path / "events.jsonl").readline())["seq"] == 1
@@ -0,0 +1,64 @@
+from decimal import Decimal
+
+import pytest
+
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+from app.exceptions import OperationError, ValidationError
+from app.expressions import compile_expression
+from app.numeric import DecimalEngine
+
+
+def test_compile_and_evaluate_with_variables():
+    plan = compile_expression("(a + b) * c / d")
+    assert plan.variables == ("a", "b", "c", "d")
+    assert plan.evaluate({"a": 1, "b": 2, "c": 4, "d": 2}) == 6.0
+    assert plan.evaluate({"a": 2, "b": 2, "c": 5, "d": 4}) == 5.0
+
+
+def test_plans_are_cached():
+    assert compile_expression("x ** 2 + root(y, 3)") is compile_expression("  x ** 2 +  root(y, 3) ")
+    assert compile_expression("-x % 3").evaluate({"x": 4}) == 2.0
+
+
+def test_expression_with_decimal_engine():
+    plan = compile_expression("a + b + 0.1")
+    assert plan.evaluate({"a": "0.1", "b": "0.1"}, DecimalEngine()) == Decimal("0.3")
+
+
+def test_invalid_expressions():
+    with pytest.raises(ValidationError):
+        compile_expression("1 +")
+    with pytest.raises(ValidationError):
+        compile_expression("os.system(1, 2)")
+    with pytest.raises(OperationError):
+        compile_expression("sqrt(4, 2)")
+    with pytest.raises(ValidationError):
+        compile_expression("a + 1").evaluate({})
+
+
+def test_calculator_records_single_entry(tmp_path):
+    calc = Calculator(CalculatorConfig(
+        log_dir=str(tmp_path / "logs"),
+        history_dir=str(tmp_path),
+        history_file=str(tmp_path / "history.csv"),
+        auto_save=False,
+    ))
+    res = calc.evaluate("(a + b) * c", {"a": 1, "b": 2, "c": 3})
+    assert res.result == 9.0
+    assert len(calc.history()) == 1
+    assert str(res) == "(a + b) * c with a=1, b=2, c=3 = 9.0"
+
+    calc.undo()
+    assert calc.history() == []
+    calc.redo()
+
+    calc.save_history()
+    calc.clear_history()
+    calc.load_history()
+    assert calc.history()[0].expression == res.expression
+
+
+def test_recorded_variables_are_single_line():
+    plan = compile_expression("a * 2")
+    assert plan.render({"a": " 1.5\n"}) == "a * 2 with a=1.5"
@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta, timezone
+from fractions import Fraction
+
+from app.calculation import Calculation
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+from app.history import HistoryManager
+from app.history_archive import HistoryArchive
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def make_calc(i):
+    return Calculation("add" if i % 2 else "multiply", (float(i), 1.0), i + 1.0, T0 + timedelta(seconds=i))
+
+
+def test_evicted_rows_go_to_segments(tmp_path):
+    archive = HistoryArchive(str(tmp_path / "archive"), segment_rows=4, flush_rows=1)
+    history = HistoryManager(max_size=3, archive=archive)
+    for i in range(10):
+        history.append(make_calc(i))
+    history.extend(make_calc(i) for i in range(10, 13))
+
+    assert [c.operands[0] for c in history.list()] == [10.0, 11.0, 12.0]
+    assert archive.count() == 10
+    assert [s["rows"] for s in archive.segments()] == [4, 4, 2]
+    assert [c.operands[0] for c in archive.query()] == [float(i) for i in range(10)]
+
+    # time-range queries skip segments outside the range
+    opened = []
+    real = archive._read_records
+    archive._read_records = lambda seg: opened.append(seg["file"]) or real(seg)
+    window = archive.query(since=T0 + timedelta(seconds=8), until=T0 + timedelta(seconds=10))
+    assert [c.operands[0] for c in window] == [8.0, 9.0]
+    assert opened == ["segment-000002.jsonl.gz"]
+
+    # reopening reads the index back; re-evicting archived rows is a no-op
+    reopened = HistoryArchive(str(tmp_path / "archive"), segment_rows=4)
+    reopened.append([make_calc(9)])
+    assert reopened.count() == 10
+    assert reopened.query(operation="add", limit=2) == [make_calc(7), make_calc(9)]
+
+
+def test_unfinished_flush_is_ignored_and_overwritten(tmp_path):
+    archive = HistoryArchive(str(tmp_path), segment_rows=100)
+    archive.append([make_calc(0), make_calc(1)])
+    assert archive.segments() == [] and archive.count() == 2  # buffered
+    archive.flush()
+    segment = tmp_path / archive.segments()[0]["file"]
+    with open(segment, "ab") as f:
+        f.write(b"\x1f\x8b\x08 torn")
+    assert len(archive.query()) == 2
+    archive.append([make_calc(2)])
+    archive.flush()
+    assert [c.operands[0] for c in HistoryArchive(str(tmp_path)).query()] == [0.0, 1.0, 2.0]
+
+
+def test_calculator_queries_span_archive_and_memory(tmp_path):
+    config = CalculatorConfig(
+        log_dir=str(tmp_path),
+        history_dir=str(tmp_path),
+        max_history_size=5,
+        history_archive_dir=str(tmp_path / "archive"),
+        archive_segment_rows=3,
+    )
+    calc = Calculator(config=config, observers=[])
+    calc.perform_many(("add", i, 1) for i in range(12))
+    assert len(calc.history()) == 5
+    assert [c.result for c in calc.query_history(operation="add")] == [float(i + 1) for i in range(12)]
+    assert [c.result for c in calc.query_history(limit=7)] == [float(i + 1) for i in range(5, 12)]
+
+
+def test_calculators_sharing_an_archive_keep_every_row(tmp_path):
+    config = CalculatorConfig(
+        log_dir=str(tmp_path),
+        history_dir=str(tmp_path),
+        max_history_size=10,
+        history_archive_dir=str(tmp_path / "archive"),
+        archive_segment_rows=25,
+    )
+    first = Calculator(config=config, observers=[])
+    second = Calculator(config=config, observers=[])
+    assert first.history_manager.archive is second.history_manager.archive
+    for i in range(300):
+        (first if i % 3 else second).perform("add", i, 1)
+    archive = first.history_manager.archive
+    archive.flush()
+    assert archive.count() == 300 - 2 * 10
+    assert len(first.query_history()) == 300 - 10
+
+
+def test_sessions_archive_separately(tmp_path):
+    from app.sessions import SessionManager
+
+    config = CalculatorConfig(
+        log_dir=str(tmp_path),
+        history_dir=str(tmp_path),
+        auto_save=False,
+        max_history_size=10,
+        history_archive_dir=str(tmp_path / "archive"),
+        archive_segment_rows=25,
+    )
+    manager = SessionManager(config, max_sessions=4, session_dir=str(tmp_path / "sessions"))
+    alice, bob = manager.get("alice"), manager.get("bob")
+    for i in range(300):
+        alice.perform("add", i, 1)
+        bob.perform("multiply", i, 2)
+    for calc, op in ((alice, "add"), (bob, "multiply")):
+        rows = calc.query_history()
+        assert len(rows) == 300 and {c.operation for c in rows} == {op}
+
+
+def test_time_bounds_are_compared_in_utc(tmp_path):
+    from datetime import timedelta as td
+
+    archive = HistoryArchive(str(tmp_path), segment_rows=4, flush_rows=1)
+    archive.append([make_calc(i) for i in range(10)])
+    plus_two = timezone(td(hours=2))
+    since = (T0 + timedelta(seconds=3)).astimezone(plus_two)
+    until = (T0 + timedelta(seconds=6)).replace(tzinfo=None)  # naive: taken as UTC
+    assert [c.operands[0] for c in archive.query(since=since, until=until)] == [3.0, 4.0, 5.0]
+
+
+def test_exact_results_survive_the_archive(tmp_path):
+    config = CalculatorConfig(
+        log_dir=str(tmp_path),
+        history_dir=str(tmp_path),
+        max_history_size=2,
+        history_archive_dir=str(tmp_path / "archive"),
+        archive_segment_rows=2,
+        numeric_engine="fraction",
+    )
+    calc = Calculator(config=config, observers=[])
+    calc.perform_many(("divide", 1, i) for i in range(3, 9))
+    calc.history_manager.archive.flush()
+
+    results = [c.result for c in HistoryArchive(str(tmp_path / "archive")).query()]
+    assert results == [Fraction(1, i) for i in range(3, 7)]
+    assert all(type(r) is Fraction for r in results)
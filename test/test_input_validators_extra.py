@@ -14,3 +14,31 @@ def test_validate_numeric_pair_too_large():
     large = 1e309
     with pytest.raises(ValidationError):
         validate_numeric_pair(large, 1)
+
+
+def test_validate_numeric_columns_reports_bad_rows():
+    from app.input_validators import validate_numeric_columns
+
+    a = ["1", " 2.5 ", "abc", "1e309", "1_000", None, "nan"]
+    b = ["2", "3", "4", "5", "6", "7", "8"]
+    report = validate_numeric_columns(a, b)
+    assert not report.ok
+    assert [row for row, _ in report.errors] == [2, 3, 5]
+    assert "numeric" in report.errors[0][1]
+    assert "absolute value" in report.errors[1][1]
+
+    good_a, good_b = report.valid_pairs()
+    assert good_a[:3].tolist() == [1.0, 2.5, 1000.0]
+    assert good_b.tolist() == [2.0, 3.0, 6.0, 8.0]
+
+
+def test_validate_numeric_columns_matches_scalar_validator():
+    import numpy as np
+    from app.input_validators import validate_numeric_columns
+
+    a = np.array([1.5, -2.0, 3.0])
+    b = np.array([0, 1, 2])
+    report = validate_numeric_columns(a, b)
+    assert report.ok
+    for i in range(3):
+        assert (report.a[i], report.b[i]) == validate_numeric_pair(a[i], b[i])
@@ -0,0 +1,50 @@
+import gzip
+import json
+import logging
+import os
+from datetime import datetime, timezone
+
+from app.calculation import Calculation
+from app.log_rotation import CompressingRotatingFileHandler, JsonLinesFormatter, drain_rotation_queue
+
+
+def make_logger(name, handler):
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    return logger
+
+
+def test_rotated_segments_are_compressed_and_pruned(tmp_path):
+    log_file = tmp_path / "calculator.log"
+    handler = CompressingRotatingFileHandler(str(log_file), max_bytes=200, backup_count=2)
+    logger = make_logger("test.rotation", handler)
+    try:
+        for i in range(60):
+            logger.info("line %03d with some padding to fill the file", i)
+        drain_rotation_queue()
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+    segments = handler.segments()
+    assert len(segments) == 2
+    assert all(p.endswith(".gz") for p in segments)
+    with gzip.open(segments[-1], "rt") as f:
+        assert "line" in f.read()
+    assert "line 059" in log_file.read_text()
+    assert not [p for p in os.listdir(tmp_path) if p.endswith(".tmp")]
+
+
+def test_json_lines_formatter():
+    calc = Calculation("add", (2.0, 3.0), 5.0, datetime.now(timezone.utc))
+    record = logging.LogRecord("calculator", logging.INFO, __file__, 1, "%s", ("ignored",), None)
+    record.calculation = calc
+    payload = json.loads(JsonLinesFormatter().format(record))
+    assert payload["op"] == "add"
+    assert payload["operands"] == [2.0, 3.0]
+    assert payload["result"] == 5.0
+
+    plain = logging.LogRecord("calculator", logging.WARNING, __file__, 1, "hello %s", ("world",), None)
+    assert json.loads(JsonLinesFormatter().format(plain))["msg"] == "hello world"
@@ -17,3 +17,55 @@ def test_memento_undo_redo():
     assert isinstance(undo_snapshot, list)
     redo_snapshot = caretaker.redo(h1)
     assert isinstance(redo_snapshot, list)
+
+
+def make_history(n):
+    return [Calculation("add", (i, 1), i + 1, datetime.now(timezone.utc)) for i in range(n)]
+
+
+def test_undo_depth_is_bounded():
+    caretaker = Caretaker(max_depth=3, keep_uncompressed=1)
+    for n in range(10):
+        caretaker.save(make_history(n))
+    assert len(caretaker._undo_stack) == 3
+    # newest first: 9, 8, 7 rows; older mementos come back from compressed form
+    assert len(caretaker.undo(make_history(10))) == 9
+    assert len(caretaker.undo(make_history(9))) == 8
+    assert len(caretaker.undo(make_history(8))) == 7
+    assert not caretaker.can_undo()
+    assert caretaker.packed_bytes() > 0  # redo stack holds packed mementos
+
+
+def test_older_mementos_spill_to_disk(tmp_path):
+    caretaker = Caretaker(max_depth=4, keep_uncompressed=1, spill_dir=str(tmp_path))
+    for n in range(6):
+        caretaker.save(make_history(n))
+    # 4 kept, newest stays in memory
+    assert len(list(tmp_path.iterdir())) == 3
+    restored = [caretaker.undo(make_history(6)) for _ in range(4)]
+    assert [len(s) for s in restored] == [5, 4, 3, 2]
+    caretaker.clear()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_appended_snapshots_are_stored_as_deltas():
+    caretaker = Caretaker(max_depth=10, keep_uncompressed=1)
+    rows = make_history(30)
+    states = []
+    for n in range(5, 25):
+        state = rows[max(n - 8, 0):n]  # appended to and trimmed at the front
+        states.append(state)
+        caretaker.save(state)
+    undo = list(caretaker._undo_stack)
+    assert undo[-1].history_snapshot is not None
+    assert all(m.base is not None and len(m.head) <= 1 for m in undo[:-1])
+    assert caretaker.packed_bytes() == 0
+
+    exported = caretaker.export_state()
+    assert exported["undo"] == states[-10:]
+    restored = Caretaker(max_depth=10, keep_uncompressed=1)
+    restored.import_state(exported)
+    for state in reversed(states[-10:]):
+        assert caretaker.undo(rows) == state
+        assert restored.undo(rows) == state
+    assert not caretaker.can_undo()
@@ -0,0 +1,72 @@
+import pytest
+
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+from app.exceptions import ValidationError
+from app.memory_budget import MemoryGovernor, measure, parse_policy
+
+
+def make_calculator(tmp_path, **overrides):
+    config = CalculatorConfig(
+        log_dir=str(tmp_path),
+        history_dir=str(tmp_path),
+        auto_save=False,
+        max_undo_depth=50,
+        undo_uncompressed=50,
+        **overrides,
+    )
+    return Calculator(config=config, observers=[])
+
+
+def test_usage_accounts_history_and_undo(tmp_path):
+    calc = make_calculator(tmp_path)
+    empty = calc.memory_usage()
+    calc.perform_many(("add", i, 1) for i in range(500))
+    for i in range(20):
+        calc.perform("multiply", i, 2)
+    usage = calc.memory_usage()
+    assert usage.history > empty.history + 500 * 100
+    assert usage.undo > empty.undo
+    assert usage.traced is None and usage.total == usage.accounted
+
+
+def test_governor_trims_undo_then_spills_history(tmp_path):
+    calc = make_calculator(tmp_path, history_archive_dir=str(tmp_path / "archive"))
+    calc.perform_many(("add", i, 1) for i in range(2000))
+    for i in range(30):
+        calc.perform("multiply", i, 2)
+    reports = []
+    governor = MemoryGovernor(calc, budget_mb=0.05, check_every=10, on_report=reports.append)
+    calc.register_observer(governor)
+    for i in range(10):
+        calc.perform("subtract", i, 1)
+
+    report = governor.last_report
+    assert reports == [report]
+    assert report.ok and report.after.total <= governor.budget < report.before.total
+    assert report.actions[0].startswith("trim_undo")
+    assert any(a.startswith("spill_history") for a in report.actions)
+    assert calc._caretaker.max_depth < 50
+    # spilled rows stay queryable through the archive
+    assert len(calc.query_history()) == 2040
+    assert str(report).startswith("Memory budget 0.05 MiB exceeded")
+
+
+def test_governor_reports_when_nothing_can_be_freed(tmp_path):
+    calc = make_calculator(tmp_path)
+    calc.perform_many(("add", i, 1) for i in range(500))
+    governor = MemoryGovernor(calc, budget_mb=0.001, policy="spill_history")
+    report = governor.enforce()
+    assert not report.ok and report.actions == []
+    assert len(calc.history()) == 500  # no archive, so nothing is dropped
+    assert "still over budget" in str(report)
+    assert governor.enforce() is not None
+    assert MemoryGovernor(calc, budget_mb=100).enforce() is None
+
+
+def test_config_builds_a_governor_and_rejects_bad_policies(tmp_path):
+    calc = make_calculator(tmp_path, memory_budget_mb=64)
+    assert calc.memory_governor is not None and calc.memory_governor.budget == 64 * 2**20
+    assert measure(calc).total == calc.memory_usage().total
+    with pytest.raises(ValidationError):
+        parse_policy("trim_undo,compact_everything")
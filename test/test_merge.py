@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.calculation import Calculation
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+from app.exceptions import PersistenceError
+from app.merge import main, merge_histories
+from app.serialization import to_csv_bytes
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def calc(op, a, b, result, seconds):
+    return Calculation(op, (a, b), result, T0 + timedelta(seconds=seconds))
+
+
+def test_merge_orders_by_timestamp_and_drops_duplicates(tmp_path):
+    shared = calc("add", 1.0, 1.0, 2.0, 5)
+    node1 = [calc("add", 1.0, 2.0, 3.0, 1), shared, calc("multiply", 2.0, 2.0, 4.0, 9)]
+    node2 = [calc("subtract", 5.0, 1.0, 4.0, 3), shared, calc("add", 1.0, 1.0, 2.0, 5.5)]
+    (tmp_path / "n1.csv").write_bytes(to_csv_bytes(node1))
+    (tmp_path / "n2.csv").write_bytes(to_csv_bytes(node2))
+    out = tmp_path / "merged.csv"
+
+    stats = merge_histories([str(tmp_path / "n1.csv"), str(tmp_path / "n2.csv")], str(out))
+    assert (stats.rows_in, stats.rows_out, stats.duplicates) == (6, 5, 1)
+
+    config = CalculatorConfig(history_dir=str(tmp_path), log_dir=str(tmp_path))
+    calculator = Calculator(config=config, observers=[])
+    calculator.load_history(str(out))
+    assert [c.timestamp for c in calculator.history()] == sorted(c.timestamp for c in node1 + node2[:1] + node2[2:])
+    assert [c.operation for c in calculator.history()] == ["add", "subtract", "add", "add", "multiply"]
+
+
+def test_merge_rejects_unordered_input_and_keeps_output(tmp_path):
+    out = tmp_path / "merged.csv"
+    out.write_text("previous")
+    (tmp_path / "bad.csv").write_bytes(to_csv_bytes([calc("add", 1.0, 1.0, 2.0, 5), calc("add", 1.0, 1.0, 2.0, 1)]))
+
+    with pytest.raises(PersistenceError, match="timestamp order"):
+        merge_histories([str(tmp_path / "bad.csv")], str(out))
+    assert out.read_text() == "previous"
+
+
+def test_merge_cli(tmp_path, capsys):
+    rows = [calc("add", 1.0, 1.0, 2.0, i) for i in range(3)]
+    (tmp_path / "a.csv").write_bytes(to_csv_bytes(rows))
+    (tmp_path / "b.csv").write_bytes(to_csv_bytes(rows))
+
+    assert main([str(tmp_path / "m.csv"), str(tmp_path / "a.csv"), str(tmp_path / "b.csv")]) == 0
+    assert "3 duplicates dropped" in capsys.readouterr().out
+    assert main([str(tmp_path / "m.csv"), str(tmp_path / "missing.csv")]) == 2
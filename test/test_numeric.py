@@ -0,0 +1,73 @@
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+from app.exceptions import OperationError, ValidationError
+from app.numeric import DecimalEngine, FractionEngine, get_engine
+from app.operations import OperationFactory
+
+
+def make_calc(tmp_path, engine):
+    config = CalculatorConfig(
+        log_dir=str(tmp_path / "logs"),
+        history_dir=str(tmp_path),
+        history_file=str(tmp_path / "history.csv"),
+        auto_save=False,
+        numeric_engine=engine,
+    )
+    return Calculator(config)
+
+
+def test_decimal_engine_is_exact(tmp_path):
+    calc = make_calc(tmp_path, "decimal")
+    res = calc.perform("add", "0.1", "0.2")
+    assert res.result == Decimal("0.3")
+    assert calc.perform("divide", "1", "8").result == Decimal("0.125000")
+
+
+def test_fraction_engine_keeps_rationals(tmp_path):
+    calc = make_calc(tmp_path, "fraction")
+    assert calc.perform("divide", 1, 3).result == Fraction(1, 3)
+    assert calc.perform("percent", "1", "3").result == Fraction(100, 3)
+
+
+@pytest.mark.parametrize("engine", [DecimalEngine(), FractionEngine()])
+def test_fast_path_matches_exact_path(engine):
+    slow = type(engine)(fast_path=False)
+    for op in ("add", "subtract", "multiply", "modulus", "int_divide", "abs_diff"):
+        for a, b in ((7, -3), (-7, 3), (12, 4)):
+            fast_result = engine.evaluate(OperationFactory.create(op, a, b, engine=engine))
+            slow_result = slow.evaluate(OperationFactory.create(op, a, b, engine=slow))
+            assert fast_result == slow_result
+            assert type(fast_result) is engine.exact_type
+
+
+def test_exact_engine_errors():
+    engine = DecimalEngine()
+    with pytest.raises(ValidationError):
+        OperationFactory.create("add", "abc", 1, engine=engine)
+    with pytest.raises(OperationError):
+        engine.evaluate(OperationFactory.create("divide", "1.5", 0, engine=engine))
+    with pytest.raises(ValidationError):
+        get_engine(CalculatorConfig(numeric_engine="quad"))
+
+
+def test_exact_engines_use_the_calculator_input_limit():
+    engine = get_engine(CalculatorConfig(numeric_engine="fraction", max_input_value=1000.0))
+    assert engine.coerce_pair("999", "-1000") == (Fraction(999), Fraction(-1000))
+    with pytest.raises(ValidationError):
+        engine.coerce_pair("1001", 1)
+    with pytest.raises(ValidationError):
+        engine.coerce_many([1, 2, 1001])
+
+
+def test_fraction_power_is_bounded():
+    engine = FractionEngine()
+    assert engine.evaluate(OperationFactory.create("power", 3, 600, engine=engine)) == Fraction(3) ** 600
+    assert engine.evaluate(OperationFactory.create("power", "1/2", -10, engine=engine)) == 1024
+    for a, b in ((10, 99999999), ("1/3", 1000), (2, -2000)):
+        with pytest.raises(OperationError):
+            engine.evaluate(OperationFactory.create("power", a, b, engine=engine))
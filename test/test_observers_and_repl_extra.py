@@ -1,18 +1,28 @@
 import builtins
-import importlib
+import re
 import sys
 from datetime import datetime, timezone
 
 import pytest
 
 from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
 from app.logger import AutoSaveObserver
 from app.calculation import Calculation
-from app.exceptions import PersistenceError
+from app.exceptions import OperationError, PersistenceError, ValidationError
 
 
-def test_register_unregister_and_notify_exception():
-    calc = Calculator()
+def tmp_config(tmp_path):
+    return CalculatorConfig(
+        log_dir=str(tmp_path / "logs"),
+        history_dir=str(tmp_path),
+        history_file=str(tmp_path / "history.csv"),
+        snapshot_file=str(tmp_path / "calculator.snapshot"),
+    )
+
+
+def test_register_unregister_and_notify_exception(tmp_path):
+    calc = Calculator(tmp_config(tmp_path))
     # create a bad observer that raises
     class BadObserver:
         def update(self, calc_obj):
@@ -27,8 +37,8 @@ def test_register_unregister_and_notify_exception():
     calc.unregister_observer(bad)
 
 
-def test_autosave_observer_raises_when_pandas_missing(monkeypatch):
-    # Force import of pandas inside AutoSaveObserver.update to fail
+def test_autosave_observer_does_not_need_pandas(monkeypatch, tmp_path):
+    # Autosave serializes rows itself; make any pandas import fail
     real_import = builtins.__import__
 
     def fake_import(name, globals=None, locals=None, fromlist=(), level=0):
@@ -38,24 +48,36 @@ def test_autosave_observer_raises_when_pandas_missing(monkeypatch):
 
     monkeypatch.setattr(builtins, "__import__", fake_import)
 
-    obs = AutoSaveObserver("./does_not_matter.csv")
+    csv_path = tmp_path / "history.csv"
+    obs = AutoSaveObserver(str(csv_path))
+    obs.update(Calculation("add", (1, 2), 3, datetime.now(timezone.utc)))
+    assert csv_path.read_text().splitlines()[0].startswith("operation,")
+
+
+def test_autosave_observer_raises_persistence_error(tmp_path):
+    # the CSV path is a directory, so the checkpoint cannot replace it
+    csv_dir = tmp_path / "history.csv"
+    csv_dir.mkdir()
+    obs = AutoSaveObserver(str(csv_dir), checkpoint_every=1)
     with pytest.raises(PersistenceError):
         obs.update(Calculation("add", (1, 2), 3, datetime.now(timezone.utc)))
 
 
 def test_repl_many_commands(monkeypatch, tmp_path, capsys):
-    # redirect history file to temp
-    hist_file = tmp_path / "history.csv"
-    monkeypatch.setenv("CALCULATOR_HISTORY_FILE", str(hist_file))
-
     import app.calculator_repl as repl_mod
-    importlib.reload(repl_mod)
 
     inputs = iter([
         "help",
         "unknowncmd",
         "add 1",            # wrong args
         "divide 1 0",      # operation error
+        "stats",           # nothing recorded yet
+        "profile start",
+        "add 2 3",
+        "stats add",
+        "memory",
+        f"profile stop {tmp_path / 'session.folded'}",
+        "profile",         # missing action
         "undo",            # nothing to undo
         "redo",            # nothing to redo
         "clear",
@@ -72,10 +94,67 @@ def test_repl_many_commands(monkeypatch, tmp_path, capsys):
 
     monkeypatch.setattr("builtins.input", fake_input)
 
-    # run repl
-    repl_mod.calculator_repl()
-    out = capsys.readouterr().out
+    # run repl (history and snapshot go to tmp_path)
+    repl_mod.calculator_repl(tmp_config(tmp_path))
+    # colour codes depend on how colorama wrapped stdout earlier in the run
+    out = re.sub(r"\x1b\[[0-9;]*m", "", capsys.readouterr().out)
     assert "Available Commands" in out or "help" in out
     assert "Unknown command" in out
     assert "Operation requires two operands" in out
-    assert "Error:" in out or "Nothing to undo" in out
\ No newline at end of file
+    assert "Error:" in out or "Nothing to undo" in out
+    assert "No calculations yet" in out
+    assert "p99 µs" in out
+    assert "Memory: history" in out
+    assert "own s" in out and "Collapsed stacks written" in out
+    assert "use 'profile start'" in out
+
+class Recorder:
+    def __init__(self, events=None, operations=None, batch=False):
+        self.events = events
+        self.operations = operations
+        self.calls = []
+        if batch:
+            self.update_many = lambda calcs: self.calls.append(("many", [c.operation for c in calcs]))
+
+    def update(self, calc):
+        self.calls.append(("one", calc.operation))
+
+    def on_event(self, event, history):
+        self.calls.append((event, len(history)))
+
+
+def test_observer_subscriptions_and_batches(tmp_path):
+    calc = Calculator(observers=[])
+    plain = Recorder()
+    adds = Recorder(operations={"add"}, batch=True)
+    events = Recorder(events=("clear", "undo", "redo"))
+    for obs in (plain, adds, events):
+        calc.register_observer(obs)
+
+    calc.perform("multiply", 2, 3)
+    calc.perform_many([("add", 1, 2), ("subtract", 5, 1), ("add", 2, 2)])
+    assert plain.calls == [("one", "multiply"), ("one", "add"), ("one", "subtract"), ("one", "add")]
+    assert adds.calls == [("many", ["add", "add"])]
+    assert events.calls == []
+
+    calc.undo()  # the batch is undone as one step
+    assert len(calc.history()) == 1
+    calc.redo()
+    calc.clear_history()
+    assert events.calls == [("undo", 1), ("redo", 4), ("clear", 0)]
+
+    with pytest.raises(ValidationError):
+        calc.register_observer(Recorder(events=("explode",)))
+
+
+def test_perform_many_is_all_or_nothing_and_autosaves_in_one_batch(tmp_path):
+    calc = Calculator(observers=[])
+    saver = AutoSaveObserver(str(tmp_path / "h.csv"), checkpoint_every=100)
+    calc.register_observer(saver)
+    with pytest.raises(OperationError):
+        calc.perform_many([("add", 1, 2), ("divide", 1, 0)])
+    assert calc.history() == []
+
+    calc.perform_many([("add", i, 1) for i in range(10)])
+    # the first write creates the CSV; all ten rows land in one checkpoint
+    assert (tmp_path / "h.csv").read_text().count("\n") == 11
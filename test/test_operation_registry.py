@@ -0,0 +1,64 @@
+import sys
+
+import numpy as np
+import pytest
+
+from app.exceptions import OperationError
+from app.operation_registry import OperationRegistry
+from app.operations import Add, OperationFactory
+
+PLUGIN = '''
+from app.operations import Operation
+
+
+class Hypot(Operation):
+    def compute(self):
+        return (self.a ** 2 + self.b ** 2) ** 0.5
+
+    @staticmethod
+    def compute_vectorized(a, b):
+        return (a ** 2 + b ** 2) ** 0.5
+
+
+OPERATION = Hypot
+'''
+
+
+def test_plugins_are_discovered_but_loaded_lazily(tmp_path):
+    (tmp_path / "hypot.py").write_text(PLUGIN)
+    registry = OperationRegistry(str(tmp_path), builtins={"add": Add})
+
+    assert "hypot" in registry
+    assert registry.plugin_names() == ("hypot",)
+    assert not registry.is_loaded("hypot")
+    assert "calculator_plugins.hypot" not in sys.modules
+
+    op_cls = registry.get("HYPOT")
+    assert registry.is_loaded("hypot")
+    assert op_cls(3, 4).compute() == 5.0
+    assert registry.compute_many("hypot", [3, 6], [4, 8]).tolist() == [5.0, 10.0]
+
+
+def test_broken_plugin_raises_operation_error(tmp_path):
+    (tmp_path / "broken.py").write_text("OPERATION = 42\n")
+    registry = OperationRegistry(str(tmp_path))
+    with pytest.raises(OperationError):
+        registry.get("broken")
+    with pytest.raises(OperationError):
+        registry.get("missing")
+
+
+def test_compute_many_vectorized_and_scalar_fallback():
+    a = np.array([27.0, 8.0, 10.0])
+    b = np.array([3.0, 3.0, 4.0])
+    assert OperationFactory.registry.compute_many("add", a, b).tolist() == [30.0, 11.0, 14.0]
+    # root has no vectorised implementation and uses the scalar path
+    roots = OperationFactory.registry.compute_many("root", a, b)
+    assert roots == pytest.approx([3.0, 2.0, 10.0 ** 0.25])
+    with pytest.raises(OperationError):
+        OperationFactory.registry.compute_many("divide", a, [1.0, 0.0, 2.0])
+
+
+def test_factory_lists_builtin_names():
+    assert {"add", "abs_diff", "int_divide"} <= set(OperationFactory.names())
+    assert OperationFactory.supports("Add")
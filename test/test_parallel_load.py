@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+from app.calculation import Calculation
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+from app.exceptions import PersistenceError
+from app.parallel_load import build_records, parse_range, read_history_parallel, split_ranges
+from app.persistence import get_wal
+from app.serialization import to_csv_bytes
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def history(n):
+    calcs = [Calculation("add", (float(i), 0.5), i + 0.5, T0 + timedelta(seconds=i)) for i in range(n)]
+    calcs.append(Calculation("expression", (), 7.0, T0, expression="a+b with a=3, b=4"))
+    calcs.append(Calculation("divide", (Fraction(1), Fraction(3)), Fraction(1, 3), T0))
+    calcs.append(Calculation("add", (Decimal("0.1"), Decimal("0.2")), Decimal("0.3"), T0))
+    calcs.append(Calculation("root", (-8.0, 2.0), "(1.7319121124709868e-16+2.8284271247461903j)", T0))
+    calcs.append(Calculation("subtract", (2.0, 1.0), 1.0, datetime(2025, 6, 1, 12, 30)))  # naive
+    return calcs
+
+
+def test_ranges_skip_newlines_inside_quoted_fields(tmp_path):
+    calcs = history(20)
+    for i in range(0, 20, 3):
+        calcs.insert(i, Calculation("expression", (), 1.0, T0, expression='x with x="1\n2",\n"q"'))
+    path = tmp_path / "h.csv"
+    path.write_bytes(to_csv_bytes(calcs))
+    for parts in range(1, 40):
+        header, ranges = split_ranges(str(path), parts)
+        rows = [c for start, end in ranges for c in build_records(parse_range(str(path), start, end, header))]
+        assert rows == calcs
+
+
+def test_ranges_cover_the_file_on_line_boundaries(tmp_path):
+    path = tmp_path / "h.csv"
+    path.write_bytes(to_csv_bytes(history(100)))
+    data = path.read_bytes()
+    header, ranges = split_ranges(str(path), 7)
+    assert data.startswith(header)
+    assert ranges[0][0] == len(header) and ranges[-1][1] == len(data)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start and data[end - 1:end] == b"\n"
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_parallel_read_matches_history(tmp_path, workers):
+    calcs = history(500)
+    path = tmp_path / "h.csv"
+    path.write_bytes(to_csv_bytes(calcs))
+    loaded = read_history_parallel(str(path), workers=workers)
+    assert loaded == calcs
+    assert loaded[-1].naive and loaded[-1].timestamp == calcs[-1].timestamp
+
+
+def test_parallel_and_sequential_loads_build_the_same_history(tmp_path):
+    path = tmp_path / "h.csv"
+    path.write_bytes(to_csv_bytes(history(50)))
+    histories = []
+    for workers in (1, 2):
+        config = CalculatorConfig(
+            log_dir=str(tmp_path),
+            history_dir=str(tmp_path),
+            history_file=str(path),
+            load_workers=workers,
+            parallel_load_min_bytes=0,
+        )
+        calc = Calculator(config=config, observers=[])
+        calc.load_history()
+        histories.append(calc.history())
+    sequential, parallel = histories
+    assert parallel == sequential
+    assert [type(c.result) for c in parallel] == [type(c.result) for c in sequential]
+    assert [c.operands for c in parallel[-4:-1]] == [c.operands for c in sequential[-4:-1]]
+    assert type(parallel[-4].operands[0]) is Fraction and type(parallel[-3].result) is Decimal
+
+
+def test_parallel_load_is_off_by_default(tmp_path):
+    config = CalculatorConfig(log_dir=str(tmp_path), history_dir=str(tmp_path), parallel_load_min_bytes=0)
+    calc = Calculator(config=config, observers=[])
+    (tmp_path / "h.csv").write_bytes(to_csv_bytes(history(10)))
+    assert not calc._use_parallel_load(str(tmp_path / "h.csv"))
+
+
+def test_load_history_uses_parallel_loader_and_replays_wal(tmp_path):
+    config = CalculatorConfig(
+        log_dir=str(tmp_path),
+        history_dir=str(tmp_path),
+        history_file=str(tmp_path / "h.csv"),
+        load_workers=2,
+        parallel_load_min_bytes=0,
+        max_history_size=10_000,
+    )
+    calcs = history(200)
+    (tmp_path / "h.csv").write_bytes(to_csv_bytes(calcs))
+    extra = Calculation("multiply", (2.0, 3.0), 6.0, T0 + timedelta(days=1))
+    get_wal(config.history_file).append(extra.to_dict())
+
+    calc = Calculator(config=config, observers=[])
+    calc.load_history()
+    assert calc.history() == calcs + [extra]
+    get_wal(config.history_file).truncate()
+
+    (tmp_path / "h.csv").write_text("operation,operand_1,operand_2,result,timestamp\nadd,1,2,3,not-a-date\n")
+    with pytest.raises(PersistenceError):
+        calc.load_history()
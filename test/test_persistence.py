@@ -0,0 +1,120 @@
+import os
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from app import persistence
+from app.calculation import Calculation
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+from app.logger import AutoSaveObserver
+from app.persistence import WriteAheadLog, atomic_write, get_wal
+
+
+def make_calc(i):
+    return Calculation("add", (i, 1), i + 1, datetime.now(timezone.utc))
+
+
+def test_atomic_write_replaces_file_without_leftovers(tmp_path):
+    target = tmp_path / "history.csv"
+    target.write_text("old")
+    atomic_write(str(target), b"new")
+    assert target.read_text() == "new"
+    assert os.listdir(tmp_path) == ["history.csv"]
+
+
+def test_wal_group_commit_and_torn_tail(tmp_path, monkeypatch):
+    syncs = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(persistence.os, "fsync", lambda fd: syncs.append(fd) or real_fsync(fd))
+
+    wal = WriteAheadLog(str(tmp_path / "h.csv.wal"), fsync_batch=4, fsync_interval=3600)
+    for i in range(10):
+        wal.append(make_calc(i).to_dict())
+    assert len(syncs) == 2  # 10 records, fsync every 4
+    wal.close()
+    assert len(syncs) == 3
+
+    # simulate a crash mid-append
+    with open(wal.path, "ab") as f:
+        f.write(b'{"operation":"add","oper')
+    assert len(wal.replay()) == 10
+    wal.append(make_calc(10).to_dict())
+    assert [r["operand_1"] for r in wal.replay()][-2:] == [9.0, 10.0]
+    wal.close()
+
+
+def test_autosave_checkpoints_in_batches(tmp_path):
+    csv_path = str(tmp_path / "history.csv")
+    obs = AutoSaveObserver(csv_path, checkpoint_every=5)
+    for i in range(7):
+        obs.update(make_calc(i))
+    # first row creates the CSV, 5 more trigger a checkpoint, 1 still logged
+    assert len(pd.read_csv(csv_path)) == 6
+    assert get_wal(csv_path).pending == 1
+    obs.checkpoint()
+    assert len(pd.read_csv(csv_path)) == 7
+    assert not os.path.exists(csv_path + ".wal")
+
+
+def test_load_history_replays_log_without_duplicates(tmp_path):
+    csv_path = str(tmp_path / "history.csv")
+    config = CalculatorConfig(
+        log_dir=str(tmp_path / "logs"),
+        history_dir=str(tmp_path),
+        history_file=csv_path,
+        auto_save=True,
+        wal_checkpoint_every=100,
+    )
+    calc = Calculator(config)
+    for i in range(4):
+        calc.perform("add", i, 1)
+
+    # crash after the CSV was replaced but before the log was truncated
+    wal = get_wal(csv_path)
+    records = wal.replay()
+    assert len(records) == 3  # the first row created the CSV
+    partial = pd.concat([pd.read_csv(csv_path), pd.DataFrame(records[:2])], ignore_index=True)
+    partial.to_csv(csv_path, index=False)
+
+    restored = Calculator(config)
+    restored.load_history()
+    assert [c.operands[0] for c in restored.history()] == [0.0, 1.0, 2.0, 3.0]
+
+    restored.save_history()
+    assert wal.pending == 0
+    assert len(pd.read_csv(csv_path)) == 4
+
+
+def test_wal_keeps_exact_results(tmp_path):
+    from decimal import Decimal
+    from fractions import Fraction
+    from app.serialization import to_jsonl_bytes
+
+    ts = datetime.now(timezone.utc)
+    calcs = [
+        Calculation("divide", (1, 3), Fraction(1, 3), ts),
+        Calculation("add", (0.1, 0.2), Decimal("0.3"), ts),
+    ]
+    wal = WriteAheadLog(str(tmp_path / "h.csv.wal"))
+    wal.append_raw(to_jsonl_bytes(calcs), 2)
+    wal.append(calcs[1].to_dict())
+    results = [r["result"] for r in wal.replay()]
+    assert results == [Fraction(1, 3), Decimal("0.3"), Decimal("0.3")]
+    assert [type(r) for r in results] == [Fraction, Decimal, Decimal]
+    wal.close()
+
+
+def test_replay_tells_apart_rows_with_the_same_timestamp(tmp_path):
+    from app.persistence import unapplied_records
+
+    ts = datetime.now(timezone.utc)
+    same = [Calculation("add", (1, 1), 2, ts), Calculation("add", (1, 1), 2, ts)]
+    records = [c.to_dict() for c in same]
+    # the checkpoint crashed after writing the first row to the CSV
+    last_row = {k: str(v) for k, v in records[0].items()}
+    assert unapplied_records(records, last_row) == records[1:]
+    assert unapplied_records(records, {k: str(v) for k, v in records[1].items()}) == []
+    # files and logs without seq still match on operation and timestamp
+    legacy = [{k: v for k, v in r.items() if k != "seq"} for r in records]
+    assert unapplied_records(legacy, last_row) == []
@@ -1,12 +1,19 @@
 import pandas as pd
 from datetime import datetime, timezone
 from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
 
 
 def test_save_and_load_history(tmp_path):
     f = tmp_path / "history.csv"
+    # autosave goes to its own file under tmp_path
+    config = CalculatorConfig(
+        log_dir=str(tmp_path / "logs"),
+        history_dir=str(tmp_path),
+        history_file=str(tmp_path / "autosave.csv"),
+    )
 
-    calc = Calculator()
+    calc = Calculator(config)
     calc.clear_history()
     calc.perform("add", 10, 20)
     calc.perform("subtract", 5, 2)
@@ -16,7 +23,7 @@ def test_save_and_load_history(tmp_path):
     assert f.exists()
 
     # Create a fresh calculator and load from file
-    new_calc = Calculator()
+    new_calc = Calculator(config)
     # ensure loading from provided path works
     new_calc.load_history(str(f))
     hist = new_calc.history()
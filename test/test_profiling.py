@@ -0,0 +1,60 @@
+import pytest
+
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+from app.exceptions import ValidationError
+from app.profiling import Profiler, collapse_stack
+
+
+def make_calculator(tmp_path):
+    config = CalculatorConfig(
+        log_dir=str(tmp_path),
+        history_dir=str(tmp_path),
+        history_file=str(tmp_path / "history.csv"),
+        auto_save=True,
+    )
+    return Calculator(config=config)
+
+
+def test_profile_reports_calculator_hotspots_and_collapsed_stacks(tmp_path):
+    calc = make_calculator(tmp_path)
+    calc.start_profiling(interval=0.0005)
+    with pytest.raises(ValidationError):
+        calc.start_profiling()
+    for i in range(150):
+        calc.perform("add", i, 1)
+    report = calc.stop_profiling(str(tmp_path / "out.folded"))
+
+    names = [name for name, *_ in report.hotspots(50)]
+    assert any(name.startswith("calculator:perform:") for name in names)
+    # own time includes the library calls perform's observers make
+    assert report.hotspots(1)[0][2] > 0
+    assert "own s" in report.summary()
+
+    lines = (tmp_path / "out.folded").read_text().splitlines()
+    assert lines and sum(int(line.rsplit(" ", 1)[1]) for line in lines) == sum(report.samples.values())
+    assert all(line.startswith("calculator:Calculator.") for line in lines)
+
+    with pytest.raises(ValidationError):
+        calc.stop_profiling()
+
+
+def test_stacks_without_calculator_frames_are_dropped():
+    import json
+    import sys
+
+    stacks = []
+
+    def inner(obj):
+        stacks.append(collapse_stack(sys._getframe()))
+        return str(obj)
+
+    # no calculator frame on the stack
+    assert collapse_stack(sys._getframe()) is None
+    json.dumps({"a": object()}, default=inner)
+    assert stacks == [None]
+
+    profiler = Profiler(interval=0.01)
+    profiler.start()
+    report = profiler.stop()
+    assert report.hotspots() == [] and report.collapsed() == ""
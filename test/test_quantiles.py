@@ -0,0 +1,93 @@
+import random
+
+import pytest
+
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+from app.exceptions import ValidationError
+from app.quantiles import CalculationStats, KLLSketch
+
+
+def exact_rank(sorted_values, value):
+    return sum(v <= value for v in sorted_values) / len(sorted_values)
+
+
+def test_sketch_is_bounded_and_accurate():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(0, 1) for _ in range(100_000)]
+    sketch = KLLSketch(k=200, seed=1)
+    sketch.update_many(values)
+
+    assert sketch.n == len(values)
+    assert sketch.retained() < 3 * 200 + 50
+    ordered = sorted(values)
+    for q in (0.1, 0.5, 0.9, 0.99):
+        assert abs(exact_rank(ordered, sketch.quantile(q)) - q) < 0.02
+    assert sketch.quantiles((0, 1)) == [ordered[0], ordered[-1]]
+    assert abs(sketch.rank(sketch.quantile(0.5)) - 0.5) < 0.02
+
+
+def test_merged_sketches_match_one_sketch():
+    rng = random.Random(3)
+    values = [rng.uniform(0, 1000) for _ in range(60_000)]
+    parts = [KLLSketch(k=100, seed=i) for i in range(6)]
+    for i, v in enumerate(values):
+        parts[i % 6].update(v)
+
+    merged = KLLSketch(k=100)
+    for part in parts:
+        # round-trip through the JSON form, as when sketches come from other processes
+        merged.merge(KLLSketch.from_dict(part.to_dict()))
+    assert merged.n == len(values)
+    assert merged.retained() < 3 * 100 + 50
+    assert abs(merged.quantile(0.5) - 500) < 30
+    assert abs(merged.quantile(0.99) - 990) < 30
+
+
+def test_empty_and_invalid_queries():
+    sketch = KLLSketch()
+    assert sketch.quantiles((0.5, 0.99)) == [None, None]
+    with pytest.raises(ValidationError):
+        sketch.quantile(1.5)
+    with pytest.raises(ValidationError):
+        KLLSketch(k=2)
+    with pytest.raises(ValidationError):
+        CalculationStats().quantiles((0.5,), kind="memory")
+
+
+def test_calculator_tracks_results_and_latency_per_operation(tmp_path):
+    config = CalculatorConfig(log_dir=str(tmp_path), history_dir=str(tmp_path), auto_save=False)
+    calc = Calculator(config=config, observers=[])
+    for i in range(1, 101):
+        calc.perform("add", i, 0)
+    calc.perform_many(("multiply", i, 2) for i in range(1, 11))
+    calc.evaluate("2 ** 0.5")
+    with pytest.raises(Exception):
+        calc.perform("divide", 1, 0)  # failed calculations are not counted
+
+    assert calc.stats.operations() == ["add", "expression", "multiply"]
+    assert calc.stats.count() == 111
+    p50, p99 = calc.quantiles((0.5, 0.99), "add")
+    assert 49 <= p50 <= 51 and 98 <= p99 <= 100
+    assert calc.quantiles((1,), "multiply") == [20.0]
+    latency = calc.quantiles((0.5,), kind="latency")[0]
+    assert 0 < latency < 0.1
+
+    # stats survive clearing the history and merge across calculators
+    calc.clear_history()
+    other = Calculator(config=config, observers=[])
+    other.perform("add", 1000, 0)
+    calc.stats.merge(other.stats)
+    assert calc.stats.count("add") == 101
+    assert calc.quantiles((1,), "add") == [1000.0]
+
+
+def test_operation_names_are_normalised(tmp_path):
+    config = CalculatorConfig(log_dir=str(tmp_path), history_dir=str(tmp_path), auto_save=False)
+    calc = Calculator(config=config, observers=[])
+    calc.perform("add", 1, 1)
+    calc.perform("ADD", 2, 2)
+    calc.perform_many([("Add", 3, 3)])
+    assert calc.stats.operations() == ["add"]
+    assert calc.stats.count("Add") == 3
+    assert calc.quantiles((1,), "ADD") == [6.0]
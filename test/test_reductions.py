@@ -0,0 +1,74 @@
+import math
+from decimal import Decimal
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+from app.exceptions import OperationError, ValidationError
+from app.numeric import FLOAT_ENGINE
+from app.reductions import accumulate_values, operand_ref, reduce_values
+
+
+@pytest.fixture
+def make_calc(tmp_path):
+    def make(**overrides):
+        config = CalculatorConfig(log_dir=str(tmp_path), history_dir=str(tmp_path), auto_save=False, **overrides)
+        return Calculator(config=config, observers=[])
+    return make
+
+
+def test_float_reductions_are_compensated_and_vectorised():
+    values = FLOAT_ENGINE.coerce_many([1e16, 1.0, -1e16] + [0.1] * 10)
+    assert reduce_values(FLOAT_ENGINE, "sum", values) == math.fsum([1e16, 1.0, -1e16] + [0.1] * 10)
+    values = FLOAT_ENGINE.coerce_many(np.arange(1, 6))
+    assert reduce_values(FLOAT_ENGINE, "product", values) == 120.0
+    assert reduce_values(FLOAT_ENGINE, "mean", values) == 3.0
+    assert reduce_values(FLOAT_ENGINE, "min", values) == 1.0
+    assert list(accumulate_values(FLOAT_ENGINE, "cummax", FLOAT_ENGINE.coerce_many([2, 1, 3]))) == [2, 2, 3]
+    with pytest.raises(OperationError):
+        reduce_values(FLOAT_ENGINE, "product", FLOAT_ENGINE.coerce_many([1e300, 1e300]))
+
+
+def test_reduce_records_one_history_entry(make_calc):
+    calc = make_calc()
+    values = np.linspace(0, 1, 10_000)
+    entry = calc.reduce("sum", values)
+
+    assert entry.result == round(math.fsum(values.tolist()), 6)
+    assert entry.operands == ()
+    assert entry.expression == f"sum(<10000 operands #{operand_ref(values)}>)"
+    assert calc.history() == [entry]
+    calc.undo()
+    assert calc.history() == []
+
+
+def test_accumulate_returns_running_values(make_calc):
+    calc = make_calc()
+    entry, running = calc.accumulate("cumsum", ["1", 2, 3.5])
+    assert list(running) == [1.0, 3.0, 6.5]
+    assert entry.result == 6.5 and entry.operation == "cumsum"
+    with pytest.raises(OperationError):
+        calc.accumulate("sum", [1, 2])
+
+
+def test_exact_engines_reduce_exactly(make_calc):
+    assert make_calc(numeric_engine="fraction").reduce("mean", [1, 2, 4]).result == Fraction(7, 3)
+    assert make_calc(numeric_engine="decimal").reduce("sum", ["0.1"] * 10).result == Decimal("1")
+    _, running = make_calc(numeric_engine="fraction").accumulate("cumprod", ["0.5", 2, 3])
+    assert running == [Fraction(1, 2), Fraction(1), Fraction(3)]
+
+
+def test_invalid_operands_are_rejected(make_calc):
+    calc = make_calc()
+    with pytest.raises(ValidationError, match="position 1"):
+        calc.reduce("sum", [1, "x", 3])
+    with pytest.raises(ValidationError):
+        calc.reduce("sum", [])
+    with pytest.raises(ValidationError):
+        calc.reduce("max", [1, 1e309])
+    with pytest.raises(OperationError):
+        calc.reduce("median", [1, 2])
+    assert calc.history() == []
@@ -1,16 +1,20 @@
-import importlib
 import os
 from datetime import datetime, timezone
 
+from app.calculator_config import CalculatorConfig
 
-def test_repl_quick_flow(monkeypatch, tmp_path, capsys):
-    # Redirect default history file to tmp_path to avoid filesystem pollution
-    hist_file = tmp_path / "history.csv"
-    monkeypatch.setenv("CALCULATOR_HISTORY_FILE", str(hist_file))
 
-    # Now import (or reload) the repl module so config picks up env var
+def tmp_config(tmp_path):
+    return CalculatorConfig(
+        log_dir=str(tmp_path / "logs"),
+        history_dir=str(tmp_path),
+        history_file=str(tmp_path / "history.csv"),
+        snapshot_file=str(tmp_path / "calculator.snapshot"),
+    )
+
+
+def test_repl_quick_flow(monkeypatch, tmp_path, capsys):
     import app.calculator_repl as repl_mod
-    importlib.reload(repl_mod)
 
     inputs = iter([
         "add 2 3",
@@ -27,7 +31,9 @@ def test_repl_quick_flow(monkeypatch, tmp_path, capsys):
     monkeypatch.setattr("builtins.input", fake_input)
 
     # Run the REPL; it should exit after our inputs
-    repl_mod.calculator_repl()
+    # history, autosave log and exit snapshot all go to tmp_path
+    repl_mod.calculator_repl(tmp_config(tmp_path))
+    assert (tmp_path / "calculator.snapshot").exists()
 
     captured = capsys.readouterr()
     assert "Welcome to the Advanced Calculator" in captured.out
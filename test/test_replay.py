@@ -0,0 +1,104 @@
+from datetime import datetime, timezone
+from fractions import Fraction
+
+from app.calculation import Calculation
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+from app.replay import main, replay_history
+from app.serialization import to_csv_bytes
+
+
+def write_history(path, calcs):
+    path.write_bytes(to_csv_bytes(calcs))
+    return str(path)
+
+
+def test_replay_matches_recorded_history(tmp_path):
+    config = CalculatorConfig(history_file=str(tmp_path / "h.csv"), history_dir=str(tmp_path), log_dir=str(tmp_path))
+    calc = Calculator(config=config, observers=[])
+    for a, b in [(1, 2), (10, 4), (2, 0.5)]:
+        for op in ("add", "divide", "power", "root", "modulus", "percent"):
+            calc.perform(op, a, b)
+    calc.evaluate("a*b+1", {"a": 2, "b": 3})
+    calc.save_history()
+    before = calc.history()
+
+    report = replay_history(config.history_file, config=config, workers=1, chunk_size=5)
+    assert report.ok
+    assert report.rows == 19 and report.checked == 18 and report.skipped == 1
+    # replay does not touch the calculator
+    assert calc.history() == before
+
+
+def test_replay_reports_mismatches_and_errors(tmp_path):
+    now = datetime.now(timezone.utc)
+    path = write_history(tmp_path / "h.csv", [
+        Calculation("add", (1.0, 2.0), 3.0, now),
+        Calculation("multiply", (2.0, 3.0), 7.0, now),
+        Calculation("divide", (1.0, 0.0), 1.0, now),
+        Calculation("divide", (1.0, 4.0), 0.25, now),
+        Calculation("nope", (1.0, 1.0), 1.0, now),
+    ])
+
+    report = replay_history(path, workers=1)
+    assert [m.row for m in report.mismatches] == [1, 2, 4]
+    assert report.mismatches[0].replayed == 6.0
+    assert "Division by zero" in report.mismatches[1].error
+    assert "Unsupported" in report.mismatches[2].error
+
+
+def test_replay_in_worker_processes(tmp_path, capsys):
+    now = datetime.now(timezone.utc)
+    calcs = [Calculation("subtract", (float(i), 1.0), i - 1.0, now) for i in range(100)]
+    calcs[57] = Calculation("subtract", (57.0, 1.0), 0.0, now)
+    path = write_history(tmp_path / "h.csv", calcs)
+
+    report = replay_history(path, workers=2, chunk_size=10)
+    assert report.rows == 100
+    assert [m.row for m in report.mismatches] == [57]
+
+    assert main([path, "--workers", "2", "--chunk-size", "10"]) == 1
+    assert "1 mismatches" in capsys.readouterr().out
+
+
+def test_replay_checks_complex_results(tmp_path):
+    config = CalculatorConfig(history_file=str(tmp_path / "h.csv"), history_dir=str(tmp_path), log_dir=str(tmp_path))
+    calc = Calculator(config=config, observers=[])
+    calc.perform("root", -8, 3)  # complex principal root
+    calc.perform("root", 27, 3)
+    calc.save_history()
+    assert replay_history(config.history_file, config=config, workers=1).ok
+
+    now = datetime.now(timezone.utc)
+    path = write_history(tmp_path / "bad.csv", [Calculation("root", (-8.0, 3.0), "(1+2j)", now)])
+    report = replay_history(path, workers=1)
+    assert [m.row for m in report.mismatches] == [0]
+    assert isinstance(report.mismatches[0].replayed, complex)
+
+
+def test_replay_exact_engine_histories(tmp_path):
+    for engine in ("fraction", "decimal"):
+        config = CalculatorConfig(
+            history_file=str(tmp_path / f"{engine}.csv"),
+            history_dir=str(tmp_path),
+            log_dir=str(tmp_path),
+            numeric_engine=engine,
+        )
+        calc = Calculator(config=config, observers=[])
+        for a, b in [(1, 3), (2, 7), ("0.1", "0.2")]:
+            for op in ("add", "divide", "multiply", "power"):
+                calc.perform(op, a, b)
+        calc.save_history()
+
+        report = replay_history(config.history_file, config=config, workers=1)
+        assert report.checked == 12
+        assert report.ok, [str(m) for m in report.mismatches]
+
+    now = datetime.now(timezone.utc)
+    path = write_history(tmp_path / "h.csv", [
+        Calculation("divide", (Fraction(1), Fraction(3)), Fraction(1, 3), now),
+        Calculation("divide", (Fraction(1), Fraction(3)), Fraction(333333, 1000000), now),
+    ])
+    report = replay_history(path, workers=1)
+    assert [m.row for m in report.mismatches] == [1]
+    assert report.mismatches[0].replayed == Fraction(1, 3)
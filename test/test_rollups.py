@@ -0,0 +1,127 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.calculation import Calculation
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+from app.exceptions import ValidationError
+from app.rollups import RollupStore, build_from_history, main, parse_resolutions
+
+T0 = datetime(2026, 3, 1, 10, 0, tzinfo=timezone.utc)
+
+
+def calc_at(op, result, minutes):
+    return Calculation(op, (1, 1), result, T0 + timedelta(minutes=minutes))
+
+
+def test_buckets_per_resolution_and_operation(tmp_path):
+    store = RollupStore(str(tmp_path / "history.csv"), ["minute", "hour"])
+    store.add_many([calc_at("add", 2.0, 0), calc_at("add", 4.0, 0.5), calc_at("add", 9.0, 61), calc_at("divide", "inf", 1)])
+
+    hours = store.query("hour")
+    assert [(r.start, r.operation, r.count) for r in hours] == [
+        (T0, "add", 2),
+        (T0, "divide", 1),
+        (T0 + timedelta(hours=1), "add", 1),
+    ]
+    first = hours[0]
+    assert (first.total, first.min, first.max, first.mean) == (6.0, 2.0, 4.0, 3.0)
+    # non-finite results are counted but not summed
+    assert hours[1].numeric == 0 and hours[1].mean is None and hours[1].max is None
+
+    minutes = store.query("minute", since=T0 + timedelta(minutes=1), operation="add")
+    assert [(r.start, r.count) for r in minutes] == [(T0 + timedelta(minutes=61), 1)]
+    with pytest.raises(ValidationError):
+        store.query("day")
+    with pytest.raises(ValidationError):
+        parse_resolutions("minute,week")
+
+
+def test_deltas_merge_across_flushes_and_compact(tmp_path):
+    path = str(tmp_path / "history.csv")
+    store = RollupStore(path, ["hour"])
+    store.add(calc_at("add", 1.0, 0))
+    store.flush()
+    store.add(calc_at("add", 5.0, 1))
+    store.flush()
+    size = store.size()
+
+    # a fresh reader (another process) sees the combined bucket
+    reopened = RollupStore(path, ["hour"])
+    [r] = reopened.query("hour")
+    assert (r.count, r.total, r.min, r.max) == (2, 6.0, 1.0, 5.0)
+
+    reopened.compact()
+    assert reopened.size() == size // 2
+    assert reopened.query("hour") == [r]
+
+    # a torn record (crash mid-append) is ignored and cut on the next flush
+    with open(reopened.path("hour"), "ab") as f:
+        f.write(b"\x01\x02\x03")
+    assert reopened.query("hour") == [r]
+    reopened.add(calc_at("add", 3.0, 2))
+    assert reopened.query("hour")[0].count == 3
+
+
+def test_calculator_maintains_rollups(tmp_path):
+    config = CalculatorConfig(
+        log_dir=str(tmp_path),
+        history_dir=str(tmp_path),
+        history_file=str(tmp_path / "history.csv"),
+        auto_save=True,
+        rollup_resolutions="minute,hour",
+        rollup_flush_every=2,
+    )
+    calc = Calculator(config=config)
+    calc.perform("add", 2, 3)
+    calc.perform("multiply", 2, 3)
+    calc.reduce("sum", [1, 2, 3])
+    calc.undo()  # rollups keep what was performed
+
+    rows = calc.rollups("hour")
+    assert {r.operation: r.count for r in rows} == {"add": 1, "multiply": 1, "sum": 1}
+    assert sum(r.total for r in rows) == 17.0
+
+    with pytest.raises(ValidationError):
+        Calculator(config=CalculatorConfig(log_dir=str(tmp_path), history_dir=str(tmp_path), auto_save=False), observers=[]).rollups()
+
+
+def test_build_from_history_matches_live_rollups(tmp_path, capsys):
+    history = tmp_path / "history.csv"
+    history.write_text(
+        "operation,operand_1,operand_2,result,timestamp,expression\n"
+        "add,1,2,3.0,2026-03-01T10:00:05+00:00,\n"
+        "add,1,1,2.0,2026-03-01T10:59:00+00:00,\n"
+        "divide,1,0,,2026-03-01T11:00:00+00:00,\n"
+    )
+    store = build_from_history(str(history), ["hour"])
+    assert [(r.operation, r.count, r.total) for r in store.query("hour")] == [("add", 2, 5.0), ("divide", 1, 0.0)]
+
+    assert main(["--resolutions", "hour", "show", str(history), "--operation", "add"]) == 0
+    assert "count=2 mean=2.5" in capsys.readouterr().out
+
+
+def test_build_from_unordered_history_with_exact_results(tmp_path):
+    from fractions import Fraction
+
+    from app.serialization import to_csv_bytes
+
+    calcs = [
+        calc_at("divide", Fraction(1, 4), 70),
+        calc_at("divide", Fraction(1, 2), 5),
+        calc_at("add", 2.0, 10),  # earlier than the row before it
+        calc_at("divide", Fraction(3, 4), 1),
+    ]
+    history = tmp_path / "history.csv"
+    history.write_bytes(to_csv_bytes(calcs))
+    store = build_from_history(str(history), ["hour"])
+    assert [(r.operation, r.count, r.numeric, r.total) for r in store.query("hour")] == [
+        ("add", 1, 1, 2.0),
+        ("divide", 2, 2, 1.25),
+        ("divide", 1, 1, 0.25),
+    ]
+
+    live = RollupStore(str(tmp_path / "live.csv"), ["hour"])
+    live.add_many(calcs)
+    assert live.query("hour") == store.query("hour")
@@ -0,0 +1,98 @@
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from fractions import Fraction
+
+import pandas as pd
+
+from app.calculation import Calculation
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+from app.serialization import COLUMNS, decode_exact, normalise_csv, to_columns, to_csv_bytes, to_jsonl_bytes
+
+TS = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_history():
+    return [
+        Calculation("add", (1, 2), 3.0, TS),
+        Calculation("expression", (), 9.0, TS, expression="(a + b) * c with a=1, b=2, c=3"),
+    ]
+
+
+def test_to_columns_matches_to_dict():
+    history = make_history()
+    columns = to_columns(history)
+    assert tuple(columns) == COLUMNS
+    for i, calc in enumerate(history):
+        assert {col: columns[col][i] for col in COLUMNS} == calc.to_dict()
+
+
+def test_csv_and_jsonl_bytes(tmp_path):
+    path = tmp_path / "history.csv"
+    path.write_bytes(to_csv_bytes(make_history()))
+    df = pd.read_csv(path)
+    assert list(df.columns) == list(COLUMNS)
+    assert df["expression"].iloc[1].startswith("(a + b)")
+
+    history = make_history()
+    lines = to_jsonl_bytes(history).decode().splitlines()
+    assert [json.loads(line) for line in lines] == [c.to_dict() for c in history]
+
+
+def test_normalise_csv_rewrites_legacy_layout():
+    legacy = b"operation,result,timestamp,operand_1,operand_2\nadd,3.0,2024-01-01T00:00:00+00:00,1.0,2.0\n"
+    data, last_row = normalise_csv(legacy)
+    assert data.decode().splitlines()[0] == ",".join(COLUMNS)
+    assert last_row["operation"] == "add" and last_row["timestamp"].startswith("2024")
+
+    data, last_row = normalise_csv(to_csv_bytes(make_history()).rstrip(b"\n"))
+    assert data.endswith(b"\n")
+    assert last_row["expression"] == make_history()[1].expression
+
+
+def test_export_history(tmp_path):
+    calc = Calculator(CalculatorConfig(
+        log_dir=str(tmp_path / "logs"),
+        history_dir=str(tmp_path),
+        history_file=str(tmp_path / "history.csv"),
+        auto_save=False,
+    ))
+    calc.perform("add", 2, 3)
+    calc.export_history(str(tmp_path / "out.jsonl"))
+    calc.export_history(str(tmp_path / "out.csv"))
+    assert json.loads((tmp_path / "out.jsonl").read_text())["result"] == 5.0
+
+    calc.clear_history()
+    calc.load_history(str(tmp_path / "out.csv"))
+    assert calc.history()[0].operands == (2.0, 3.0)
+
+
+def test_seq_survives_a_csv_round_trip(tmp_path):
+    from app.calculation import stamp
+
+    history = make_history()
+    path = tmp_path / "history.csv"
+    path.write_bytes(to_csv_bytes(history))
+    loaded = [Calculation.from_dict(r) for r in pd.read_csv(path).to_dict("records")]
+    assert [c.seq for c in loaded] == [c.seq for c in history]
+    assert stamp()[0] > max(c.seq for c in history)
+
+
+def test_exact_values_load_the_same_from_csv_and_jsonl(tmp_path):
+    history = [
+        Calculation("divide", (Fraction(1), Fraction(3)), Fraction(1, 3), TS),
+        Calculation("add", (Decimal("0.1"), Decimal("0.2")), Decimal("0.3"), TS),
+        Calculation("add", (0.1, 0.2), 0.30000000000000004, TS),
+    ]
+    path = tmp_path / "history.csv"
+    path.write_bytes(to_csv_bytes(history))
+    from_csv = [Calculation.from_dict(r) for r in pd.read_csv(path).to_dict("records")]
+    from_jsonl = [
+        Calculation.from_dict(json.loads(line, object_hook=decode_exact))
+        for line in to_jsonl_bytes(history).decode().splitlines()
+    ]
+    for loaded in (from_csv, from_jsonl):
+        assert loaded == history
+        assert [type(c.result) for c in loaded] == [Fraction, Decimal, float]
+        assert [type(c.operands[0]) for c in loaded] == [Fraction, Decimal, float]
@@ -0,0 +1,63 @@
+import pytest
+
+from app.calculator_config import CalculatorConfig
+from app.exceptions import ValidationError
+from app.sessions import SessionManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    config = CalculatorConfig(
+        log_dir=str(tmp_path / "logs"),
+        history_dir=str(tmp_path),
+        history_file=str(tmp_path / "history.csv"),
+        auto_save=False,
+    )
+    return SessionManager(config, max_sessions=2, session_dir=str(tmp_path / "sessions"))
+
+
+def test_sessions_are_isolated_and_share_observers(manager):
+    alice = manager.get("alice")
+    bob = manager.get("bob")
+    alice.perform("add", 1, 2)
+    assert len(alice.history()) == 1
+    assert bob.history() == []
+    assert alice._observers == bob._observers
+    assert manager.get("alice") is alice
+
+
+def test_lru_session_is_spilled_and_rehydrated(manager, tmp_path):
+    manager.get("alice").perform("add", 1, 2)
+    manager.get("bob").perform("multiply", 3, 4)
+    manager.get("carol")
+
+    assert manager.active_sessions() == ["bob", "carol"]
+    assert manager.evictions == 1
+    assert (tmp_path / "sessions" / "alice.csv").exists()
+
+    alice = manager.get("alice")
+    assert [c.result for c in alice.history()] == [3.0]
+    assert "bob" not in manager
+
+
+def test_discard_and_invalid_ids(manager, tmp_path):
+    manager.get("alice").perform("add", 1, 1)
+    manager.close("alice")
+    manager.discard("alice")
+    assert not (tmp_path / "sessions" / "alice.csv").exists()
+    assert manager.get("alice").history() == []
+    with pytest.raises(ValidationError):
+        manager.get("../etc/passwd")
+
+
+def test_evicted_sessions_release_their_logs(manager, tmp_path):
+    from app import persistence
+
+    sessions = tmp_path / "sessions"
+    for i in range(20):
+        manager.get(f"user{i}").perform("add", i, 1)
+    open_logs = {p for p in persistence._wals if p.startswith(str(sessions))}
+    assert open_logs <= {str(sessions / f"{sid}.csv") for sid in manager.active_sessions()}
+    manager.close("user19")
+    assert str(sessions / "user19.csv") not in persistence._wals
+    assert manager.get("user0").history()[0].operands == (0.0, 1.0)
@@ -0,0 +1,123 @@
+import multiprocessing
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.calculation import Calculation
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+from app.exceptions import PersistenceError
+from app.shared_history import SharedHistoryReader, SharedHistoryRing
+
+
+def unique_name():
+    return f"calc-test-{uuid.uuid4().hex[:12]}"
+
+
+def make_calc(i):
+    return Calculation("add", (float(i), 1.0), i + 1.0, datetime.now(timezone.utc))
+
+
+def test_reader_polls_new_records_and_handles_wraparound():
+    ring = SharedHistoryRing(unique_name(), capacity=4)
+    reader = SharedHistoryReader(ring.name)
+    try:
+        assert len(reader.poll()) == 0
+        ring.publish_many([make_calc(i) for i in range(3)])
+        first = reader.poll()
+        assert first["seq"].tolist() == [1, 2, 3]
+        assert first["operation"].tolist() == [b"add"] * 3
+
+        # 6 more records overrun a 4-slot ring: the reader loses 2
+        ring.publish_many([make_calc(i) for i in range(3, 9)])
+        calcs = reader.poll_calculations()
+        assert [c.operands[0] for c in calcs] == [5.0, 6.0, 7.0, 8.0]
+        assert reader.dropped == 2
+        assert calcs[0].timestamp.tzinfo is not None
+
+        with pytest.raises(ValueError):
+            reader.records["result"][0] = 1.0
+    finally:
+        reader.close()
+        ring.close()
+
+
+def test_calculator_publishes_history_changes():
+    name = unique_name()
+    calc = Calculator(config=CalculatorConfig(shared_history=name, shared_history_capacity=16), observers=[])
+    reader = SharedHistoryReader(name, from_start=True)
+    try:
+        calc.perform("multiply", 2, 3)
+        calc.perform_many([("add", 1, 1), ("subtract", 5, 2)])
+        assert [c.result for c in reader.poll_calculations()] == [6.0, 2.0, 3.0]
+
+        calc.undo()
+        assert reader.resynced
+        assert [c.operation for c in reader.poll_calculations()] == ["multiply"]
+        assert not reader.resynced
+    finally:
+        reader.close()
+        calc.history_manager._shared.close()
+
+    with pytest.raises(PersistenceError):
+        SharedHistoryReader(name)
+
+
+def _child_reader(name, queue):
+    reader = SharedHistoryReader(name, from_start=True)
+    queue.put([c.result for c in reader.poll_calculations()])
+    reader.close()
+
+
+def test_reader_in_another_process():
+    ring = SharedHistoryRing(unique_name(), capacity=8)
+    try:
+        ring.publish_many([make_calc(i) for i in range(5)])
+        queue = multiprocessing.Queue()
+        child = multiprocessing.Process(target=_child_reader, args=(ring.name, queue))
+        child.start()
+        assert queue.get(timeout=10) == [1.0, 2.0, 3.0, 4.0, 5.0]
+        child.join(timeout=10)
+        # the child's exit must not have unlinked the writer's block
+        reader = SharedHistoryReader(ring.name)
+        reader.close()
+    finally:
+        ring.close()
+
+
+def test_calculators_with_the_same_name_share_one_ring():
+    name = unique_name()
+    config = CalculatorConfig(shared_history=name, shared_history_capacity=16)
+    first = Calculator(config=config, observers=[])
+    second = Calculator(config=config, observers=[])
+    try:
+        assert first.history_manager._shared is second.history_manager._shared
+    finally:
+        first.history_manager._shared.close()
+
+
+def test_slots_overwritten_during_the_copy_are_dropped():
+    import numpy as np
+
+    ring = SharedHistoryRing(unique_name(), capacity=4)
+    reader = SharedHistoryReader(ring.name)
+    lapped = []
+
+    class Lapping(np.ndarray):
+        # the writer laps the reader right after the records are copied
+        def copy(self, *args, **kwargs):
+            out = np.asarray(self).copy(*args, **kwargs)
+            if not lapped:
+                lapped.append(True)
+                ring.publish_many([make_calc(i) for i in range(10, 14)])
+            return out
+
+    try:
+        ring.publish_many([make_calc(i) for i in range(3)])
+        reader._records = reader._records.view(Lapping)
+        assert len(reader.poll()) == 0
+        assert reader.dropped == 3
+    finally:
+        reader.close()
+        ring.close()
@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+from app.snapshot import read_snapshot
+
+
+@pytest.fixture
+def config(tmp_path):
+    return CalculatorConfig(
+        log_dir=str(tmp_path / "logs"),
+        history_dir=str(tmp_path),
+        history_file=str(tmp_path / "history.csv"),
+        snapshot_file=str(tmp_path / "calc.snapshot"),
+        undo_uncompressed=1,
+        auto_save=False,
+    )
+
+
+def make_calculator(config):
+    return Calculator(config=config, observers=[])
+
+
+def test_snapshot_restores_history_and_undo_redo(config):
+    calc = make_calculator(config)
+    for i in range(5):
+        calc.perform("add", i, 1)
+    calc.undo()
+    calc.save_history()
+    calc.save_snapshot()
+
+    restored = make_calculator(config)
+    assert restored.restore_state() == "snapshot"
+    assert restored.history() == calc.history()
+    assert restored.stats.count("add") == 5
+    assert restored.can_redo()
+    assert [c.result for c in restored.redo()] == [1.0, 2.0, 3.0, 4.0, 5.0]
+    restored.undo()
+    restored.undo()
+    assert [c.result for c in restored.history()] == [1.0, 2.0, 3.0]
+
+
+def test_stale_or_damaged_snapshot_falls_back_to_history(config, tmp_path):
+    calc = make_calculator(config)
+    calc.perform("add", 1, 1)
+    calc.save_history()
+    calc.save_snapshot()
+
+    # the CSV changed after the snapshot was taken
+    calc.perform("multiply", 2, 3)
+    calc.save_history()
+    restored = make_calculator(config)
+    assert restored.restore_state() == "history"
+    assert [c.operation for c in restored.history()] == ["add", "multiply"]
+    assert not restored.can_redo()
+
+    calc.save_snapshot()
+    other = CalculatorConfig(**{**vars(config), "precision": 2})
+    assert make_calculator(other).restore_state() == "history"
+
+    data = bytearray((tmp_path / "calc.snapshot").read_bytes())
+    data[-1] ^= 0xFF
+    (tmp_path / "calc.snapshot").write_bytes(bytes(data))
+    assert read_snapshot(config.snapshot_file) is None
+    assert make_calculator(config).restore_state() == "history"
+
+
+def test_periodic_snapshots(config):
+    config.snapshot_every = 3
+    calc = Calculator(config=config)
+    calc.perform("add", 1, 1)
+    calc.perform("add", 1, 2)
+    assert not os.path.exists(config.snapshot_file)
+    calc.clear_history()
+    state = read_snapshot(config.snapshot_file)
+    assert state["history"] == [] and len(state["caretaker"]["undo"]) == 4
@@ -0,0 +1,154 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+from app.calculation import Calculation
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+from app.exceptions import PersistenceError, ValidationError
+from app.logger import SQLiteAutoSaveObserver
+from app.sqlite_store import SQLiteHistoryStore, get_store
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def calc(op, a, b, result, seconds=0):
+    return Calculation(op, (a, b), result, T0 + timedelta(seconds=seconds))
+
+
+def test_store_round_trip_and_queries(tmp_path):
+    store = SQLiteHistoryStore(str(tmp_path / "h.db"))
+    assert store.pool_size == 4
+    store.insert_many(calc("add" if i % 2 else "multiply", float(i), 1.0, i + 1.0, i) for i in range(10))
+    store.insert(Calculation("expression", (), 7.0, T0 + timedelta(seconds=10), expression="a+b with a=3, b=4"))
+    store.insert(calc("divide", 1.0, 3.0, Decimal("0.333333"), 11))
+    store.insert(calc("divide", Fraction(1), Fraction(3), Fraction(1, 3), 12))
+
+    journal = store._writer.execute("PRAGMA journal_mode").fetchone()[0]
+    assert journal == "wal"
+    assert store.count() == 13 and store.count("add") == 5
+
+    adds = store.query(operation="add")
+    assert [c.operands[0] for c in adds] == [1.0, 3.0, 5.0, 7.0, 9.0]
+    window = store.query(since=T0 + timedelta(seconds=2), until=T0 + timedelta(seconds=5))
+    assert [c.operands[0] for c in window] == [2.0, 3.0, 4.0]
+    # bounds in other zones (or naive, taken as UTC) select the same rows
+    plus_two = timezone(timedelta(hours=2))
+    since = (T0 + timedelta(seconds=2)).astimezone(plus_two)
+    until = (T0 + timedelta(seconds=5)).replace(tzinfo=None)
+    assert store.query(since=since, until=until) == window
+    newest = store.query(limit=3)
+    assert newest[2] == calc("divide", Fraction(1), Fraction(3), Fraction(1, 3), 12)
+    assert type(newest[2].operands[0]) is Fraction
+    assert newest[0].expression == "a+b with a=3, b=4" and newest[0].operands == ()
+    assert newest[1].result == Decimal("0.333333")
+    assert newest[1].timestamp == T0 + timedelta(seconds=11)
+
+    plan = store._writer.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM calculations WHERE operation = ?", ("add",)
+    ).fetchall()
+    assert "idx_calculations_operation" in str(plan)
+    store.close()
+
+
+
+def test_timestamps_in_other_zones_are_stored_as_utc(tmp_path):
+    store = SQLiteHistoryStore(str(tmp_path / "h.db"))
+    plus_five = timezone(timedelta(hours=5))
+    early = Calculation("add", (1.0, 1.0), 2.0, datetime(2026, 1, 1, 10, 0, tzinfo=plus_five))  # 05:00Z
+    late = Calculation("add", (2.0, 2.0), 4.0, datetime(2026, 1, 1, 6, 0, tzinfo=timezone.utc))
+    store.insert_many([early, late])
+    since = datetime(2026, 1, 1, 5, 30, tzinfo=timezone.utc)
+    assert store.query(since=since) == [late]
+    assert store.query(until=since) == [early]
+    assert store.query()[0].timestamp == early.timestamp
+    store.close()
+
+def test_pooled_readers_run_concurrently(tmp_path):
+    store = SQLiteHistoryStore(str(tmp_path / "h.db"), pool_size=2)
+    store.insert_many(calc("add", float(i), 1.0, i + 1.0, i) for i in range(100))
+    counts = []
+    threads = [threading.Thread(target=lambda: counts.append(store.count())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert counts == [100] * 8
+    assert store._opened <= 2
+    store.close()
+
+
+def test_calculator_sqlite_backend(tmp_path):
+    config = CalculatorConfig(
+        log_dir=str(tmp_path / "logs"),
+        history_dir=str(tmp_path),
+        history_backend="sqlite",
+        history_db=str(tmp_path / "history.db"),
+        max_history_size=3,
+    )
+    calculator = Calculator(config=config)
+    assert any(isinstance(o, SQLiteAutoSaveObserver) for o in calculator._observers)
+    for i in range(5):
+        calculator.perform("add", i, 1)
+    # autosave inserted every row
+    assert get_store(config.history_db).count() == 5
+    assert [c.result for c in calculator.query_history(operation="add", limit=2)] == [4.0, 5.0]
+
+    fresh = Calculator(config=config, observers=[])
+    fresh.load_history()
+    assert [c.result for c in fresh.history()] == [3.0, 4.0, 5.0]
+
+    fresh.clear_history()
+    fresh.save_history()
+    assert get_store(config.history_db).count() == 0
+
+
+def test_save_to_db_path_with_csv_backend_and_unknown_backend(tmp_path):
+    config = CalculatorConfig(log_dir=str(tmp_path), history_dir=str(tmp_path), history_file=str(tmp_path / "h.csv"))
+    calculator = Calculator(config=config, observers=[])
+    calculator.perform("multiply", 2, 3)
+    calculator.save_history(str(tmp_path / "export.sqlite"))
+    assert get_store(str(tmp_path / "export.sqlite")).query()[0].result == 6.0
+    assert calculator.query_history(operation="multiply")[0].result == 6.0
+
+    with pytest.raises(ValidationError):
+        Calculator(config=CalculatorConfig(history_backend="mongo"), observers=[])
+
+
+def test_load_errors_from_the_database_are_persistence_errors(tmp_path):
+    config = CalculatorConfig(log_dir=str(tmp_path), history_dir=str(tmp_path), history_file=str(tmp_path / "h.csv"))
+    calculator = Calculator(config=config, observers=[])
+    path = str(tmp_path / "bad.db")
+    store = get_store(path)
+    store._writer.execute(
+        "INSERT INTO calculations (operation, operand_1, operand_2, result, timestamp) VALUES ('add', 1, 2, 3, 'soon')"
+    )
+    with pytest.raises(PersistenceError):
+        calculator.load_history(path)
+
+
+def test_seq_is_stored_and_old_databases_gain_the_column(tmp_path):
+    import sqlite3
+
+    from app.calculation import stamp
+
+    path = str(tmp_path / "old.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE calculations (id INTEGER PRIMARY KEY, operation TEXT NOT NULL, operand_1 REAL, "
+            "operand_2 REAL, result, timestamp TEXT NOT NULL, expression TEXT)"
+        )
+        conn.execute("INSERT INTO calculations VALUES (1, 'add', 1, 2, 3.0, ?, NULL)", (T0.isoformat(),))
+    conn.close()
+
+    store = SQLiteHistoryStore(path)
+    seq, ns = stamp()
+    store.insert(Calculation("add", (2.0, 2.0), 4.0, ts_ns=ns, seq=seq + 1000))
+    old, new = store.query()
+    assert old.operands == (1.0, 2.0) and old.result == 3.0
+    assert new.seq == seq + 1000
+    assert stamp()[0] > seq + 1000
+    store.close()